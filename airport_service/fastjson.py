@@ -0,0 +1,89 @@
+"""
+orjson-backed JSON renderer and parser (settings.REST_FRAMEWORK).
+
+They write and read the same JSON as DRF's JSONRenderer and JSONParser,
+several times faster. Whatever orjson can't do goes through DRF's stdlib
+implementation instead: indented output (browsable API, "; indent="
+media types), integers beyond 64 bits, non UTF-8 request bodies or ones
+with numbers of 20 digits or more, NaN/Infinity when STRICT_JSON is off,
+and everything when orjson isn't installed.
+
+Known differences: floats in exponent notation are written the shortest
+way ("1e16" instead of "1e+16"), and NaN/Infinity are rendered as null
+instead of raising an error with STRICT_JSON on.
+"""
+import codecs
+import io
+import re
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# DRF's conversions (Decimal, lazy strings, timedelta, querysets...) for
+# the types orjson doesn't serialize natively
+_default = JSONEncoder().default
+
+LINE_SEPARATORS = (
+    (b"\xe2\x80\xa8", b"\\u2028"),
+    (b"\xe2\x80\xa9", b"\\u2029"),
+)
+
+# orjson reads integers beyond 64 bits as floats, json keeps them exact
+LONG_NUMBER = re.compile(rb"\d{20}")
+
+
+class FastJSONRenderer(JSONRenderer):
+    def _use_stdlib(self, accepted_media_type, renderer_context):
+        return (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(
+                accepted_media_type, renderer_context or {}
+            ) is not None
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self._use_stdlib(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            rendered = orjson.dumps(data, default=_default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like DRF does, to keep the output a JavaScript subset
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in rendered:
+                rendered = rendered.replace(separator, escaped)
+        return rendered
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if not LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        # DRF raises the parse error, or accepts what orjson doesn't
+        return super().parse(io.BytesIO(body), media_type, parser_context)
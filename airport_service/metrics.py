@@ -0,0 +1,131 @@
+"""
+Prometheus metrics of the API (settings.METRICS).
+
+RequestTimingMiddleware (airport_service/middleware.py) reports every
+request handled by a DRF view, labelled by view class and viewset
+action: request counts by status, latency, and the number and time of
+SQL queries. The API response cache reports hits and misses per
+viewset (flights/cache.py).
+
+With several worker processes, point the PROMETHEUS_MULTIPROC_DIR
+environment variable at a directory shared by the workers and emptied
+before they start: every process then writes its samples there and the
+scrape endpoint adds them up.
+"""
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+LABELS = ("view", "action")
+
+REQUESTS = Counter(
+    "api_requests",
+    "Requests handled by API views",
+    LABELS + ("method", "status"),
+)
+LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "Time to handle a request, rendering included",
+    LABELS,
+)
+DB_QUERIES = Histogram(
+    "api_db_queries_per_request",
+    "SQL queries run by a request",
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, float("inf")),
+)
+DB_TIME = Histogram(
+    "api_db_duration_seconds",
+    "Time a request spent in SQL queries",
+    LABELS,
+    buckets=(
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1,
+        float("inf"),
+    ),
+)
+CACHE_REQUESTS = Counter(
+    "api_cache_requests",
+    "API response cache lookups",
+    ("cache", "outcome"),
+)
+
+
+def enabled() -> bool:
+    return settings.METRICS["ENABLED"]
+
+
+# Labelled children, looked up once: .labels() costs more than the
+# observation itself.
+_request_children = {}
+_view_children = {}
+
+
+def observe(view, action, method, status, duration, queries, sql_time):
+    counter = _request_children.get((view, action, method, status))
+    if counter is None:
+        counter = _request_children.setdefault(
+            (view, action, method, status),
+            REQUESTS.labels(view, action, method, status),
+        )
+    histograms = _view_children.get((view, action))
+    if histograms is None:
+        histograms = _view_children.setdefault((view, action), (
+            LATENCY.labels(view, action),
+            DB_QUERIES.labels(view, action),
+            DB_TIME.labels(view, action),
+        ))
+    counter.inc()
+    latency, db_queries, db_time = histograms
+    latency.observe(duration)
+    db_queries.observe(queries)
+    db_time.observe(sql_time)
+
+
+def record_cache(name, outcome) -> None:
+    if enabled():
+        CACHE_REQUESTS.labels(name, outcome).inc()
+
+
+def _registry():
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def _can_scrape(request):
+    token = settings.METRICS["TOKEN"]
+    if token:
+        if constant_time_compare(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        ):
+            return True
+    elif settings.DEBUG:
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+def metrics_view(request):
+    """
+    Metrics in the Prometheus text format, for all worker processes.
+    Open to the bearer of METRICS["TOKEN"] and to staff users; without a
+    token, only DEBUG opens it to everyone.
+    """
+    if not _can_scrape(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST
+    )
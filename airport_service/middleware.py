@@ -0,0 +1,268 @@
+"""
+Per-request timings for production (settings.REQUEST_PROFILING).
+
+For a sampled request, RequestTimingMiddleware measures the total time,
+the time and number of SQL queries, the time spent in the view and the
+time spent rendering the response. They are sent back as a
+Server-Timing header and logged as one JSON line on the
+"airport_service.requests" logger: at INFO level, or at WARNING level
+for requests slower than SLOW_REQUEST_MS.
+
+Requests to DRF views are also counted and timed in the Prometheus
+metrics (airport_service/metrics.py), whether sampled or not.
+
+Staff users can add the PROFILE_HEADER header to a request to get a
+cProfile report of it in place of the response body. This works for
+sync views only: under ASGI the profiler would only see the event loop.
+"""
+import cProfile
+import io
+import json
+import logging
+import pstats
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async
+)
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from airport_service import metrics
+
+logger = logging.getLogger("airport_service.requests")
+
+# Timings of the request being handled. Context variables follow the
+# request into the threads sync_to_async runs the ORM in.
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_time = 0.0
+        self.queries = 0
+        self.view_started = None
+        self.view_time = None
+        self.render_time = None
+        self.view_name = None
+        self.action = None
+
+    def view_finished(self):
+        if self.view_started is not None and self.view_time is None:
+            self.view_time = time.perf_counter() - self.view_started
+
+    def metrics(self):
+        """(name, milliseconds, description) for Server-Timing"""
+        metrics = [
+            ("total", time.perf_counter() - self.started, None),
+            ("db", self.sql_time, f"{self.queries} queries"),
+        ]
+        if self.view_time is not None:
+            metrics.append(("view", self.view_time, None))
+        if self.render_time is not None:
+            metrics.append(("serialize", self.render_time, None))
+        return [
+            (name, round(seconds * 1000, 2), description)
+            for name, seconds, description in metrics
+        ]
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.sql_time += time.perf_counter() - start
+        timings.queries += 1
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _install_query_timers():
+    # For connections of this thread opened before this module was loaded
+    # (new ones get the timer from install_query_timer)
+    for connection in connections.all(initialized_only=True):
+        install_query_timer(None, connection)
+
+
+def _settings():
+    return settings.REQUEST_PROFILING
+
+
+def _server_timing(metrics) -> str:
+    entries = []
+    for name, milliseconds, description in metrics:
+        entry = f"{name};dur={milliseconds}"
+        if description:
+            entry += f';desc="{description}"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+def _is_staff(request) -> bool:
+    """
+    Whether the request comes from a staff user, authenticated by the
+    session or by the API authentication classes (JWT).
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_staff:
+        return True
+    drf_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(drf_request)
+        except APIException:
+            return False
+        if result is not None:
+            return result[0].is_staff
+    return False
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self) -> bool:
+        config = _settings()
+        return config["ENABLED"] and random.random() < config["SAMPLE_RATE"]
+
+    def _profile_requested(self, request) -> bool:
+        header = _settings()["PROFILE_HEADER"]
+        return bool(request.headers.get(header)) and _is_staff(request)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self._profile_requested(request):
+            return self._profile(request)
+        sampled = self._sampled()
+        if not (sampled or metrics.enabled()):
+            return self.get_response(request)
+
+        _install_query_timers()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, sampled)
+
+    async def __acall__(self, request):
+        sampled = self._sampled()
+        if not (sampled or metrics.enabled()):
+            return await self.get_response(request)
+
+        if sampled:
+            # In the thread the ORM calls of this request will run in
+            await sync_to_async(_install_query_timers)()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, sampled)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is None:
+            return
+        timings.view_started = time.perf_counter()
+        view_class = getattr(view_func, "cls", None)
+        if view_class is not None:
+            # DRF views: viewsets map the method to an action.
+            timings.view_name = view_class.__name__
+            actions = getattr(view_func, "actions", None) or {}
+            timings.action = actions.get(
+                request.method.lower(), request.method.lower()
+            )
+
+    def process_template_response(self, request, response):
+        # Called with DRF responses before they are rendered.
+        timings = _current.get()
+        if timings is None:
+            return response
+        timings.view_finished()
+        render_started = time.perf_counter()
+
+        def rendered(response):
+            timings.render_time = time.perf_counter() - render_started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def _finish(self, request, response, timings, sampled):
+        timings.view_finished()
+        if timings.view_name and metrics.enabled():
+            metrics.observe(
+                timings.view_name,
+                timings.action,
+                request.method,
+                response.status_code,
+                time.perf_counter() - timings.started,
+                timings.queries,
+                timings.sql_time,
+            )
+        if not sampled:
+            return response
+
+        measured = timings.metrics()
+        if _settings()["SERVER_TIMING_HEADER"]:
+            response["Server-Timing"] = _server_timing(measured)
+        slow = measured[0][1] >= _settings()["SLOW_REQUEST_MS"]
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            **{
+                f"{name}_ms": milliseconds
+                for name, milliseconds, _ in measured
+            },
+            "queries": timings.queries,
+        }))
+        return response
+
+    def _profile(self, request):
+        _install_query_timers()
+        profiler = cProfile.Profile()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = profiler.runcall(self.get_response, request)
+        finally:
+            _current.reset(token)
+
+        report = io.StringIO()
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        stats.print_stats(_settings()["PROFILE_LIMIT"])
+        profile = HttpResponse(
+            report.getvalue(), content_type="text/plain; charset=utf-8"
+        )
+        profile["X-Profiled-Status"] = response.status_code
+        profile["Server-Timing"] = _server_timing(timings.metrics())
+        return profile
@@ -23,7 +23,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DEBUG", "True") == "True"
 
 ALLOWED_HOSTS = []
 
@@ -45,20 +45,27 @@ INSTALLED_APPS = [
     "user",
     "rest_framework.authtoken",
     "drf_spectacular",
-    "debug_toolbar",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "airport_service.middleware.RequestTimingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "user.middleware.HashingBusyMiddleware",
 ]
 
+# The debug toolbar is for local development only
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        1, "debug_toolbar.middleware.DebugToolbarMiddleware"
+    )
+
 ROOT_URLCONF = "airport_service.urls"
 
 TEMPLATES = [
@@ -90,9 +97,141 @@ DATABASES = {
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": os.environ["POSTGRES_PORT"],
+        # Keep connections open across requests and check them before
+        # reuse instead of reconnecting on every request.
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+# psycopg connection pool, shared by the threads of a worker (and the
+# better fit under ASGI, where persistent connections are per request).
+# Django doesn't allow it together with persistent connections.
+if os.getenv("DB_POOL", "false").lower() == "true":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),
+        }
+    }
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Local memory is per process: point CACHE_BACKEND / CACHE_LOCATION at a
+# shared cache (e.g. django.core.cache.backends.redis.RedisCache) when
+# running more than one worker.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
     }
 }
 
+# Read-through cache of API responses, invalidated by model signals
+API_CACHE = {
+    "CACHE_ALIAS": os.getenv("API_CACHE_ALIAS", "default"),
+    "TIMEOUT": int(os.getenv("API_CACHE_TIMEOUT", 300)),
+    # Coalesced rebuilds: how long one worker may hold a rebuild lock,
+    # how long the others wait for it, and how long the last good value
+    # is kept to be served meanwhile.
+    "LOCK_TIMEOUT": 10,
+    "LOCK_WAIT": 0.5,
+    "STALE_TIMEOUT": 3600,
+}
+
+# Flight list responses. With TOLERATE_STALE_AVAILABILITY ticket sales
+# and seat holds no longer invalidate cached pages: tickets_available may
+# lag by up to STALE_TIMEOUT seconds in exchange for far more cache hits.
+FLIGHT_LIST_CACHE = {
+    "TIMEOUT": int(os.getenv("FLIGHT_LIST_CACHE_TIMEOUT", 300)),
+    "TOLERATE_STALE_AVAILABILITY": os.getenv(
+        "FLIGHT_LIST_CACHE_TOLERATE_STALE", "False"
+    ) == "True",
+    "STALE_TIMEOUT": int(os.getenv("FLIGHT_LIST_CACHE_STALE_TIMEOUT", 5)),
+}
+
+# List endpoints (flights, routes, airplanes, crew) build their pages
+# with the list serializers' compiled representations instead of the
+# per-field DRF machinery. The output is the same either way.
+FAST_LIST_SERIALIZATION = os.getenv(
+    "FAST_LIST_SERIALIZATION", "True"
+) == "True"
+
+# Request rate limits (airport_service/throttling.py) are counted in this
+# cache. Point it at a shared one when running more than one worker.
+THROTTLING = {
+    "CACHE_ALIAS": os.getenv("THROTTLE_CACHE_ALIAS", "default"),
+}
+
+# Users resolved from JWTs are cached for TIMEOUT seconds
+# (user/authentication.py). Saving or deleting a user drops its entry.
+JWT_USER_CACHE = {
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": int(os.getenv("JWT_USER_CACHE_TIMEOUT", 60)),
+}
+
+# Itinerary search (flights/itineraries.py)
+ITINERARIES = {
+    "MIN_CONNECTION_MINUTES": int(
+        os.getenv("ITINERARY_MIN_CONNECTION_MINUTES", 45)
+    ),
+    "MAX_CONNECTION_HOURS": int(
+        os.getenv("ITINERARY_MAX_CONNECTION_HOURS", 24)
+    ),
+    "MAX_STOPS": 2,
+    "MAX_RESULTS": 20,
+}
+
+# Seat holds live only in the cache and expire on their own
+SEAT_HOLDS = {
+    "CACHE_ALIAS": "default",
+    "TTL": int(os.getenv("SEAT_HOLD_TTL", 600)),
+    "MAX_SEATS": 9,
+}
+
+# Server-Timing headers and JSON log lines for a share of the requests
+# (airport_service/middleware.py). Every sampled request is logged with
+# REQUEST_LOG_LEVEL=INFO, only slow ones by default. Staff users can send
+# PROFILE_HEADER to get a cProfile report of a request instead of its
+# response.
+REQUEST_PROFILING = {
+    "ENABLED": os.getenv("REQUEST_PROFILING", "True") == "True",
+    "SAMPLE_RATE": float(os.getenv("REQUEST_PROFILING_SAMPLE_RATE", 1.0)),
+    "SERVER_TIMING_HEADER": True,
+    "SLOW_REQUEST_MS": int(os.getenv("SLOW_REQUEST_MS", 2000)),
+    "PROFILE_HEADER": "X-Profile",
+    "PROFILE_LIMIT": 60,
+}
+
+# Prometheus metrics of the API views, scraped from /metrics
+# (airport_service/metrics.py). Scrapers send "Authorization: Bearer
+# <TOKEN>"; logged-in staff users can read it too. Without a token the
+# endpoint is staff-only, unless DEBUG is on. Set PROMETHEUS_MULTIPROC_DIR
+# to aggregate several worker processes.
+METRICS = {
+    "ENABLED": os.getenv("METRICS", "True") == "True",
+    "TOKEN": os.getenv("METRICS_TOKEN", ""),
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "airport_service.requests": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -111,6 +250,31 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing (user/hashers.py). New and upgraded passwords use
+# PASSWORD_HASHER: "scrypt", "argon2" (needs argon2-cffi) or "pbkdf2".
+# The others still verify older hashes, which are rehashed on the next
+# login. At most WORKERS hashes run at once per process and QUEUE more
+# wait up to TIMEOUT seconds for a thread, later ones get a 503.
+PASSWORD_HASHING = {
+    "HASHER": os.getenv("PASSWORD_HASHER", "scrypt"),
+    "WORKERS": int(os.getenv(
+        "PASSWORD_HASHING_WORKERS", max(1, (os.cpu_count() or 1) // 2)
+    )),
+    "QUEUE": int(os.getenv("PASSWORD_HASHING_QUEUE", 32)),
+    "TIMEOUT": float(os.getenv("PASSWORD_HASHING_TIMEOUT", 5)),
+}
+
+_PASSWORD_HASHERS = {
+    "scrypt": "user.hashers.ScryptPasswordHasher",
+    "argon2": "user.hashers.Argon2PasswordHasher",
+    "pbkdf2": "user.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS.pop(PASSWORD_HASHING["HASHER"]),
+    *_PASSWORD_HASHERS.values(),
+    "user.hashers.PBKDF2SHA1PasswordHasher",
+]
+
 AUTH_USER_MODEL = "user.User"
 
 
@@ -120,18 +284,32 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 5,
 
+    # orjson with a stdlib fallback (airport_service/fastjson.py)
+    "DEFAULT_RENDERER_CLASSES": (
+        "airport_service.fastjson.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "airport_service.fastjson.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
 
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "airport_service.throttling.AnonRateThrottle",
+        "airport_service.throttling.UserRateThrottle",
+        "airport_service.throttling.ScopedRateThrottle",
     ],
 
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/day",
-        "user": "1000/day"
+        "user": "1000/day",
+        "orders": os.getenv("ORDER_THROTTLE_RATE", "20/hour"),
+        "flight_search": os.getenv("FLIGHT_SEARCH_THROTTLE_RATE", "300/hour"),
     },
 
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -0,0 +1,109 @@
+"""
+Sliding-window rate limits (settings.REST_FRAMEWORK throttle classes).
+
+DRF's throttles keep a list of request timestamps per client, read and
+written back whole on every request: it grows with the allowed rate, and
+concurrent requests overwrite each other's entries. These count requests
+in fixed windows instead and weigh the previous window's count by how
+much of it the sliding window still covers:
+
+    estimate = previous * (1 - elapsed / duration) + current
+
+That is two integers per client and scope, updated with cache.incr(),
+which is atomic on Redis and Memcached, and within a process on locmem
+(the stand-in for development and tests). THROTTLING["CACHE_ALIAS"] must
+name a cache shared by all workers for the limits to hold across them.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import throttling
+
+WINDOW_KEY = "{key}:{window}"
+
+
+class SlidingWindowThrottle(throttling.SimpleRateThrottle):
+    @property
+    def cache(self):
+        return caches[settings.THROTTLING["CACHE_ALIAS"]]
+
+    def _incr(self, key):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Counters outlive the window after theirs, which reads them
+            if self.cache.add(key, 1, timeout=2 * self.duration):
+                return 1
+            return self.cache.incr(key)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        window, self.elapsed = divmod(self.timer(), self.duration)
+        current_key = WINDOW_KEY.format(key=self.key, window=int(window))
+        self.previous = self.cache.get(
+            WINDOW_KEY.format(key=self.key, window=int(window) - 1), 0
+        )
+        # Counting first keeps concurrent requests from all passing
+        self.current = self._incr(current_key) - 1
+        weight = 1 - self.elapsed / self.duration
+        if self.previous * weight + self.current + 1 <= self.num_requests:
+            return self.throttle_success()
+
+        # Rejected requests don't use up the limit
+        try:
+            self.cache.decr(current_key)
+        except ValueError:
+            pass
+        return self.throttle_failure()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """Seconds until the next request would be allowed"""
+        if not self.num_requests:
+            # A "0/<period>" rate never allows any
+            return self.duration
+        room = self.num_requests - 1 - self.current
+        if room < 0:
+            # The current window is full on its own: wait for the next
+            # one to slide far enough past it.
+            return (
+                self.duration - self.elapsed
+                - self.duration * room / self.current
+            )
+        return max(
+            self.duration * (1 - room / self.previous) - self.elapsed, 0
+        )
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle, SlidingWindowThrottle):
+    pass
+
+
+class UserRateThrottle(throttling.UserRateThrottle, SlidingWindowThrottle):
+    pass
+
+
+class ScopedRateThrottle(throttling.ScopedRateThrottle, SlidingWindowThrottle):
+    """
+    Limits views by their throttle_scope, or per action with
+    throttle_scopes = {action: scope}. Views with neither aren't limited.
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scopes", {}).get(
+            getattr(view, "action", None),
+            getattr(view, self.scope_attr, None),
+        )
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return SlidingWindowThrottle.allow_request(self, request, view)
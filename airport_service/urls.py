@@ -24,6 +24,8 @@ from drf_spectacular.views import (
     SpectacularRedocView
 )
 
+from airport_service.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/airport/", include("flights.urls", namespace="airport")),
@@ -35,5 +37,8 @@ urlpatterns = [
     path("api/v1/doc/redoc/", SpectacularRedocView.as_view(
         url_name="schema"), name="redoc"),
 
-    path("__debug__/", include("debug_toolbar.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.DEBUG:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
@@ -0,0 +1,205 @@
+"""
+Concurrent read throughput of the WSGI (sync) and ASGI (async) paths.
+
+The same number of clients keep requesting the flight list (or another
+endpoint with --endpoint) for a fixed time:
+
+    wsgi  one thread per client, sync views through the WSGI handler
+    asgi  one task per client on a single event loop, the async views in
+          flights/async_views.py through the ASGI handler
+
+Requests carry a real JWT and the API cache is replaced by a dummy one,
+so every request authenticates and queries the database:
+
+    python -m benchmarks.asgi_throughput --clients 32 --seconds 5
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.utils import (
+    benchmark_database,
+    percentile,
+    report,
+    setup_django
+)
+
+ENDPOINTS = ("flight-list", "flight-detail", "airport-list", "route-list")
+
+
+def create_data(flights):
+    from django.contrib.auth import get_user_model
+
+    from flights.models import (
+        Airplane,
+        AirplaneType,
+        Airport,
+        Crew,
+        Flight,
+        Route
+    )
+
+    user = get_user_model().objects.create_user(
+        email="bench@bench.com", password="1qazcde3"
+    )
+    route = Route.objects.create(
+        distance=1000,
+        source=Airport.objects.create(name="B1", closest_big_city="A"),
+        destination=Airport.objects.create(name="B2", closest_big_city="B"),
+    )
+    airplane = Airplane.objects.create(
+        name="Bench Airplane",
+        rows=30,
+        seats_in_row=6,
+        airplane_type=AirplaneType.objects.create(name="Bench"),
+    )
+    crew = Crew.objects.create(first_name="Bench", last_name="Pilot")
+    departure = datetime.now() + timedelta(days=1)
+    created = Flight.objects.bulk_create(
+        Flight(
+            route=route,
+            airplane=airplane,
+            departure_time=departure + timedelta(hours=i),
+            arrival_time=departure + timedelta(hours=i + 2),
+        )
+        for i in range(flights)
+    )
+    Flight.crew.through.objects.bulk_create(
+        Flight.crew.through(flight_id=flight.pk, crew_id=crew.pk)
+        for flight in created
+    )
+    return user, created[0]
+
+
+def url_for(endpoint, flight, asynchronous):
+    from django.urls import reverse
+
+    name = f"async-{endpoint}" if asynchronous else endpoint
+    args = (flight.pk,) if endpoint.endswith("detail") else ()
+    return reverse(f"flights:{name}", args=args)
+
+
+def summary(mode, clients, done, failed, latencies, elapsed):
+    latencies.sort()
+    return {
+        "mode": mode,
+        "clients": clients,
+        "requests": done,
+        "errors": failed,
+        "req_per_sec": round(done / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+    }
+
+
+def run_wsgi(url, headers, clients, seconds):
+    from django.db import connection
+    from django.test import Client
+
+    totals = {"done": 0, "failed": 0}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def serve():
+        client = Client()
+        done, failed, timings = 0, 0, []
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = client.get(url, headers=headers)
+                timings.append((time.perf_counter() - start) * 1000)
+                if response.status_code == 200:
+                    done += 1
+                else:
+                    failed += 1
+        finally:
+            connection.close()
+            with lock:
+                totals["done"] += done
+                totals["failed"] += failed
+                latencies.extend(timings)
+
+    workers = [threading.Thread(target=serve) for _ in range(clients)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return summary(
+        "wsgi", clients, totals["done"], totals["failed"], latencies,
+        time.perf_counter() - start
+    )
+
+
+def run_asgi(url, headers, clients, seconds):
+    from django.test import AsyncClient
+
+    totals = {"done": 0, "failed": 0}
+    latencies = []
+
+    async def serve(deadline):
+        client = AsyncClient()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code == 200:
+                totals["done"] += 1
+            else:
+                totals["failed"] += 1
+
+    async def main():
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(serve(deadline) for _ in range(clients)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return summary(
+        "asgi", clients, totals["done"], totals["failed"], latencies,
+        time.perf_counter() - start
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--flights", type=int, default=50)
+    parser.add_argument(
+        "--endpoint", choices=ENDPOINTS, default="flight-list"
+    )
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    with benchmark_database(), override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    }):
+        user, flight = create_data(args.flights)
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        rows = [
+            run_wsgi(
+                url_for(args.endpoint, flight, False),
+                headers, args.clients, args.seconds
+            ),
+            run_asgi(
+                url_for(args.endpoint, flight, True),
+                headers, args.clients, args.seconds
+            ),
+        ]
+    report(
+        f"Concurrent {args.endpoint} throughput, WSGI vs ASGI",
+        rows,
+        args.json
+    )
+
+
+if __name__ == "__main__":
+    main()
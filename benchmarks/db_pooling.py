@@ -0,0 +1,176 @@
+"""
+Flight list throughput with and without database connection reuse.
+
+Each mode serves GET /api/v1/airport/flights/ from several threads for a
+fixed time through the full request cycle (so connections are opened and
+closed exactly as in production):
+
+    none        a new connection per request (CONN_MAX_AGE=0)
+    persistent  CONN_MAX_AGE + CONN_HEALTH_CHECKS
+    pool        psycopg connection pool (OPTIONS["pool"])
+
+The API cache is replaced by a dummy one so every request hits the
+database. Needs the regular PostgreSQL DATABASES settings:
+
+    python -m benchmarks.db_pooling --threads 8 --seconds 5
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.utils import (
+    benchmark_database,
+    percentile,
+    report,
+    setup_django
+)
+
+MODES = ("none", "persistent", "pool")
+
+
+def configure(mode, pool_size):
+    from django.db import DEFAULT_DB_ALIAS, connections
+
+    connections.close_all()
+    connections[DEFAULT_DB_ALIAS].close_pool()
+    settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+    options = settings_dict.setdefault("OPTIONS", {})
+    options.pop("pool", None)
+    settings_dict["CONN_MAX_AGE"] = 0
+    settings_dict["CONN_HEALTH_CHECKS"] = mode == "persistent"
+    if mode == "persistent":
+        settings_dict["CONN_MAX_AGE"] = 60
+    elif mode == "pool":
+        options["pool"] = {"min_size": pool_size, "max_size": pool_size}
+
+
+def create_flights(count):
+    from flights.models import Airplane, AirplaneType, Airport, Flight, Route
+
+    route = Route.objects.create(
+        distance=1000,
+        source=Airport.objects.create(name="B1", closest_big_city="A"),
+        destination=Airport.objects.create(name="B2", closest_big_city="B"),
+    )
+    airplane = Airplane.objects.create(
+        name="Bench Airplane",
+        rows=30,
+        seats_in_row=6,
+        airplane_type=AirplaneType.objects.create(name="Bench"),
+    )
+    departure = datetime.now() + timedelta(days=1)
+    Flight.objects.bulk_create(
+        Flight(
+            route=route,
+            airplane=airplane,
+            departure_time=departure + timedelta(hours=i),
+            arrival_time=departure + timedelta(hours=i + 2),
+        )
+        for i in range(count)
+    )
+
+
+def run(mode, threads, seconds, pool_size):
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    configure(mode, pool_size)
+    user = get_user_model().objects.get(email="bench@bench.com")
+    url = reverse("flights:flight-list")
+
+    requests = []
+    failures = []
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def serve():
+        client = APIClient()
+        client.force_authenticate(user=user)
+        done, failed, timings = 0, 0, []
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+                if response.status_code == 200:
+                    done += 1
+                else:
+                    failed += 1
+        finally:
+            connection.close()
+            with lock:
+                requests.append(done)
+                failures.append(failed)
+                latencies.extend(timings)
+
+    workers = [threading.Thread(target=serve) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "threads": threads,
+        "requests": sum(requests),
+        "errors": sum(failures),
+        "req_per_sec": round(sum(requests) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--flights", type=int, default=50)
+    parser.add_argument(
+        "--pool-size", type=int, default=None,
+        help="Pool size in pool mode (defaults to --threads)."
+    )
+    parser.add_argument(
+        "--modes", default=",".join(MODES),
+        help="Comma separated subset of: " + ", ".join(MODES)
+    )
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    if connection.vendor != "postgresql":
+        sys.exit("This benchmark needs the PostgreSQL DATABASES settings.")
+
+    modes = [mode for mode in args.modes.split(",") if mode]
+    rows = []
+    with benchmark_database(), override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    }):
+        from django.contrib.auth import get_user_model
+
+        get_user_model().objects.create_user(
+            email="bench@bench.com", password="1qazcde3"
+        )
+        create_flights(args.flights)
+        for mode in modes:
+            rows.append(run(
+                mode, args.threads, args.seconds,
+                args.pool_size or args.threads
+            ))
+        configure("none", 0)
+    report("Flight list throughput by connection mode", rows, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,581 @@
+"""
+Latency and SQL query count of every endpoint in flights/urls.py and
+user/urls.py against a seeded database, checked against per-endpoint
+query budgets:
+
+    python -m benchmarks.endpoints --flights 2000 --tickets 20000 \\
+        --output results.json
+
+Requests authenticate with a real JWT. Each one runs in a transaction
+that is rolled back afterwards and starts with an empty cache, except for
+the requesting user (user/authentication.py), so writes can be repeated
+on the same data and reads measure a cache miss.
+
+Query counts must not depend on the amount of data, so budgets are fixed
+numbers. The run exits with status 1 when an endpoint exceeds its budget
+or answers with an unexpected status, and when a route of the two URL
+modules has no benchmark here (add one with its budget).
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Callable, NamedTuple, Optional
+
+from benchmarks.utils import benchmark_database, measure, report, setup_django
+
+# Routes without an endpoint of their own.
+UNBENCHMARKED = {"api-root"}
+
+
+class Endpoint(NamedTuple):
+    url_name: str
+    method: str
+    budget: int
+    args: tuple = ()
+    params: Optional[dict] = None
+    data: Any = None
+    user: Optional[str] = "user"
+    status: int = 200
+    format: str = "json"
+    setup: Optional[Callable] = None
+
+
+def seed(flights, tickets):
+    """
+    Airports, routes, airplanes, crew and flights spread over the next
+    months, and orders of two tickets each for a few hundred users.
+    """
+    from django.contrib.auth import get_user_model
+
+    from flights.models import (
+        Airplane,
+        AirplaneType,
+        Airport,
+        Crew,
+        Flight,
+        Order,
+        Route,
+        Ticket
+    )
+    from flights.seat_map import SeatMap
+
+    random.seed(0)
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(email=f"user{i}@bench.com") for i in range(200)
+    )
+    airports = Airport.objects.bulk_create(
+        Airport(name=f"Airport {i}", closest_big_city=f"City {i}")
+        for i in range(50)
+    )
+    routes = Route.objects.bulk_create(
+        Route(
+            source=source,
+            destination=destination,
+            distance=random.randint(200, 5000),
+        )
+        for source, destination in random.sample([
+            (source, destination)
+            for source in airports
+            for destination in airports
+            if source != destination
+        ], 300)
+    )
+    airplane_types = AirplaneType.objects.bulk_create(
+        AirplaneType(name=f"Type {i}") for i in range(5)
+    )
+    airplanes = Airplane.objects.bulk_create(
+        Airplane(
+            name=f"UR-{i:03}",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=airplane_types[i % len(airplane_types)],
+        )
+        for i in range(40)
+    )
+    crew = Crew.objects.bulk_create(
+        Crew(first_name=f"First {i}", last_name=f"Last {i}")
+        for i in range(100)
+    )
+
+    start = datetime.now().replace(minute=0, second=0, microsecond=0)
+    created = Flight.objects.bulk_create(
+        Flight(
+            route=random.choice(routes),
+            airplane=random.choice(airplanes),
+            departure_time=start + timedelta(hours=i),
+            arrival_time=start + timedelta(hours=i + random.randint(1, 8)),
+        )
+        for i in range(flights)
+    )
+    Flight.crew.through.objects.bulk_create(
+        Flight.crew.through(flight_id=flight.pk, crew_id=member.pk)
+        for flight in created
+        for member in random.sample(crew, 3)
+    )
+
+    # Tickets fill seats from the front of each cabin, two per order.
+    per_flight = max(tickets // max(flights, 1), 1)
+    orders = Order.objects.bulk_create(
+        Order(user=users[i % len(users)])
+        for i in range((per_flight * flights + 1) // 2)
+    )
+    seats = []
+    for flight in created:
+        seat_map = SeatMap(30, 6)
+        for index in range(min(per_flight, seat_map.capacity)):
+            row, seat = index // 6 + 1, index % 6 + 1
+            seat_map.take(row, seat)
+            seats.append((flight, row, seat))
+        flight.tickets_sold = seat_map.taken_count()
+        flight.seats_bitmap = seat_map.to_bytes()
+    Flight.objects.bulk_update(
+        created, ["tickets_sold", "seats_bitmap"], batch_size=1000
+    )
+    Ticket.objects.bulk_create(
+        (
+            Ticket(flight=flight, row=row, seat=seat, order=orders[i // 2])
+            for i, (flight, row, seat) in enumerate(seats)
+        ),
+        batch_size=5000,
+    )
+
+    user = users[0]
+    user.set_password("1qazcde3")
+    user.save()
+    order = Order.objects.filter(user=user).first()
+
+    # Objects nothing depends on, for the update and delete benchmarks:
+    # cascades grow with the data and have no fixed budget.
+    taken = {(route.source_id, route.destination_id) for route in routes}
+    source, destination = next(
+        (source, destination)
+        for source in airports
+        for destination in airports
+        if source != destination and (source.pk, destination.pk) not in taken
+    )
+    spare_airplane = Airplane.objects.create(
+        name="UR-SPARE",
+        rows=30,
+        seats_in_row=6,
+        airplane_type=airplane_types[0],
+    )
+    spare_order = Order.objects.create(user=user)
+    Ticket.objects.create(
+        flight=created[0], row=30, seat=1, order=spare_order
+    )
+    # The only order of its day, exported on its own.
+    spare_order.created_at = start - timedelta(days=1)
+    Order.objects.filter(pk=spare_order.pk).update(
+        created_at=spare_order.created_at
+    )
+    return {
+        "user": user,
+        "admin": get_user_model().objects.create_superuser(
+            email="admin@bench.com", password="1qazcde3"
+        ),
+        "airport": airports[0],
+        "route": routes[0],
+        "airplane": airplanes[0],
+        "airplane_type": airplane_types[0],
+        "crew": crew,
+        "flight": created[len(created) // 2],
+        "order": order,
+        "spare": {
+            "airport": Airport.objects.create(
+                name="Spare", closest_big_city="Spare"
+            ),
+            "airplanetype": AirplaneType.objects.create(name="Spare"),
+            "airplane": spare_airplane,
+            "route": Route.objects.create(
+                source=source, destination=destination, distance=100
+            ),
+            "crew": Crew.objects.create(first_name="Spare", last_name="Crew"),
+            "flight": Flight.objects.create(
+                route=routes[0],
+                airplane=spare_airplane,
+                departure_time=start,
+                arrival_time=start + timedelta(hours=2),
+            ),
+            "order": spare_order,
+        },
+    }
+
+
+def png():
+    from PIL import Image
+
+    image = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(image, format="PNG")
+    image.name = "airplane.png"
+    image.seek(0)
+    return image
+
+
+def model_endpoints(basename, instance, spare, budgets, payload, patch):
+    """
+    list, retrieve, create, update, partial_update and destroy of a
+    router-registered viewset. Budgets are in that order; updates and
+    deletes go to `spare`, which nothing else depends on.
+    """
+    list_name = f"flights:{basename}-list"
+    detail_name = f"flights:{basename}-detail"
+    (
+        list_budget,
+        retrieve_budget,
+        create_budget,
+        update_budget,
+        partial_update_budget,
+        destroy_budget,
+    ) = budgets
+    return [
+        Endpoint(list_name, "GET", list_budget),
+        Endpoint(detail_name, "GET", retrieve_budget, args=(instance.pk,)),
+        Endpoint(
+            list_name, "POST", create_budget, data=payload,
+            user="admin", status=201,
+        ),
+        Endpoint(
+            detail_name, "PUT", update_budget, args=(spare.pk,),
+            data=payload, user="admin",
+        ),
+        Endpoint(
+            detail_name, "PATCH", partial_update_budget, args=(spare.pk,),
+            data=patch, user="admin",
+        ),
+        Endpoint(
+            detail_name, "DELETE", destroy_budget, args=(spare.pk,),
+            user="admin", status=204,
+        ),
+    ]
+
+
+def endpoints(data):
+    """Every endpoint with the requests that benchmark it"""
+    from flights import holds
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    flight = data["flight"]
+    route = data["route"]
+    spare = data["spare"]
+    day = flight.departure_time.date().isoformat()
+    day_before = spare["order"].created_at.date().isoformat()
+    free_seat = {"row": 30, "seat": 6}
+    hold = {}
+
+    def create_hold():
+        hold.update(holds.create_hold(
+            flight, [(free_seat["row"], free_seat["seat"])], data["user"].pk
+        ))
+
+    def hold_id():
+        return hold["id"]
+
+    refresh = str(RefreshToken.for_user(data["user"]))
+    return [
+        *model_endpoints(
+            "flight", flight, spare["flight"], (3, 2, 10, 11, 3, 4),
+            payload={
+                "route": route.pk,
+                "airplane": spare["airplane"].pk,
+                "departure_time": flight.departure_time.isoformat(),
+                "arrival_time": flight.arrival_time.isoformat(),
+                "crew": [member.pk for member in data["crew"][:3]],
+            },
+            patch={"arrival_time": flight.arrival_time.isoformat()},
+        ),
+        Endpoint(
+            "flights:flight-list", "GET", 3,
+            params={"source": flight.route.source_id, "departure_date": day},
+        ),
+        *model_endpoints(
+            "airplane", data["airplane"], spare["airplane"],
+            (2, 2, 2, 4, 3, 6),
+            payload={
+                "name": "UR-999",
+                "rows": 30,
+                "seats_in_row": 6,
+                "airplane_type": data["airplane_type"].pk,
+            },
+            patch={"name": "UR-998"},
+        ),
+        Endpoint(
+            "flights:airplane-upload-image", "POST", 3,
+            args=(spare["airplane"].pk,), data={"image": png},
+            user="admin", format="multipart",
+        ),
+        *model_endpoints(
+            "airport", data["airport"], spare["airport"], (2, 1, 1, 2, 2, 4),
+            payload={"name": "Renamed", "closest_big_city": "City"},
+            patch={"name": "Renamed"},
+        ),
+        *model_endpoints(
+            "airplanetype", data["airplane_type"], spare["airplanetype"],
+            (2, 1, 1, 2, 2, 3),
+            payload={"name": "Renamed"},
+            patch={"name": "Renamed"},
+        ),
+        *model_endpoints(
+            "route", route, spare["route"], (2, 1, 3, 4, 2, 3),
+            payload={
+                "distance": 100,
+                "source": spare["route"].source_id,
+                "destination": spare["route"].destination_id,
+            },
+            patch={"distance": 100},
+        ),
+        Endpoint(
+            "flights:route-list", "GET", 2,
+            params={"source": route.source_id},
+        ),
+        *model_endpoints(
+            "crew", data["crew"][0], spare["crew"], (2, 1, 1, 2, 2, 3),
+            payload={"first_name": "Renamed", "last_name": "Pilot"},
+            patch={"first_name": "Renamed"},
+        ),
+        # Orders belong to the user that makes them.
+        Endpoint("flights:order-list", "GET", 3),
+        Endpoint(
+            "flights:order-detail", "GET", 3, args=(data["order"].pk,)
+        ),
+        Endpoint(
+            "flights:order-list", "POST", 6,
+            data={"tickets": [{**free_seat, "flight": flight.pk}]},
+            status=201,
+        ),
+        Endpoint(
+            "flights:order-detail", "PATCH", 3, args=(spare["order"].pk,),
+            data={},
+        ),
+        Endpoint(
+            "flights:order-detail", "DELETE", 6, args=(spare["order"].pk,),
+            status=204,
+        ),
+        # seat holds
+        Endpoint(
+            "flights:seat-hold-list", "POST", 1,
+            data={"flight": flight.pk, "seats": [free_seat]},
+            status=201,
+        ),
+        Endpoint(
+            "flights:seat-hold-detail", "GET", 0, args=(hold_id,),
+            setup=create_hold,
+        ),
+        Endpoint(
+            "flights:seat-hold-detail", "DELETE", 0, args=(hold_id,),
+            status=204, setup=create_hold,
+        ),
+        # search, exports and stats
+        Endpoint(
+            "flights:itineraries", "GET", 1,
+            params={
+                "origin": route.source_id,
+                "destination": route.destination_id,
+                "date": day,
+            },
+        ),
+        Endpoint(
+            "flights:order-export", "GET", 2, args=("ndjson",),
+            params={"created_from": day_before, "created_to": day_before},
+            user="admin",
+        ),
+        Endpoint("flights:cache-stats", "GET", 0, user="admin"),
+        # async read endpoints
+        Endpoint("flights:async-flight-list", "GET", 3),
+        Endpoint("flights:async-flight-detail", "GET", 2, args=(flight.pk,)),
+        Endpoint("flights:async-airport-list", "GET", 2),
+        Endpoint(
+            "flights:async-airport-detail", "GET", 1,
+            args=(data["airport"].pk,),
+        ),
+        Endpoint("flights:async-route-list", "GET", 2),
+        Endpoint("flights:async-route-detail", "GET", 1, args=(route.pk,)),
+        Endpoint("flights:async-order-list", "GET", 3),
+        Endpoint(
+            "flights:async-order-detail", "GET", 3, args=(data["order"].pk,)
+        ),
+        # users
+        Endpoint(
+            "user:create", "POST", 2,
+            data={"email": "new@bench.com", "password": "1qazcde3"},
+            user=None, status=201,
+        ),
+        Endpoint(
+            "user:token_obtain_pair", "POST", 1,
+            data={"email": data["user"].email, "password": "1qazcde3"},
+            user=None,
+        ),
+        Endpoint(
+            "user:token_refresh", "POST", 0, data={"refresh": refresh},
+            user=None,
+        ),
+        Endpoint(
+            "user:token_verify", "POST", 0, data={"token": refresh},
+            user=None,
+        ),
+        Endpoint("user:manage_user", "GET", 0),
+        Endpoint(
+            "user:manage_user", "PUT", 3,
+            data={"email": data["user"].email, "password": "1qazcde3"},
+        ),
+        Endpoint(
+            "user:manage_user", "PATCH", 1, data={"first_name": "Bench"},
+        ),
+    ]
+
+
+def missing_routes(benchmarked):
+    """URL names in flights/urls.py and user/urls.py without a benchmark"""
+    from flights.urls import urlpatterns as flight_patterns
+    from user.urls import urlpatterns as user_patterns
+
+    def names(patterns, namespace):
+        for pattern in patterns:
+            if hasattr(pattern, "url_patterns"):
+                yield from names(pattern.url_patterns, namespace)
+            elif pattern.name and pattern.name not in UNBENCHMARKED:
+                yield f"{namespace}:{pattern.name}"
+
+    routes = set(names(flight_patterns, "flights"))
+    routes.update(names(user_patterns, "user"))
+    return sorted(routes - set(benchmarked))
+
+
+def run(endpoints, tokens, repeat):
+    from django.core.cache import cache
+    from django.db import transaction
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from user.authentication import CachedJWTAuthentication
+
+    rows = []
+    for endpoint in endpoints:
+        client = APIClient()
+        headers = {}
+        if endpoint.user:
+            headers["Authorization"] = f"Bearer {tokens[endpoint.user]}"
+        result = {}
+
+        def setup():
+            cache.clear()
+            if endpoint.user:
+                # Users are cached for a minute, unlike responses
+                CachedJWTAuthentication().get_user(tokens[endpoint.user])
+            if endpoint.setup:
+                endpoint.setup()
+
+        def call():
+            args = [arg() if callable(arg) else arg for arg in endpoint.args]
+            data = endpoint.data
+            if isinstance(data, dict):
+                data = {
+                    key: value() if callable(value) else value
+                    for key, value in data.items()
+                }
+            with transaction.atomic():
+                response = getattr(client, endpoint.method.lower())(
+                    reverse(endpoint.url_name, args=args),
+                    data if endpoint.method != "GET" else endpoint.params,
+                    format=endpoint.format if data is not None else None,
+                    headers=headers,
+                )
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                transaction.set_rollback(True)
+            result["status"] = response.status_code
+
+        timings = measure(call, repeat, setup)
+        over_budget = timings["queries"] > endpoint.budget
+        wrong_status = result["status"] != endpoint.status
+        rows.append({
+            "endpoint": endpoint.url_name,
+            "method": endpoint.method,
+            "params": endpoint.params or {},
+            "status": result["status"],
+            "budget": endpoint.budget,
+            **timings,
+            "ok": not (over_budget or wrong_status),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", type=int, default=2000)
+    parser.add_argument("--tickets", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--only", help="Run the endpoints whose URL name contains this."
+    )
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--output", help="Also write the JSON results here.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    # Production doesn't run the debug toolbar, and its host lookup on
+    # every request would dominate the timings.
+    middleware = [
+        name for name in settings.MIDDLEWARE if "debug_toolbar" not in name
+    ]
+    with tempfile.TemporaryDirectory() as media_root, override_settings(
+        MEDIA_ROOT=media_root, MIDDLEWARE=middleware
+    ), benchmark_database():
+        data = seed(args.flights, args.tickets)
+        selected = endpoints(data)
+        missing = missing_routes(endpoint.url_name for endpoint in selected)
+        if args.only:
+            selected = [
+                endpoint for endpoint in selected
+                if args.only in endpoint.url_name
+            ]
+        tokens = {
+            role: AccessToken.for_user(data[role])
+            for role in ("user", "admin")
+        }
+        rows = run(selected, tokens, args.repeat)
+
+    title = (
+        f"Endpoint latency and query budgets "
+        f"({args.flights} flights, {args.tickets} tickets)"
+    )
+    report(title, [
+        {**row, "params": json.dumps(row["params"]) if row["params"] else ""}
+        for row in rows
+    ], args.json)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({
+                "benchmark": title,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "flights": args.flights,
+                "tickets": args.tickets,
+                "repeat": args.repeat,
+                "missing": missing,
+                "results": rows,
+            }, file, indent=2)
+
+    failed = [row for row in rows if not row["ok"]]
+    for row in failed:
+        print(
+            f"FAIL {row['method']} {row['endpoint']}: {row['queries']} "
+            f"queries (budget {row['budget']}), status {row['status']}",
+            file=sys.stderr,
+        )
+    for name in missing:
+        print(f"MISSING no benchmark for {name}", file=sys.stderr)
+    if failed or missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
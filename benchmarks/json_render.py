@@ -0,0 +1,63 @@
+"""
+Render throughput of FlightListSerializer pages with DRF's JSONRenderer
+(stdlib json) and with FastJSONRenderer (orjson). The pages are
+serialized once, so only rendering them to bytes is timed.
+
+    python -m benchmarks.json_render --sizes 100,1000,5000
+"""
+import argparse
+
+from benchmarks.list_serialization import seed
+from benchmarks.utils import benchmark_database, measure, report, setup_django
+
+
+def run(sizes, repeat):
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from airport_service.fastjson import FastJSONRenderer
+    from flights.views import FlightViewSet
+
+    seed(max(sizes))
+    request = Request(APIRequestFactory().get("/"))
+    view = FlightViewSet(request=request, action="list", format_kwarg=None)
+    queryset = view.get_queryset()
+
+    rows = []
+    for size in sizes:
+        data = view.get_serializer_class()(
+            list(queryset[:size]), many=True, context={"request": request}
+        ).data
+        row = {"rows": size}
+        for name, renderer in (
+            ("stdlib", JSONRenderer()),
+            ("orjson", FastJSONRenderer()),
+        ):
+            assert renderer.render(data) == JSONRenderer().render(data)
+            timing = measure(lambda: renderer.render(data), repeat)
+            row[f"{name}_ms"] = timing["p50_ms"]
+            row[f"{name}_rows_per_s"] = round(
+                size / timing["p50_ms"] * 1000
+            )
+        row["speedup"] = round(row["stdlib_ms"] / row["orjson_ms"], 1)
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100,500,1000,5000")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    with benchmark_database():
+        rows = run(sizes, args.repeat)
+    report("Flight list rendering, stdlib json vs orjson", rows, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Serialization throughput (rows/sec) of the list endpoints' pages with
+the DRF fields and with the fast path (settings.FAST_LIST_SERIALIZATION).
+Pages are loaded once with the views' querysets, so only serializing and
+rendering them to JSON is timed.
+
+    python -m benchmarks.list_serialization --sizes 100,250,500,1000
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks.utils import benchmark_database, measure, report, setup_django
+
+
+def seed(count):
+    from flights.models import (
+        Airplane,
+        AirplaneType,
+        Airport,
+        Crew,
+        Flight,
+        Route
+    )
+
+    airports = Airport.objects.bulk_create(
+        Airport(name=f"Airport {index}", closest_big_city=f"City {index}")
+        for index in range(50)
+    )
+    routes = Route.objects.bulk_create(
+        Route(
+            distance=100 + index,
+            source=airports[index % 50],
+            destination=airports[(index + 1) % 50],
+        )
+        for index in range(count)
+    )
+    airplane_type = AirplaneType.objects.create(name="Bench")
+    airplanes = Airplane.objects.bulk_create(
+        Airplane(
+            name=f"Airplane {index}",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=airplane_type,
+            image=(
+                f"upload/airplanes/airplane-{index}.jpg" if index % 2 else None
+            ),
+        )
+        for index in range(count)
+    )
+    crew = Crew.objects.bulk_create(
+        Crew(first_name=f"First {index}", last_name=f"Last {index}")
+        for index in range(count)
+    )
+    start = datetime(2030, 1, 1)
+    flights = Flight.objects.bulk_create(
+        Flight(
+            departure_time=start + timedelta(hours=index),
+            arrival_time=start + timedelta(hours=index + 2),
+            route=routes[index % len(routes)],
+            airplane=airplanes[index % len(airplanes)],
+        )
+        for index in range(count)
+    )
+    Flight.crew.through.objects.bulk_create(
+        Flight.crew.through(flight=flight, crew=crew[(index + offset) % count])
+        for index, flight in enumerate(flights)
+        for offset in range(3)
+    )
+
+
+def run(sizes, repeat):
+    from django.test import override_settings
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from flights.views import (
+        AirplaneViewSet,
+        CrewViewSet,
+        FlightViewSet,
+        RouteViewSet
+    )
+
+    seed(max(sizes))
+    request = Request(APIRequestFactory().get("/"))
+    renderer = JSONRenderer()
+
+    rows = []
+    for view_class in (FlightViewSet, RouteViewSet, AirplaneViewSet,
+                       CrewViewSet):
+        view = view_class(request=request, action="list", format_kwarg=None)
+        queryset = view.get_queryset()
+        serializer_class = view.get_serializer_class()
+        for size in sizes:
+            page = list(queryset[:size])
+            row = {"serializer": serializer_class.__name__, "rows": size}
+            for name, fast in (("drf", False), ("fast", True)):
+                def serialize():
+                    renderer.render(serializer_class(
+                        page, many=True, context={"request": request}
+                    ).data)
+
+                with override_settings(FAST_LIST_SERIALIZATION=fast):
+                    timing = measure(serialize, repeat)
+                row[f"{name}_ms"] = timing["p50_ms"]
+                row[f"{name}_rows_per_s"] = round(
+                    size / timing["p50_ms"] * 1000
+                )
+            row["speedup"] = round(row["drf_ms"] / row["fast_ms"], 1)
+            rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100,250,500,1000")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    with benchmark_database():
+        rows = run(sizes, args.repeat)
+    report("List page serialization, DRF fields vs fast path", rows, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Query count and latency of POST /api/v1/airport/orders/ as the number of
+tickets per order grows.
+
+    python -m benchmarks.order_create --sizes 1,2,4,9,20 --repeat 30
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks.utils import benchmark_database, measure, report, setup_django
+
+
+def run(sizes, repeat):
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from flights.models import (
+        Airplane,
+        AirplaneType,
+        Airport,
+        Flight,
+        Order,
+        Route
+    )
+
+    user = get_user_model().objects.create_user(
+        email="bench@bench.com", password="1qazcde3"
+    )
+    route = Route.objects.create(
+        distance=1000,
+        source=Airport.objects.create(name="Bench 1", closest_big_city="A"),
+        destination=Airport.objects.create(
+            name="Bench 2", closest_big_city="B"
+        ),
+    )
+    airplane = Airplane.objects.create(
+        name="Bench Airplane",
+        rows=60,
+        seats_in_row=10,
+        airplane_type=AirplaneType.objects.create(name="Bench"),
+    )
+    flight = Flight.objects.create(
+        departure_time=datetime.now() + timedelta(days=1),
+        arrival_time=datetime.now() + timedelta(days=1, hours=2),
+        route=route,
+        airplane=airplane,
+    )
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("flights:order-list")
+
+    def reset():
+        Order.objects.all().delete()
+        Flight.objects.filter(pk=flight.pk).update(
+            tickets_sold=0, seats_bitmap=b""
+        )
+
+    rows = []
+    for size in sizes:
+        payload = {
+            "tickets": [
+                {
+                    "row": index // airplane.seats_in_row + 1,
+                    "seat": index % airplane.seats_in_row + 1,
+                    "flight": flight.pk,
+                }
+                for index in range(size)
+            ]
+        }
+
+        def create_order():
+            response = client.post(url, payload, format="json")
+            assert response.status_code == 201, response.data
+
+        rows.append({"tickets": size, **measure(create_order, repeat, reset)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1,2,4,9,20,50")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    with benchmark_database():
+        rows = run(sizes, args.repeat)
+    report("Order creation by tickets per order", rows, args.json)
+
+
+if __name__ == "__main__":
+    main()
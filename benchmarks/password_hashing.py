@@ -0,0 +1,127 @@
+"""
+Password hashing cost: logins per second and core with each hasher of
+settings.PASSWORD_HASHERS, then a burst of concurrent logins through the
+hashing pool (user/hashers.py), timing a read request's serialization
+alongside it to see how much the burst slows it down.
+
+    python -m benchmarks.password_hashing --burst 32
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import percentile, report, setup_django
+
+PASSWORD = "1qazcde3"
+
+
+def per_core(repeat):
+    from django.contrib.auth.hashers import get_hashers
+
+    preferred = get_hashers()[0].algorithm
+    rows = []
+    for hasher in get_hashers():
+        try:
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+        except ValueError:
+            # Optional library (argon2-cffi) not installed
+            continue
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hasher.verify(PASSWORD, encoded)
+            timings.append((time.perf_counter() - start) * 1000)
+        p50 = round(statistics.median(timings), 3)
+        rows.append({
+            "hasher": hasher.algorithm,
+            "preferred": hasher.algorithm == preferred,
+            "p50_ms": p50,
+            "logins_per_s_per_core": round(1000 / p50, 1),
+        })
+    return rows
+
+
+def read_timings(stop):
+    from airport_service.fastjson import FastJSONRenderer
+
+    page = [
+        {"id": index, "name": f"Airport {index}", "city": f"City {index}"}
+        for index in range(200)
+    ]
+    renderer = FastJSONRenderer()
+    timings = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        renderer.render(page)
+        timings.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.001)
+    return timings
+
+
+def burst(size):
+    from django.conf import settings
+    from django.contrib.auth.hashers import check_password, make_password
+
+    from user.hashers import HashingBusy
+
+    encoded = make_password(PASSWORD)
+
+    def login():
+        start = time.perf_counter()
+        try:
+            check_password(PASSWORD, encoded)
+        except HashingBusy:
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(1) as reader:
+        idle = reader.submit(read_timings, stop)
+        time.sleep(0.5)
+        stop.set()
+        idle = idle.result()
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(size + 1) as clients:
+        reads = clients.submit(read_timings, stop)
+        start = time.perf_counter()
+        logins = list(clients.map(lambda _: login(), range(size)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        reads = reads.result()
+
+    done = [timing for timing in logins if timing is not None]
+    return [{
+        "logins": size,
+        "workers": settings.PASSWORD_HASHING["WORKERS"],
+        "rejected": size - len(done),
+        "logins_per_s": round(len(done) / elapsed, 1),
+        "login_p50_ms": round(statistics.median(done), 3) if done else None,
+        "login_p95_ms": (
+            round(percentile(sorted(done), 0.95), 3) if done else None
+        ),
+        "read_idle_ms": round(statistics.median(idle), 3),
+        "read_burst_ms": round(statistics.median(reads), 3),
+    }]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--burst", type=int, default=32)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    report(
+        "Password verification per core", per_core(args.repeat), args.json
+    )
+    report(
+        "Login burst through the hashing pool", burst(args.burst), args.json
+    )
+
+
+if __name__ == "__main__":
+    main()
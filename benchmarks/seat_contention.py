@@ -0,0 +1,149 @@
+"""
+Concurrent booking stress test: many threads keep ordering random seats
+from a small pool on the same flight. Reports committed orders per second
+and conflicts, and fails (exit code 1) if any seat was sold twice or the
+seat map / tickets_sold counter disagree with the tickets table.
+
+Row locks are only meaningful on PostgreSQL, run it against the regular
+DATABASES settings:
+
+    python -m benchmarks.seat_contention --threads 32 --seconds 10
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.utils import benchmark_database, report, setup_django
+
+
+def run(threads, seconds, rows, seats_per_order):
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, connection
+    from django.db.models import Count
+    from rest_framework.exceptions import ValidationError
+
+    from flights.models import (
+        Airplane,
+        AirplaneType,
+        Airport,
+        Flight,
+        Route,
+        Ticket
+    )
+    from flights.serializers import OrderSerializer
+
+    user = get_user_model().objects.create_user(
+        email="bench@bench.com", password="1qazcde3"
+    )
+    airplane = Airplane.objects.create(
+        name="Bench Airplane",
+        rows=rows,
+        seats_in_row=6,
+        airplane_type=AirplaneType.objects.create(name="Bench"),
+    )
+    flight = Flight.objects.create(
+        departure_time=datetime.now() + timedelta(days=1),
+        arrival_time=datetime.now() + timedelta(days=1, hours=2),
+        route=Route.objects.create(
+            distance=1000,
+            source=Airport.objects.create(name="B1", closest_big_city="A"),
+            destination=Airport.objects.create(
+                name="B2", closest_big_city="B"
+            ),
+        ),
+        airplane=airplane,
+    )
+    seats = [
+        (row, seat)
+        for row in range(1, airplane.rows + 1)
+        for seat in range(1, airplane.seats_in_row + 1)
+    ]
+
+    stats = {"committed": 0, "conflicts": 0, "errors": 0}
+    stats_lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def book():
+        outcome = {"committed": 0, "conflicts": 0, "errors": 0}
+        try:
+            while time.perf_counter() < deadline:
+                chosen = random.sample(seats, seats_per_order)
+                serializer = OrderSerializer(data={"tickets": [
+                    {"row": row, "seat": seat, "flight": flight.pk}
+                    for row, seat in chosen
+                ]})
+                try:
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save(user=user)
+                    outcome["committed"] += 1
+                except ValidationError:
+                    outcome["conflicts"] += 1
+                except OperationalError:
+                    outcome["errors"] += 1
+        finally:
+            connection.close()
+            with stats_lock:
+                for key, value in outcome.items():
+                    stats[key] += value
+
+    workers = [threading.Thread(target=book) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    flight.refresh_from_db()
+    tickets = Ticket.objects.filter(flight=flight).count()
+    double_sold = (
+        Ticket.objects.values("flight", "row", "seat")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .count()
+    )
+    return {
+        "threads": threads,
+        "seconds": round(elapsed, 2),
+        "committed_orders": stats["committed"],
+        "orders_per_sec": round(stats["committed"] / elapsed, 1),
+        "conflicts": stats["conflicts"],
+        "db_errors": stats["errors"],
+        "tickets": tickets,
+        "double_sold_seats": double_sold,
+        "seat_map_consistent": (
+            flight.get_seat_map().taken_count()
+            == flight.tickets_sold
+            == tickets
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument(
+        "--rows", type=int, default=30,
+        help="Rows of the 6-abreast test airplane (the contended pool)."
+    )
+    parser.add_argument("--seats-per-order", type=int, default=2)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        result = run(
+            args.threads, args.seconds, args.rows, args.seats_per_order
+        )
+    report("Concurrent booking of one flight", [result], args.json)
+
+    if result["double_sold_seats"] or not result["seat_map_consistent"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
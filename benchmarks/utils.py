@@ -0,0 +1,109 @@
+"""
+Shared helpers for the benchmark scripts in this package.
+
+Every benchmark runs against a throwaway test database created from the
+configured DATABASES (the same way ``manage.py test`` does), so it never
+touches real data. Run them from the project root, e.g.:
+
+    python -m benchmarks.order_create --json
+"""
+import json
+import math
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+TRANSACTION_STATEMENTS = (
+    "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE SAVEPOINT"
+)
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "airport_service.settings")
+    import django
+
+    django.setup()
+
+
+def percentile(timings, share):
+    """Nearest-rank percentile of sorted timings (share in 0..1)"""
+    return timings[max(math.ceil(len(timings) * share) - 1, 0)]
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment
+    )
+
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keepdb
+    )
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=keepdb
+        )
+        teardown_test_environment()
+
+
+def measure(func, repeat, setup=None):
+    """
+    Call func() `repeat` times and return latency percentiles (ms) and
+    the number of SQL queries of the last call. `setup` runs before every
+    call, outside of the measured time. Transaction control statements
+    are not counted, as only some backends log them.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = sum(
+            not query["sql"].startswith(TRANSACTION_STATEMENTS)
+            for query in captured
+        )
+
+    timings.sort()
+    return {
+        "queries": queries,
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+    }
+
+
+def report(title, rows, as_json=False):
+    if as_json:
+        print(json.dumps({"benchmark": title, "results": rows}, indent=2))
+        return
+
+    print(title)
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = [
+        max(len(str(column)), *(len(str(row[column])) for row in rows))
+        for column in columns
+    ]
+    print("  ".join(
+        str(column).ljust(width) for column, width in zip(columns, widths)
+    ))
+    for row in rows:
+        print("  ".join(
+            str(row[column]).ljust(width)
+            for column, width in zip(columns, widths)
+        ))
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FlightsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "flights"
+
+    def ready(self):
+        import flights.checks  # noqa: F401
+        import flights.signals  # noqa: F401
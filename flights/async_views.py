@@ -0,0 +1,119 @@
+"""
+Async (ASGI) read-only versions of the busiest endpoints, mounted under
+/api/v1/airport/async/.
+
+They share querysets, filters, serializers, pagination and the response
+cache with flights/views.py, but count and fetch rows with the async
+ORM, so a slow query doesn't tie up a worker thread when the project is
+served by an ASGI server (airport_service/asgi.py).
+"""
+from adrf.viewsets import GenericViewSet
+from drf_spectacular.utils import extend_schema
+from rest_framework.response import Response
+
+from flights import holds
+from flights.cache import CachedResponseMixin
+from flights.models import Airport
+from flights.pagination import apaginate_queryset
+from flights.serializers import AirportSerializer
+from flights.views import (
+    FLIGHT_LIST_PARAMETERS,
+    FLIGHT_RETRIEVE_PARAMETERS,
+    FlightQuerysetMixin,
+    OrderQuerysetMixin,
+    RouteQuerysetMixin,
+    SparseFieldsetMixin
+)
+from user.permissions import IsAdminAllOrIsAuthenticatedReadOnly
+
+
+class AsyncReadOnlyViewSet(
+    SparseFieldsetMixin,
+    CachedResponseMixin,
+    GenericViewSet
+):
+    """
+    Async list/retrieve actions. Authentication, permissions and
+    throttles run in a worker thread (adrf); querysets must select or
+    prefetch everything their serializer reads, since lazy loading isn't
+    allowed in async code. Anything else serializers read from the cache
+    is loaded by apreload(), so nothing blocks the event loop.
+    """
+
+    async def apreload(self, objects):
+        """Extra serializer context for the objects about to be serialized"""
+        return {}
+
+    async def aget_serializer(self, instance, many=False):
+        context = self.get_serializer_context()
+        context.update(await self.apreload(instance if many else [instance]))
+        return self.get_serializer(instance, many=many, context=context)
+
+    async def list(self, request, *args, **kwargs):
+        """Async version of the list endpoint"""
+        return await self.acached_response(
+            self.alist, request, *args, **kwargs
+        )
+
+    async def retrieve(self, request, *args, **kwargs):
+        """Async version of the detail endpoint"""
+        return await self.acached_response(
+            self.aretrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await apaginate_queryset(
+            self.paginator, queryset, request, self
+        )
+        if page is None:
+            objects = [obj async for obj in queryset]
+            serializer = await self.aget_serializer(objects, many=True)
+            return Response(serializer.data)
+        serializer = await self.aget_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = await self.aget_serializer(instance)
+        return Response(serializer.data)
+
+
+class AsyncFlightViewSet(FlightQuerysetMixin, AsyncReadOnlyViewSet):
+    async def apreload(self, flights):
+        """Seat holds, which the serializers would read synchronously"""
+        if not self.shows_holds():
+            return {}
+        self.holds_expire_in = await holds.aexpires_in(
+            flight.pk for flight in flights
+        )
+        if self.action == "retrieve":
+            return {"held_seats": await holds.aheld_seats(flights[0].pk)}
+        return {"held_counts": await holds.aheld_counts(
+            flight.pk for flight in flights
+        )}
+
+    @extend_schema(parameters=FLIGHT_LIST_PARAMETERS)
+    async def list(self, request, *args, **kwargs):
+        """Async version of the flight list"""
+        return await super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=FLIGHT_RETRIEVE_PARAMETERS)
+    async def retrieve(self, request, *args, **kwargs):
+        """Async version of the flight details"""
+        return await super().retrieve(request, *args, **kwargs)
+
+
+class AsyncAirportViewSet(AsyncReadOnlyViewSet):
+    queryset = Airport.objects.all()
+    cache_dependencies = (Airport,)
+    serializer_class = AirportSerializer
+    permission_classes = [IsAdminAllOrIsAuthenticatedReadOnly, ]
+
+
+class AsyncRouteViewSet(RouteQuerysetMixin, AsyncReadOnlyViewSet):
+    pass
+
+
+class AsyncOrderViewSet(OrderQuerysetMixin, AsyncReadOnlyViewSet):
+    pass
@@ -0,0 +1,376 @@
+"""
+Versioned read-through cache for API responses (settings.API_CACHE).
+
+Every model a cached viewset depends on has a version (generation)
+number in the cache. Cache keys embed the current versions, and model
+signals bump them, so a write makes all dependent entries unreachable
+at once and they simply age out. Hits and misses are counted per
+viewset in the same cache, which must be shared (not locmem) when
+several workers serve the API.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from airport_service import metrics
+
+VERSION_KEY = "api_cache:version:{label}"
+STATS_KEY = "api_cache:stats:{name}:{outcome}"
+RESPONSE_KEY = "api_cache:response:{name}:{digest}"
+STALE_KEY = "api_cache:stale:{name}:{digest}"
+LOCK_KEY = "api_cache:lock:{key}"
+
+_cached_names = set()
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key within this process into
+    one: the first caller runs the function, the others wait for and
+    share its result (or exception).
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+_single_flight = SingleFlight()
+
+
+def _cache():
+    return caches[settings.API_CACHE["CACHE_ALIAS"]]
+
+
+def _initial_version():
+    # Never restart from 0 after an eviction, so entries written for an
+    # older version can't become reachable again.
+    return int(time.time() * 1000)
+
+
+def _incr(key, initial):
+    cache = _cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, initial, timeout=None):
+            return initial
+        return cache.incr(key)
+
+
+async def _aincr(key, initial):
+    cache = _cache()
+    try:
+        return await cache.aincr(key)
+    except ValueError:
+        if await cache.aadd(key, initial, timeout=None):
+            return initial
+        return await cache.aincr(key)
+
+
+def get_versions(models) -> list[int]:
+    cache = _cache()
+    keys = [
+        VERSION_KEY.format(label=model._meta.label_lower)
+        for model in models
+    ]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(models) -> list[int]:
+    """get_versions() for async views"""
+    cache = _cache()
+    keys = [
+        VERSION_KEY.format(label=model._meta.label_lower)
+        for model in models
+    ]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, _initial_version(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model) -> None:
+    _incr(
+        VERSION_KEY.format(label=model._meta.label_lower),
+        _initial_version()
+    )
+
+
+def invalidate(model) -> None:
+    """
+    Bump right away and again on commit: a reader running between the
+    two could otherwise cache pre-commit data under the new version.
+    """
+    bump_version(model)
+    transaction.on_commit(lambda: bump_version(model))
+
+
+def _build_once(key, stale_key, build, timeout):
+    """
+    Let one worker at a time rebuild `key`. The others get the last
+    value (kept under `stale_key` across invalidations) or wait a little
+    for the fresh one, and only build it themselves if neither shows up.
+    """
+    cache = _cache()
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    lock_key = LOCK_KEY.format(key=key)
+    if cache.add(lock_key, 1, timeout=settings.API_CACHE["LOCK_TIMEOUT"]):
+        try:
+            data = build()
+            if data is not None:
+                if callable(timeout):
+                    timeout = timeout()
+                cache.set(key, data, timeout)
+                cache.set(
+                    stale_key, data, settings.API_CACHE["STALE_TIMEOUT"]
+                )
+            return data
+        finally:
+            cache.delete(lock_key)
+
+    data = cache.get(stale_key)
+    if data is not None:
+        return data
+    deadline = time.monotonic() + settings.API_CACHE["LOCK_WAIT"]
+    while time.monotonic() < deadline:
+        time.sleep(0.01)
+        data = cache.get(key)
+        if data is not None:
+            return data
+    return build()
+
+
+def coalesce(key, stale_key, build, timeout):
+    """
+    Read-through `key` with `build` (returning None means "don't cache"),
+    sharing one build between concurrent misses in this process and
+    between workers through a cache lock. `timeout` may be a callable,
+    asked once the data is built.
+    """
+    return _single_flight.do(
+        key, lambda: _build_once(key, stale_key, build, timeout)
+    )
+
+
+def record(name, outcome) -> None:
+    _incr(STATS_KEY.format(name=name, outcome=outcome), 1)
+    metrics.record_cache(name, outcome)
+
+
+async def arecord(name, outcome) -> None:
+    await _aincr(STATS_KEY.format(name=name, outcome=outcome), 1)
+    metrics.record_cache(name, outcome)
+
+
+def stats() -> dict:
+    keys = {
+        STATS_KEY.format(name=name, outcome=outcome): (name, outcome)
+        for name in _cached_names
+        for outcome in ("hits", "misses")
+    }
+    counters = _cache().get_many(list(keys))
+    result = {}
+    for key, (name, outcome) in sorted(keys.items(), key=lambda i: i[1]):
+        result.setdefault(name, {})[outcome] = counters.get(key, 0)
+    return result
+
+
+class CachedResponseMixin:
+    """
+    Serve list/retrieve responses of a viewset from the API cache.
+
+    `cache_dependencies` lists the models whose changes invalidate the
+    cached responses (see flights/signals.py). Permissions and throttles
+    still run on every request, only the queryset and serialization are
+    skipped on a hit.
+    """
+    cache_dependencies = ()
+    cached_actions = ("list", "retrieve")
+    # Actions whose cache misses are rebuilt once for all concurrent
+    # requests, see coalesce()
+    coalesced_actions = ()
+    # Comma separated lists whose order doesn't change the result
+    cache_unordered_params = ("fields", "expand")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_dependencies:
+            _cached_names.add(cls.__name__)
+
+    def get_cache_dependencies(self):
+        return self.cache_dependencies
+
+    def get_normalized_query(self, request) -> list:
+        """
+        Query params as a canonical sorted list, so "?b=1&a=2", "?a=2&b=1"
+        and "?a=2&b=1&c=" share one cache entry
+        """
+        query = []
+        for name, values in request.query_params.lists():
+            values = [value.strip() for value in values if value.strip()]
+            if name in self.cache_unordered_params:
+                values = [
+                    ",".join(sorted(value.split(","))) for value in values
+                ]
+            if values:
+                query.append((name, sorted(values)))
+        return sorted(query)
+
+    def _request_digest(self, request, *parts):
+        raw = repr((
+            *parts,
+            self.action,
+            request.get_host(),
+            request.path,
+            self.get_normalized_query(request),
+        ))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def get_cache_key(self, request):
+        versions = get_versions(self.get_cache_dependencies())
+        return RESPONSE_KEY.format(
+            name=type(self).__name__,
+            digest=self._request_digest(request, versions),
+        )
+
+    async def aget_cache_key(self, request):
+        versions = await aget_versions(self.get_cache_dependencies())
+        return RESPONSE_KEY.format(
+            name=type(self).__name__,
+            digest=self._request_digest(request, versions),
+        )
+
+    def get_stale_cache_key(self, request):
+        return STALE_KEY.format(
+            name=type(self).__name__,
+            digest=self._request_digest(request),
+        )
+
+    def get_cache_timeout(self):
+        return settings.API_CACHE["TIMEOUT"]
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if (
+            self.action not in self.cached_actions
+            or not self.get_cache_dependencies()
+        ):
+            return handler(request, *args, **kwargs)
+
+        name = type(self).__name__
+        key = self.get_cache_key(request)
+        data = _cache().get(key)
+        if data is not None:
+            record(name, "hits")
+            return Response(data)
+
+        record(name, "misses")
+        if self.action in self.coalesced_actions:
+            return self.coalesced_response(
+                key, handler, request, *args, **kwargs
+            )
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            _cache().set(key, response.data, self.get_cache_timeout())
+        return response
+
+    def coalesced_response(self, key, handler, request, *args, **kwargs):
+        own_response = []
+
+        def build():
+            response = handler(request, *args, **kwargs)
+            own_response.append(response)
+            if response.status_code == 200:
+                return response.data
+            return None
+
+        data = coalesce(
+            key,
+            self.get_stale_cache_key(request),
+            build,
+            # The timeout can depend on what was built
+            self.get_cache_timeout,
+        )
+        if own_response:
+            return own_response[0]
+        if data is None:
+            # The shared build wasn't cacheable (e.g. 404), answer this
+            # request on its own.
+            return handler(request, *args, **kwargs)
+        return Response(data)
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        """cached_response() for async views and handlers"""
+        if (
+            self.action not in self.cached_actions
+            or not self.get_cache_dependencies()
+        ):
+            return await handler(request, *args, **kwargs)
+
+        name = type(self).__name__
+        key = await self.aget_cache_key(request)
+        data = await _cache().aget(key)
+        if data is not None:
+            await arecord(name, "hits")
+            return Response(data)
+
+        await arecord(name, "misses")
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            await _cache().aset(
+                key, response.data, self.get_cache_timeout()
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
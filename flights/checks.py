@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PER_PROCESS_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_api_cache(app_configs, **kwargs):
+    # Cached responses, seat holds and their invalidation only work
+    # across workers when they all talk to the same cache.
+    errors = []
+    for setting in ("API_CACHE", "SEAT_HOLDS"):
+        alias = getattr(settings, setting)["CACHE_ALIAS"]
+        backend = settings.CACHES[alias]["BACKEND"]
+        if backend in PER_PROCESS_BACKENDS:
+            errors.append(Warning(
+                f"{setting} uses the per-process cache backend {backend}.",
+                hint="Set CACHE_BACKEND / CACHE_LOCATION to a shared cache "
+                     "such as Redis when running several workers.",
+                id="flights.W001",
+            ))
+    return errors
@@ -0,0 +1,242 @@
+"""
+Time-limited seat holds kept in the cache (settings.SEAT_HOLDS).
+
+Every held seat is claimed with an atomic cache.add() of its own key, so
+two customers can never hold the same seat. A per-flight index of active
+holds feeds seat maps and availability counts; it is only written under
+a per-flight lock, and requests that can't get the lock in time fail
+with a 503 before changing anything, so they can be retried. Expired
+holds are dropped lazily whenever the index is read or written, and
+nothing is written to the database until a hold is converted into an
+order. Nothing is notified when a hold expires either, so cached
+responses that count holds are kept no longer than the first of them
+(expires_in()).
+"""
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+
+from flights import cache as api_cache
+from flights.models import Ticket
+
+HOLD_KEY = "seat_hold:{hold_id}"
+SEAT_KEY = "seat_hold:{flight_id}:{row}:{seat}"
+FLIGHT_KEY = "seat_holds:flight:{flight_id}"
+LOCK_KEY = "seat_holds:flight:{flight_id}:lock"
+
+LOCK_TIMEOUT = 2
+LOCK_WAIT = 1.0
+
+
+class SeatHoldsBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Seat holds of this flight are busy, please retry."
+    default_code = "seat_holds_busy"
+
+
+def _cache():
+    return caches[settings.SEAT_HOLDS["CACHE_ALIAS"]]
+
+
+def _seat_key(flight_id, row, seat):
+    return SEAT_KEY.format(flight_id=flight_id, row=row, seat=seat)
+
+
+def _active(index, now=None):
+    now = now or time.time()
+    return {
+        hold_id: entry
+        for hold_id, entry in (index or {}).items()
+        if entry["expires_at"] > now
+    }
+
+
+@contextmanager
+def _flight_index(flight_id):
+    """Read-modify-write the hold index of a flight under a short lock"""
+    cache = _cache()
+    lock_key = LOCK_KEY.format(flight_id=flight_id)
+    # The lock may expire under a slow holder and be taken by another
+    # request, so it's only released by the request that owns it.
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_WAIT
+    locked = cache.add(lock_key, token, timeout=LOCK_TIMEOUT)
+    while not locked and time.monotonic() < deadline:
+        time.sleep(0.005)
+        locked = cache.add(lock_key, token, timeout=LOCK_TIMEOUT)
+    if not locked:
+        raise SeatHoldsBusy()
+    try:
+        key = FLIGHT_KEY.format(flight_id=flight_id)
+        index = _active(cache.get(key))
+        yield index
+        if index:
+            ttl = max(entry["expires_at"] for entry in index.values())
+            cache.set(key, index, timeout=max(int(ttl - time.time()) + 1, 1))
+        else:
+            cache.delete(key)
+    finally:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def create_hold(flight, seats, user_id, ttl=None) -> dict:
+    """
+    Hold (row, seat) pairs on a flight for `ttl` seconds. Raises
+    ValidationError, aligned with `seats`, when some are already held.
+    """
+    cache = _cache()
+    ttl = ttl or settings.SEAT_HOLDS["TTL"]
+    hold_id = uuid.uuid4().hex
+    expires_at = time.time() + ttl
+
+    # Seats are claimed under the index lock, so a hold is either in the
+    # index or not claimed at all.
+    with _flight_index(flight.pk) as index:
+        claimed = []
+        errors = []
+        for row, seat in seats:
+            key = _seat_key(flight.pk, row, seat)
+            if cache.add(key, hold_id, timeout=ttl):
+                claimed.append(key)
+                errors.append({})
+            else:
+                errors.append({"seat": [f"Seat {row}-{seat} is on hold."]})
+        if any(errors):
+            cache.delete_many(claimed)
+            raise ValidationError({"seats": errors}, code="seat_held")
+
+        hold = {
+            "id": hold_id,
+            "flight": flight.pk,
+            "user": user_id,
+            "seats": [[row, seat] for row, seat in seats],
+            "expires_at": expires_at,
+        }
+        cache.set(HOLD_KEY.format(hold_id=hold_id), hold, timeout=ttl)
+        index[hold_id] = {"seats": hold["seats"], "expires_at": expires_at}
+    # Holds change availability just like sold tickets do.
+    api_cache.invalidate(Ticket)
+    return hold
+
+
+def get_hold(hold_id, user_id=None) -> dict:
+    hold = _cache().get(HOLD_KEY.format(hold_id=hold_id))
+    if (
+        hold is None
+        or hold["expires_at"] <= time.time()
+        or (user_id is not None and hold["user"] != user_id)
+    ):
+        raise NotFound("Seat hold not found or expired.")
+    return hold
+
+
+def release_hold(hold) -> None:
+    cache = _cache()
+    # The index goes first: if its lock is busy, nothing has changed yet.
+    with _flight_index(hold["flight"]) as index:
+        index.pop(hold["id"], None)
+    seat_keys = [
+        _seat_key(hold["flight"], row, seat) for row, seat in hold["seats"]
+    ]
+    # Only drop seat claims that still belong to this hold.
+    owned = [
+        key for key, owner in cache.get_many(seat_keys).items()
+        if owner == hold["id"]
+    ]
+    cache.delete_many(owned + [HOLD_KEY.format(hold_id=hold["id"])])
+    api_cache.invalidate(Ticket)
+
+
+def _seats(index, exclude_hold_id=None):
+    return {
+        (row, seat)
+        for hold_id, entry in _active(index).items()
+        if hold_id != exclude_hold_id
+        for row, seat in entry["seats"]
+    }
+
+
+def _flight_keys(flight_ids):
+    return {
+        FLIGHT_KEY.format(flight_id=flight_id): flight_id
+        for flight_id in flight_ids
+    }
+
+
+def _counts(keys, indexes):
+    now = time.time()
+    counts = dict.fromkeys(keys.values(), 0)
+    for key, index in indexes.items():
+        counts[keys[key]] = sum(
+            len(entry["seats"]) for entry in _active(index, now).values()
+        )
+    return counts
+
+
+def held_seats(flight_id, exclude_hold_id=None) -> set[tuple[int, int]]:
+    return _seats(
+        _cache().get(FLIGHT_KEY.format(flight_id=flight_id)),
+        exclude_hold_id,
+    )
+
+
+async def aheld_seats(flight_id) -> set[tuple[int, int]]:
+    """held_seats() for async views"""
+    return _seats(await _cache().aget(FLIGHT_KEY.format(flight_id=flight_id)))
+
+
+def held_counts(flight_ids) -> dict[int, int]:
+    """Number of held seats per flight, with one cache round trip"""
+    keys = _flight_keys(flight_ids)
+    return _counts(keys, _cache().get_many(list(keys)))
+
+
+async def aheld_counts(flight_ids) -> dict[int, int]:
+    """held_counts() for async views"""
+    keys = _flight_keys(flight_ids)
+    return _counts(keys, await _cache().aget_many(list(keys)))
+
+
+def _expires_in(indexes):
+    now = time.time()
+    expiry = min(
+        (
+            entry["expires_at"]
+            for index in indexes
+            for entry in _active(index, now).values()
+        ),
+        default=None,
+    )
+    if expiry is None:
+        return None
+    return max(int(expiry - now), 1)
+
+
+def expires_in(flight_ids) -> int | None:
+    """Seconds until the first active hold on these flights expires"""
+    keys = _flight_keys(flight_ids)
+    return _expires_in(_cache().get_many(list(keys)).values())
+
+
+async def aexpires_in(flight_ids) -> int | None:
+    """expires_in() for async views"""
+    keys = _flight_keys(flight_ids)
+    return _expires_in((await _cache().aget_many(list(keys))).values())
+
+
+def seats_held_by_others(flight_id, seats, hold_id=None) -> set:
+    """Subset of (row, seat) pairs currently claimed by another hold"""
+    keys = {
+        _seat_key(flight_id, row, seat): (row, seat) for row, seat in seats
+    }
+    return {
+        keys[key]
+        for key, owner in _cache().get_many(list(keys)).items()
+        if owner != hold_id
+    }
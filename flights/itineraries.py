@@ -0,0 +1,281 @@
+"""
+Multi-leg itinerary search (settings.ITINERARIES).
+
+Every worker keeps an in-memory adjacency index of upcoming flights:
+for each airport, its departures sorted by time. A search is a depth
+first walk from the origin that only follows departures inside the
+connection window of the previous arrival (found by bisection), so no
+SQL runs per hop. Seat availability changes far too often to be indexed
+and is checked with one query for the candidate flights only.
+
+Flight and route changes are applied to the index incrementally by
+signals (flights/signals.py). A generation counter in the API cache
+tells other workers that the schedule changed; they reload their index
+on the next search. Code that writes flights without signals (bulk
+inserts, queryset updates) must call invalidate().
+"""
+import threading
+import time as py_time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+
+from flights import holds
+from flights.models import Airport, Flight
+
+GENERATION_KEY = "itineraries:generation"
+
+
+class Leg(NamedTuple):
+    flight_id: int
+    source_id: int
+    destination_id: int
+    departure_time: datetime
+    arrival_time: datetime
+
+
+def _cache():
+    return caches[settings.API_CACHE["CACHE_ALIAS"]]
+
+
+def _generation() -> int:
+    cache = _cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Never restart from a value an existing index may already have.
+        cache.add(GENERATION_KEY, int(py_time.time() * 1000), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def _next_generation() -> int:
+    cache = _cache()
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, _generation(), timeout=None)
+        return cache.incr(GENERATION_KEY)
+
+
+def _legs(queryset):
+    return [
+        Leg(*row) for row in queryset.values_list(
+            "id",
+            "route__source_id",
+            "route__destination_id",
+            "departure_time",
+            "arrival_time",
+        )
+    ]
+
+
+class ItineraryIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._generation = None
+        self._legs = {}
+        self._departures = defaultdict(list)
+
+    def _indexed_flights(self):
+        horizon = timezone.now() - timedelta(days=1)
+        return Flight.objects.filter(departure_time__gte=horizon)
+
+    def _add(self, leg):
+        self._legs[leg.flight_id] = leg
+        insort(
+            self._departures[leg.source_id],
+            (leg.departure_time, leg.flight_id)
+        )
+
+    def _remove(self, flight_id):
+        leg = self._legs.pop(flight_id, None)
+        if leg is None:
+            return
+        departures = self._departures[leg.source_id]
+        position = bisect_left(departures, (leg.departure_time, flight_id))
+        if position < len(departures) and departures[position][1] == flight_id:
+            del departures[position]
+
+    def load(self):
+        with self._lock:
+            generation = _generation()
+            self._legs = {}
+            self._departures = defaultdict(list)
+            for leg in sorted(
+                _legs(self._indexed_flights()),
+                key=lambda leg: (leg.departure_time, leg.flight_id)
+            ):
+                self._legs[leg.flight_id] = leg
+                self._departures[leg.source_id].append(
+                    (leg.departure_time, leg.flight_id)
+                )
+            self._generation = generation
+
+    def ensure_current(self):
+        with self._lock:
+            if self._generation is None or self._generation != _generation():
+                self.load()
+
+    def refresh(self, flight_ids=(), route_ids=()):
+        """
+        Re-read the given flights (and all flights of the given routes)
+        after they were saved or deleted.
+        """
+        with self._lock:
+            generation = _next_generation()
+            if self._generation is None:
+                return
+            if generation != self._generation + 1:
+                # Another worker changed the schedule too, reload instead.
+                self._generation = None
+                return
+
+            flight_ids = set(flight_ids)
+            if route_ids:
+                flight_ids.update(
+                    Flight.objects.filter(route_id__in=route_ids)
+                    .values_list("id", flat=True)
+                )
+            for flight_id in flight_ids:
+                self._remove(flight_id)
+            for leg in _legs(
+                self._indexed_flights().filter(id__in=flight_ids)
+            ):
+                self._add(leg)
+            self._generation = generation
+
+    def departures(self, airport_id, start, end) -> list[Leg]:
+        """Legs leaving the airport at or after start and before end"""
+        departures = self._departures.get(airport_id, ())
+        position = bisect_left(departures, (start,))
+        result = []
+        while position < len(departures):
+            departure_time, flight_id = departures[position]
+            if departure_time >= end:
+                break
+            result.append(self._legs[flight_id])
+            position += 1
+        return result
+
+    def walk(self, origin, destination, start, end, max_stops):
+        """
+        Chains of legs from origin to destination whose first leg departs
+        between start and end, without visiting an airport twice
+        """
+        min_connection = timedelta(
+            minutes=settings.ITINERARIES["MIN_CONNECTION_MINUTES"]
+        )
+        max_connection = timedelta(
+            hours=settings.ITINERARIES["MAX_CONNECTION_HOURS"]
+        )
+        chains = []
+
+        def extend(path, visited):
+            last = path[-1]
+            if last.destination_id == destination:
+                chains.append(tuple(path))
+                return
+            if len(path) > max_stops:
+                return
+            for leg in self.departures(
+                last.destination_id,
+                last.arrival_time + min_connection,
+                last.arrival_time + max_connection,
+            ):
+                if leg.destination_id in visited:
+                    continue
+                visited.add(leg.destination_id)
+                extend(path + [leg], visited)
+                visited.discard(leg.destination_id)
+
+        with self._lock:
+            for leg in self.departures(origin, start, end):
+                if leg.destination_id != origin:
+                    extend([leg], {origin, leg.destination_id})
+        return chains
+
+
+index = ItineraryIndex()
+
+
+def invalidate() -> None:
+    """Make every worker reload its index on the next search"""
+    _next_generation()
+
+
+def _seats_available(flight_ids) -> dict[int, int]:
+    available = dict(
+        Flight.objects.filter(id__in=flight_ids)
+        .annotate(available=F("airplane__rows") * F(
+            "airplane__seats_in_row"
+        ) - F("tickets_sold"))
+        .values_list("id", "available")
+    )
+    held = holds.held_counts(flight_ids)
+    return {
+        flight_id: seats - held.get(flight_id, 0)
+        for flight_id, seats in available.items()
+    }
+
+
+def search(origin, destination, day, passengers=1, max_stops=None):
+    """
+    Itineraries from origin to destination leaving on `day`, with at
+    most `max_stops` connections, each leg having `passengers` free
+    seats. Sorted by arrival time, then by fewest stops.
+    """
+    if max_stops is None:
+        max_stops = settings.ITINERARIES["MAX_STOPS"]
+    max_stops = min(max_stops, settings.ITINERARIES["MAX_STOPS"])
+
+    index.ensure_current()
+    start = datetime.combine(day, time.min)
+    chains = index.walk(
+        origin, destination, start, start + timedelta(days=1), max_stops
+    )
+    if not chains:
+        return []
+
+    available = _seats_available(
+        {leg.flight_id for chain in chains for leg in chain}
+    )
+    chains = [
+        chain for chain in chains
+        if all(available.get(leg.flight_id, 0) >= passengers for leg in chain)
+    ]
+    chains.sort(key=lambda chain: (
+        chain[-1].arrival_time, len(chain), chain[0].departure_time
+    ))
+    chains = chains[:settings.ITINERARIES["MAX_RESULTS"]]
+
+    airports = Airport.objects.in_bulk({
+        airport_id
+        for chain in chains
+        for leg in chain
+        for airport_id in (leg.source_id, leg.destination_id)
+    })
+    return [
+        {
+            "departure_time": chain[0].departure_time,
+            "arrival_time": chain[-1].arrival_time,
+            "stops": len(chain) - 1,
+            "legs": [
+                {
+                    "flight": leg.flight_id,
+                    "source": airports[leg.source_id].name,
+                    "destination": airports[leg.destination_id].name,
+                    "departure_time": leg.departure_time,
+                    "arrival_time": leg.arrival_time,
+                    "tickets_available": available[leg.flight_id],
+                }
+                for leg in chain
+            ],
+        }
+        for chain in chains
+    ]
@@ -0,0 +1,79 @@
+import argparse
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from flights import exports
+
+
+def _date(value):
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise argparse.ArgumentTypeError(
+            f"invalid date {value!r}, expected YYYY-MM-DD"
+        )
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream every order with its tickets and flights to a file or "
+        "stdout as NDJSON (one order per line) or CSV (one ticket per line)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=sorted(exports.FORMATS),
+            default="ndjson",
+        )
+        parser.add_argument(
+            "--output", help="File to write to, stdout by default."
+        )
+        parser.add_argument(
+            "--from",
+            dest="created_from",
+            type=_date,
+            help="First day of Order.created_at, inclusive (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--to",
+            dest="created_to",
+            type=_date,
+            help="Last day of Order.created_at, inclusive (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=exports.CHUNK_SIZE,
+            help="Orders fetched from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        created_from = options["created_from"]
+        created_to = options["created_to"]
+        if created_from and created_to and created_from > created_to:
+            raise CommandError("--to must not be before --from.")
+
+        lines = exports.export_lines(
+            options["export_format"],
+            created_from,
+            created_to,
+            chunk_size=options["chunk_size"],
+        )
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        with open(
+            options["output"], "w", newline="", encoding="utf-8"
+        ) as file:
+            file.writelines(lines)
+        self.stdout.write(
+            self.style.SUCCESS(f"Orders written to {options['output']}.")
+        )
@@ -0,0 +1,415 @@
+import csv
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from flights import cache as api_cache, itineraries
+from flights.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route
+)
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_rows(path):
+    """Yield (line number, row dict) from a .csv or .jsonl file"""
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            for number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as error:
+                    row = RowError(f"invalid JSON: {error}")
+                if not isinstance(row, (dict, RowError)):
+                    row = RowError("expected a JSON object")
+                yield number, row
+        else:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def _text(row, field):
+    value = row.get(field)
+    if value is None or not str(value).strip():
+        raise RowError(f"{field} is required")
+    return str(value).strip()
+
+
+def _positive_int(row, field):
+    try:
+        value = int(_text(row, field))
+    except ValueError:
+        raise RowError(f"{field} must be an integer")
+    if value <= 0:
+        raise RowError(f"{field} must be positive")
+    return value
+
+
+def _datetime(row, field):
+    try:
+        value = parse_datetime(_text(row, field))
+    except ValueError:
+        value = None
+    if value is None:
+        raise RowError(f"{field} must be an ISO 8601 date and time")
+    if settings.USE_TZ and timezone.is_naive(value):
+        return timezone.make_aware(value)
+    if not settings.USE_TZ and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
+def _crew_names(row):
+    names = row.get("crew") or []
+    if isinstance(names, str):
+        names = names.split(";")
+    return [name.strip() for name in names if name.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream airports, airplanes, routes, crew and flights (with crew "
+        "assignments) from CSV or JSONL files into the database. Foreign "
+        "keys are given by name and resolved in memory; flights are "
+        "loaded with COPY on PostgreSQL and batched inserts elsewhere. "
+        "Rows already in the database (by name, or by route, airplane "
+        "and departure time for flights) are skipped, so an import can "
+        "be run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--airports", help="Columns: name, closest_big_city."
+        )
+        parser.add_argument(
+            "--airplanes",
+            help="Columns: name, rows, seats_in_row, airplane_type "
+                 "(missing types are created).",
+        )
+        parser.add_argument(
+            "--routes",
+            help="Columns: source, destination (airport names), distance.",
+        )
+        parser.add_argument("--crew", help="Columns: first_name, last_name.")
+        parser.add_argument(
+            "--flights",
+            help="Columns: source, destination, airplane, departure_time, "
+                 "arrival_time, crew (full names separated by ';' in CSV, "
+                 "a list in JSONL).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate every row and report errors without writing.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows written per COPY or INSERT.",
+        )
+        parser.add_argument(
+            "--progress-every",
+            type=int,
+            default=100000,
+            help="Report progress every N rows.",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=50,
+            help="Stop listing invalid rows after this many.",
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.dry_run = options["dry_run"]
+        self.errors = 0
+        self._fake_id = 0
+        self.airports = self._lookup(
+            Airport.objects.values_list("name", "id")
+        )
+        self.airplanes = self._lookup(
+            Airplane.objects.values_list("name", "id")
+        )
+        self.airplane_types = self._lookup(
+            AirplaneType.objects.values_list("name", "id")
+        )
+        self.routes = self._lookup(
+            Route.objects.values_list("source_id", "destination_id", "id")
+        )
+        self.crew = self._lookup(
+            Crew.objects.values_list("first_name", "last_name", "id"),
+            key=lambda first_name, last_name: f"{first_name} {last_name}"
+        )
+        self.flights = set(
+            Flight.objects.values_list(
+                "route_id", "airplane_id", "departure_time"
+            ) if options["flights"] else ()
+        )
+
+        steps = [
+            ("airports", self._airport),
+            ("airplanes", self._airplane),
+            ("routes", self._route),
+            ("crew", self._crew_member),
+            ("flights", self._flight),
+        ]
+        if not any(options[name] for name, _ in steps):
+            raise CommandError("Nothing to import, pass at least one file.")
+
+        with transaction.atomic():
+            for name, parse in steps:
+                if options[name]:
+                    self._import(name, options[name], parse)
+            if self.errors or self.dry_run:
+                transaction.set_rollback(True)
+
+        if self.errors:
+            raise CommandError(
+                f"{self.errors} invalid row(s), nothing was imported."
+            )
+        if self.dry_run:
+            self.stdout.write(self.style.SUCCESS("All rows are valid."))
+            return
+
+        # Bulk writes skip the model signals.
+        for model in (Airport, AirplaneType, Airplane, Route, Crew, Flight):
+            api_cache.invalidate(model)
+        itineraries.invalidate()
+        self.stdout.write(self.style.SUCCESS("Schedule imported."))
+
+    @staticmethod
+    def _lookup(values, key=None):
+        lookup = {}
+        for *fields, pk in values.order_by("-id"):
+            name = key(*fields) if key else (
+                fields[0] if len(fields) == 1 else tuple(fields)
+            )
+            lookup[name] = pk
+        return lookup
+
+    @property
+    def _writes_suppressed(self):
+        return self.dry_run or self.errors > 0
+
+    def _new_id(self):
+        # Stand-in ids so rows defined earlier on resolve while nothing is
+        # written (dry runs, or once a row was invalid) and until their
+        # batch is.
+        self._fake_id -= 1
+        return self._fake_id
+
+    def _import(self, name, path, parse):
+        started = time.monotonic()
+        batch = []
+        created = skipped = 0
+        for number, row in read_rows(path):
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                instance = parse(row)
+            except RowError as error:
+                self._error(path, number, error)
+                continue
+            if instance is None:
+                skipped += 1
+                continue
+            batch.append(instance)
+            created += 1
+            if len(batch) >= self.options["batch_size"]:
+                self._write(name, batch)
+                batch = []
+            if created % self.options["progress_every"] == 0:
+                self._progress(name, created, started)
+        self._write(name, batch)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"{name}: {created} {'valid' if self.dry_run else 'imported'}, "
+            f"{skipped} already present ({elapsed:.1f}s)"
+        )
+
+    def _error(self, path, number, error):
+        self.errors += 1
+        if self.errors <= self.options["max_errors"]:
+            self.stderr.write(f"{path}:{number}: {error}")
+
+    def _progress(self, name, count, started):
+        rate = count / max(time.monotonic() - started, 1e-6)
+        self.stdout.write(f"{name}: {count} rows ({rate:.0f} rows/s)")
+
+    def _write(self, name, batch):
+        if not batch or self._writes_suppressed:
+            return
+        if name == "flights":
+            if connection.vendor == "postgresql":
+                self._copy_flights(batch)
+            else:
+                self._insert_flights(batch)
+            return
+
+        model = type(batch[0][1])
+        created = model.objects.bulk_create(instance for _, instance in batch)
+        lookup = getattr(self, name)
+        for (key, _), instance in zip(batch, created):
+            lookup[key] = instance.pk
+
+    # Row parsers return None for rows that already exist, otherwise what
+    # _write() expects: (lookup key, unsaved instance) or a flight tuple.
+
+    def _claim(self, lookup, key):
+        if key in lookup:
+            return False
+        lookup[key] = self._new_id()
+        return True
+
+    def _airport(self, row):
+        name = _text(row, "name")
+        city = _text(row, "closest_big_city")
+        if not self._claim(self.airports, name):
+            return None
+        return name, Airport(name=name, closest_big_city=city)
+
+    def _airplane(self, row):
+        name = _text(row, "name")
+        rows = _positive_int(row, "rows")
+        seats_in_row = _positive_int(row, "seats_in_row")
+        type_name = _text(row, "airplane_type")
+        if not self._claim(self.airplanes, name):
+            return None
+        if self.airplane_types.get(type_name) is None:
+            self.airplane_types[type_name] = (
+                self._new_id() if self._writes_suppressed
+                else AirplaneType.objects.create(name=type_name).pk
+            )
+        return name, Airplane(
+            name=name,
+            rows=rows,
+            seats_in_row=seats_in_row,
+            airplane_type_id=self.airplane_types[type_name],
+        )
+
+    def _airport_id(self, row, field):
+        name = _text(row, field)
+        if name not in self.airports:
+            raise RowError(f"unknown {field} airport {name!r}")
+        return self.airports[name]
+
+    def _route(self, row):
+        source_id = self._airport_id(row, "source")
+        destination_id = self._airport_id(row, "destination")
+        distance = _positive_int(row, "distance")
+        if source_id == destination_id:
+            raise RowError("source and destination must differ")
+        key = (source_id, destination_id)
+        if not self._claim(self.routes, key):
+            return None
+        return key, Route(
+            source_id=source_id,
+            destination_id=destination_id,
+            distance=distance,
+        )
+
+    def _crew_member(self, row):
+        first_name = _text(row, "first_name")
+        last_name = _text(row, "last_name")
+        if not self._claim(self.crew, f"{first_name} {last_name}"):
+            return None
+        return f"{first_name} {last_name}", Crew(
+            first_name=first_name, last_name=last_name
+        )
+
+    def _flight(self, row):
+        route_id = self.routes.get((
+            self._airport_id(row, "source"),
+            self._airport_id(row, "destination"),
+        ))
+        if route_id is None:
+            raise RowError("no route between these airports")
+        airplane = _text(row, "airplane")
+        if airplane not in self.airplanes:
+            raise RowError(f"unknown airplane {airplane!r}")
+        departure_time = _datetime(row, "departure_time")
+        arrival_time = _datetime(row, "arrival_time")
+        if arrival_time <= departure_time:
+            raise RowError("arrival_time must be after departure_time")
+        crew_ids = []
+        for name in _crew_names(row):
+            if name not in self.crew:
+                raise RowError(f"unknown crew member {name!r}")
+            crew_ids.append(self.crew[name])
+        key = (route_id, self.airplanes[airplane], departure_time)
+        if key in self.flights:
+            return None
+        self.flights.add(key)
+        return (
+            route_id,
+            self.airplanes[airplane],
+            departure_time,
+            arrival_time,
+            crew_ids,
+        )
+
+    def _copy_flights(self, batch):
+        flight_table = connection.ops.quote_name(Flight._meta.db_table)
+        crew_table = connection.ops.quote_name(
+            Flight.crew.through._meta.db_table
+        )
+        with connection.cursor() as cursor:
+            # Take the ids up front so crew rows can reference them.
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+                "FROM generate_series(1, %s)",
+                [Flight._meta.db_table, len(batch)],
+            )
+            ids = [pk for pk, in cursor.fetchall()]
+            with cursor.copy(
+                f"COPY {flight_table} (id, route_id, airplane_id, "
+                f"departure_time, arrival_time, tickets_sold, seats_bitmap) "
+                f"FROM STDIN"
+            ) as copy:
+                for pk, (route_id, airplane_id, departure, arrival, _) in zip(
+                    ids, batch
+                ):
+                    copy.write_row(
+                        (pk, route_id, airplane_id, departure, arrival, 0, b"")
+                    )
+            with cursor.copy(
+                f"COPY {crew_table} (flight_id, crew_id) FROM STDIN"
+            ) as copy:
+                for pk, flight in zip(ids, batch):
+                    for crew_id in flight[4]:
+                        copy.write_row((pk, crew_id))
+
+    def _insert_flights(self, batch):
+        flights = Flight.objects.bulk_create(
+            Flight(
+                route_id=route_id,
+                airplane_id=airplane_id,
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+            )
+            for route_id, airplane_id, departure_time, arrival_time, _
+            in batch
+        )
+        Flight.crew.through.objects.bulk_create(
+            Flight.crew.through(flight_id=flight.pk, crew_id=crew_id)
+            for flight, row in zip(flights, batch)
+            for crew_id in row[4]
+        )
@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from flights.models import Flight, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount tickets per flight and fix drifted Flight.tickets_sold "
+        "counters (e.g. after raw SQL or bulk deletes bypassing signals), "
+        "optionally rebuilding seat occupancy bitmaps."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted flights, do not update them.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of flights updated per query.",
+        )
+        parser.add_argument(
+            "--seat-maps",
+            action="store_true",
+            help="Also rebuild seat occupancy bitmaps from tickets.",
+        )
+
+    def handle(self, *args, **options):
+        sold = (
+            Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        drifted = (
+            Flight.objects.annotate(
+                actual_sold=Coalesce(Subquery(sold), Value(0))
+            )
+            .exclude(tickets_sold=F("actual_sold"))
+            .only("id", "tickets_sold")
+            .order_by("id")
+        )
+
+        batch = []
+        fixed = 0
+        for flight in drifted.iterator(chunk_size=options["batch_size"]):
+            self.stdout.write(
+                f"Flight {flight.id}: counter {flight.tickets_sold}, "
+                f"actual {flight.actual_sold}"
+            )
+            batch.append(flight.id)
+            if len(batch) >= options["batch_size"]:
+                fixed += self._recount(batch, sold, options["dry_run"])
+                batch = []
+        fixed += self._recount(batch, sold, options["dry_run"])
+
+        if options["dry_run"]:
+            self.stdout.write(f"{fixed} flight(s) would be updated.")
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"{fixed} flight(s) reconciled.")
+            )
+
+        if options["seat_maps"] and not options["dry_run"]:
+            flights = Flight.objects.select_related("airplane").order_by("id")
+            rebuilt = 0
+            for flight in flights.iterator(chunk_size=options["batch_size"]):
+                flight.rebuild_seats_bitmap()
+                rebuilt += 1
+            self.stdout.write(
+                self.style.SUCCESS(f"{rebuilt} seat map(s) rebuilt.")
+            )
+
+    @staticmethod
+    def _recount(flight_ids, sold, dry_run):
+        # Recount inside the UPDATE itself, so tickets sold between the
+        # drift scan and this statement are not overwritten.
+        if flight_ids and not dry_run:
+            Flight.objects.filter(pk__in=flight_ids).update(
+                tickets_sold=Coalesce(Subquery(sold), Value(0))
+            )
+        return len(flight_ids)
@@ -0,0 +1,37 @@
+# Generated by Django 5.1 on 2026-10-18 05:01
+
+from django.db import migrations, models
+
+
+def backfill_seats_bitmap(apps, schema_editor):
+    Flight = apps.get_model("flights", "Flight")
+    Ticket = apps.get_model("flights", "Ticket")
+    flights = Flight.objects.filter(tickets_sold__gt=0).select_related(
+        "airplane"
+    )
+    for flight in flights.iterator(chunk_size=1000):
+        seats_in_row = flight.airplane.seats_in_row
+        capacity = flight.airplane.rows * seats_in_row
+        bits = bytearray((capacity + 7) // 8)
+        seats = Ticket.objects.filter(flight=flight).values_list("row", "seat")
+        for row, seat in seats:
+            index = (row - 1) * seats_in_row + (seat - 1)
+            if 1 <= seat <= seats_in_row and 0 <= index < capacity:
+                bits[index >> 3] |= 0x80 >> (index & 7)
+        Flight.objects.filter(pk=flight.pk).update(seats_bitmap=bytes(bits))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flights", "0004_flight_tickets_sold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="seats_bitmap",
+            field=models.BinaryField(default=b"", editable=False),
+        ),
+        migrations.RunPython(backfill_seats_bitmap, migrations.RunPython.noop),
+    ]
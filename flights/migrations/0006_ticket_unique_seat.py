@@ -0,0 +1,56 @@
+# Generated by Django 5.1 on 2026-10-18 04:58
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_seats(apps, schema_editor):
+    """
+    Seats could be sold twice before this constraint. Stop before adding
+    it, listing the tickets to cancel or move, rather than failing
+    halfway through on the database's own error.
+    """
+    Ticket = apps.get_model("flights", "Ticket")
+    duplicates = list(
+        Ticket.objects.order_by()
+        .values("flight_id", "row", "seat")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by("flight_id", "row", "seat")
+    )
+    if not duplicates:
+        return
+
+    lines = []
+    for seat in duplicates[:50]:
+        ticket_ids = Ticket.objects.filter(
+            flight_id=seat["flight_id"], row=seat["row"], seat=seat["seat"]
+        ).order_by("id").values_list("id", flat=True)
+        lines.append(
+            f"  flight {seat['flight_id']}, row {seat['row']}, "
+            f"seat {seat['seat']}: tickets {', '.join(map(str, ticket_ids))}"
+        )
+    if len(duplicates) > 50:
+        lines.append(f"  ... and {len(duplicates) - 50} more")
+    raise RuntimeError(
+        f"{len(duplicates)} seat(s) are sold more than once. Delete or "
+        "move the extra tickets, then run the migration again:\n"
+        + "\n".join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flights", "0005_flight_seats_bitmap"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_seats, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="ticket",
+            constraint=models.UniqueConstraint(
+                fields=("flight", "row", "seat"), name="unique_ticket_seat_per_flight"
+            ),
+        ),
+    ]
@@ -2,10 +2,12 @@ import pathlib
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils.text import slugify
 from rest_framework.exceptions import ValidationError
 
+from flights.seat_map import SeatMap
+
 
 def airplane_images_path(instance: "Airplane", filename: str) -> pathlib.Path:
     file_name = ((f"{slugify(instance.name)}"
@@ -78,6 +80,12 @@ class Ticket(models.Model):
 
     class Meta:
         ordering = ["flight", "row", "seat"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["flight", "row", "seat"],
+                name="unique_ticket_seat_per_flight"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.row} {self.seat} {self.flight}"
@@ -91,6 +99,12 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="order_user_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.created_at}"
@@ -111,6 +125,12 @@ class Route(models.Model):
 
     class Meta:
         ordering = ["source__name", "destination__name"]
+        indexes = [
+            models.Index(
+                fields=["source", "destination"],
+                name="route_source_destination_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.source} {self.destination}"
@@ -138,9 +158,88 @@ class Flight(models.Model):
         related_name="flights"
     )
     crew = models.ManyToManyField("Crew", related_name="flights")
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+    seats_bitmap = models.BinaryField(default=b"", editable=False)
 
     class Meta:
         ordering = ["departure_time"]
+        indexes = [
+            models.Index(
+                fields=["departure_time"],
+                name="flight_departure_idx"
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx"
+            ),
+            models.Index(
+                fields=["airplane", "departure_time"],
+                name="flight_airplane_departure_idx"
+            ),
+        ]
+
+    def get_seat_map(self) -> SeatMap:
+        return SeatMap.for_flight(self)
+
+    def is_seat_taken(self, row: int, seat: int) -> bool:
+        return self.get_seat_map().is_taken(row, seat)
+
+    @property
+    def seats_free(self) -> int:
+        return self.get_seat_map().free_count()
+
+    @classmethod
+    def lock_for_seating(cls, flight_ids) -> dict[int, "Flight"]:
+        """
+        Row-lock the given flights (in id order, to avoid deadlocks)
+        until the surrounding transaction ends, with just the columns
+        needed to read and write their seat maps.
+        """
+        flights = (
+            cls.objects.select_for_update(of=("self",))
+            .select_related("airplane")
+            .only(
+                "tickets_sold",
+                "seats_bitmap",
+                "airplane__rows",
+                "airplane__seats_in_row",
+            )
+            .filter(pk__in=flight_ids)
+            .order_by("pk")
+        )
+        return {flight.pk: flight for flight in flights}
+
+    def save_seat_map(self, seat_map: SeatMap, tickets_delta: int) -> None:
+        self.seats_bitmap = seat_map.to_bytes()
+        self.tickets_sold = max(self.tickets_sold + tickets_delta, 0)
+        Flight.objects.filter(pk=self.pk).update(
+            seats_bitmap=self.seats_bitmap,
+            tickets_sold=self.tickets_sold,
+        )
+
+    def rebuild_seats_bitmap(self) -> None:
+        """
+        Recompute the seat map from the tickets. The flight stays
+        row-locked meanwhile, so a booking can't commit between reading
+        the tickets and writing the map and lose its seat.
+        """
+        with transaction.atomic():
+            flight = Flight.lock_for_seating([self.pk]).get(self.pk)
+            if flight is None:
+                return
+            seat_map = SeatMap(
+                flight.airplane.rows, flight.airplane.seats_in_row
+            )
+            seats = self.tickets.values_list("row", "seat")
+            for row, seat in seats:
+                try:
+                    seat_map.take(row, seat)
+                except IndexError:
+                    continue
+            self.seats_bitmap = seat_map.to_bytes()
+            Flight.objects.filter(pk=self.pk).update(
+                seats_bitmap=self.seats_bitmap
+            )
 
     def __str__(self):
         return (
@@ -0,0 +1,185 @@
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    LimitOffsetPagination,
+    PageNumberPagination
+)
+from rest_framework.settings import api_settings
+
+
+class OrderSetPagination(PageNumberPagination):
+    page_size = 3
+    page_size_query_param = "page_size"
+    max_page_size = 20
+
+
+class BaseCursorPagination(CursorPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class FlightCursorPagination(BaseCursorPagination):
+    ordering = ("departure_time", "id")
+
+
+class RouteCursorPagination(BaseCursorPagination):
+    # Cursor positions are read from the instance, so RouteViewSet
+    # annotates the airport names instead of ordering across relations.
+    ordering = ("source_name", "destination_name", "id")
+
+
+class OrderCursorPagination(BaseCursorPagination):
+    page_size = OrderSetPagination.page_size
+    max_page_size = OrderSetPagination.max_page_size
+    ordering = ("-created_at", "id")
+
+
+class SelectablePagination(BasePagination):
+    """
+    Offset/page based pagination by default, keyset (cursor) pagination
+    when the request asks for it with ?pagination=cursor or carries a
+    ?cursor= token from a previous cursor page.
+
+    Cursor pages filter on the ordering key instead of using OFFSET and
+    never run the COUNT(*) query, so deep pages cost as much as the first.
+    """
+    default_pagination_class = None
+    cursor_pagination_class = None
+    cursor_query_param = "cursor"
+    pagination_query_param = "pagination"
+
+    def __init__(self):
+        self.paginator = None
+
+    def get_default_pagination_class(self):
+        return (
+            self.default_pagination_class
+            or api_settings.DEFAULT_PAGINATION_CLASS
+        )
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.pagination_query_param) == "cursor"
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.paginator = self.cursor_pagination_class()
+        else:
+            self.paginator = self.get_default_pagination_class()()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.get_default_pagination_class()(
+        ).get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [{
+            "name": self.pagination_query_param,
+            "required": False,
+            "in": "query",
+            "description": "Set to \"cursor\" for keyset pagination",
+            "schema": {"type": "string", "enum": ["cursor"]},
+        }]
+        seen = {self.pagination_query_param}
+        for pagination_class in (
+            self.get_default_pagination_class(),
+            self.cursor_pagination_class,
+        ):
+            for parameter in pagination_class(
+            ).get_schema_operation_parameters(view):
+                if parameter["name"] not in seen:
+                    seen.add(parameter["name"])
+                    parameters.append(parameter)
+        return parameters
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, "display_page_controls", False)
+
+
+class FlightPagination(SelectablePagination):
+    cursor_pagination_class = FlightCursorPagination
+
+
+class RoutePagination(SelectablePagination):
+    cursor_pagination_class = RouteCursorPagination
+
+
+class OrderPagination(SelectablePagination):
+    default_pagination_class = OrderSetPagination
+    cursor_pagination_class = OrderCursorPagination
+
+
+async def apaginate_queryset(paginator, queryset, request, view=None):
+    """
+    paginator.paginate_queryset() for async views: counts and fetches the
+    page with the async ORM for limit/offset and page number pagination,
+    leaving the paginator ready for get_paginated_response(). Other
+    paginators run in a worker thread.
+    """
+    if isinstance(paginator, SelectablePagination):
+        if paginator.use_cursor(request):
+            paginator.paginator = paginator.cursor_pagination_class()
+        else:
+            paginator.paginator = paginator.get_default_pagination_class()()
+        return await apaginate_queryset(
+            paginator.paginator, queryset, request, view
+        )
+
+    if isinstance(paginator, LimitOffsetPagination):
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        if paginator.limit is None:
+            return None
+        paginator.count = await queryset.acount()
+        paginator.offset = paginator.get_offset(request)
+        if (
+            paginator.count > paginator.limit
+            and paginator.template is not None
+        ):
+            paginator.display_page_controls = True
+        if paginator.count == 0 or paginator.offset > paginator.count:
+            return []
+        end = paginator.offset + paginator.limit
+        return [obj async for obj in queryset[paginator.offset:end]]
+
+    if isinstance(paginator, PageNumberPagination):
+        paginator.request = request
+        page_size = paginator.get_page_size(request)
+        if not page_size:
+            return None
+        django_paginator = paginator.django_paginator_class(
+            queryset, page_size
+        )
+        django_paginator.count = await queryset.acount()
+        page_number = paginator.get_page_number(request, django_paginator)
+        try:
+            paginator.page = django_paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(paginator.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        if (
+            django_paginator.num_pages > 1
+            and paginator.template is not None
+        ):
+            paginator.display_page_controls = True
+        paginator.page.object_list = [
+            obj async for obj in paginator.page.object_list
+        ]
+        return list(paginator.page)
+
+    return await sync_to_async(paginator.paginate_queryset)(
+        queryset, request, view
+    )
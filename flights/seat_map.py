@@ -0,0 +1,82 @@
+import base64
+
+
+class SeatMap:
+    """
+    Occupancy bitset of an airplane cabin.
+
+    Seat (row, seat) maps to bit (row - 1) * seats_in_row + (seat - 1),
+    most significant bit first, so a 50 x 6 cabin fits in 38 bytes.
+    """
+
+    def __init__(self, rows: int, seats_in_row: int, data: bytes = b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = (rows * seats_in_row + 7) // 8
+        self._bits = bytearray(bytes(data or b"")[:size].ljust(size, b"\0"))
+
+    @classmethod
+    def for_flight(cls, flight) -> "SeatMap":
+        airplane = flight.airplane
+        return cls(airplane.rows, airplane.seats_in_row, flight.seats_bitmap)
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    def _position(self, row: int, seat: int) -> tuple[int, int]:
+        if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+            raise IndexError(f"Seat {row}-{seat} is out of cabin range")
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index >> 3, 0x80 >> (index & 7)
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        byte, mask = self._position(row, seat)
+        return bool(self._bits[byte] & mask)
+
+    def take(self, row: int, seat: int) -> None:
+        byte, mask = self._position(row, seat)
+        self._bits[byte] |= mask
+
+    def release(self, row: int, seat: int) -> None:
+        byte, mask = self._position(row, seat)
+        self._bits[byte] &= ~mask
+
+    def taken_count(self) -> int:
+        return int.from_bytes(self._bits, "big").bit_count()
+
+    def free_count(self) -> int:
+        return self.capacity - self.taken_count()
+
+    def _taken_indexes(self):
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (0x80 >> bit):
+                    yield byte_index * 8 + bit
+
+    def taken_seats(self) -> list[dict]:
+        return [
+            {
+                "row": index // self.seats_in_row + 1,
+                "seat": index % self.seats_in_row + 1,
+            }
+            for index in self._taken_indexes()
+        ]
+
+    def runs(self) -> list[list[int]]:
+        """Taken seats as [first_index, length] runs in row-major order"""
+        runs = []
+        for index in self._taken_indexes():
+            if runs and runs[-1][0] + runs[-1][1] == index:
+                runs[-1][1] += 1
+            else:
+                runs.append([index, 1])
+        return runs
+
+    def packed(self) -> str:
+        return base64.b64encode(self._bits).decode("ascii")
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._bits)
@@ -1,6 +1,16 @@
-from django.db import transaction
+from collections import Counter
+from datetime import datetime
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.relations import PKOnlyObject
 
+from flights import cache as api_cache, holds
 from flights.models import (
     Airport,
     Airplane,
@@ -13,7 +23,131 @@ from flights.models import (
 )
 
 
-class AirplaneSerializer(serializers.ModelSerializer):
+def _prefetched(instance, name):
+    """Rows of a prefetched relation, without cloning a queryset"""
+    cache = getattr(instance, "_prefetched_objects_cache", {})
+    if name in cache:
+        return cache[name]
+    return getattr(instance, name).all()
+
+
+def _converted(attribute, convert):
+    get = attrgetter(attribute)
+    return lambda instance: convert(get(instance))
+
+
+def _field_getter(field):
+    """The per-field steps of Serializer.to_representation()"""
+
+    def getter(instance):
+        attribute = field.get_attribute(instance)
+        if isinstance(attribute, PKOnlyObject):
+            if attribute.pk is None:
+                return None
+        elif attribute is None:
+            return None
+        return field.to_representation(attribute)
+
+    return getter
+
+
+class FastListSerializer(serializers.ListSerializer):
+    """
+    Serializes list pages with the child's compile_representation(): a
+    function building each object's dict straight from its attributes
+    instead of running the DRF field machinery per object. It must give
+    the same JSON as the child's to_representation(), which is still
+    used with settings.FAST_LIST_SERIALIZATION off.
+    """
+
+    def to_representation(self, data):
+        if not settings.FAST_LIST_SERIALIZATION:
+            return super().to_representation(data)
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        representation = self.child.compile_representation()
+        return [representation(item) for item in data]
+
+
+class CompiledRepresentationMixin:
+    """
+    compile_representation() for the children of FastListSerializer.
+    representation_getters() maps field names to factories taking the
+    bound field and returning a function of the instance; fields without
+    one (or expanded ones) are read the DRF way.
+    """
+
+    def representation_getters(self) -> dict:
+        return {}
+
+    def compile_representation(self):
+        fields = self.fields
+        # Set by SparseFieldsetMixin.get_fields()
+        expanded = getattr(self, "expanded_fields", ())
+        factories = self.representation_getters()
+        getters = [
+            (
+                name,
+                factories[name](field)
+                if name in factories and name not in expanded
+                else _field_getter(field)
+            )
+            for name, field in fields.items()
+            if not field.write_only
+        ]
+
+        def representation(instance):
+            try:
+                return {name: getter(instance) for name, getter in getters}
+            except serializers.SkipField:
+                pass
+            data = {}
+            for name, getter in getters:
+                try:
+                    data[name] = getter(instance)
+                except serializers.SkipField:
+                    pass
+            return data
+
+        return representation
+
+
+class SparseFieldsetMixin:
+    """
+    Applies ?fields= and ?expand= (parsed and validated by the view's
+    SparseFieldsetMixin, flights/views.py) to the root serializer of a
+    response: context["fields"] lists the fields to keep (None keeps
+    all), context["expand"] the fields to replace with the nested
+    serializer given in expandable_fields as (class, kwargs).
+    """
+    expandable_fields = {}
+
+    def _is_root(self):
+        parent = self.parent
+        return parent is None or (
+            isinstance(parent, serializers.ListSerializer)
+            and parent.parent is None
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        self.expanded_fields = set()
+        if not self._is_root():
+            return fields
+        for name in self.context.get("expand", ()):
+            serializer_class, kwargs = self.expandable_fields[name]
+            fields[name] = serializer_class(read_only=True, **kwargs)
+            self.expanded_fields.add(name)
+        requested = self.context.get("fields")
+        if requested is not None:
+            fields = {
+                name: field for name, field in fields.items()
+                if name in requested
+            }
+        return fields
+
+
+class AirplaneSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Airplane
         fields = (
@@ -26,13 +160,16 @@ class AirplaneSerializer(serializers.ModelSerializer):
         )
 
 
-class AirplaneTypeSerializer(serializers.ModelSerializer):
+class AirplaneTypeSerializer(
+    SparseFieldsetMixin,
+    serializers.ModelSerializer
+):
     class Meta:
         model = AirplaneType
         fields = ("id", "name",)
 
 
-class FlightSerializer(serializers.ModelSerializer):
+class FlightSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Flight
         fields = (
@@ -45,38 +182,138 @@ class FlightSerializer(serializers.ModelSerializer):
         )
 
 
-class CrewSerializer(serializers.ModelSerializer):
+class CrewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Crew
         fields = ("id", "first_name", "last_name", "full_name")
 
 
-class CrewListSerializer(serializers.ModelSerializer):
+class CrewListSerializer(
+    SparseFieldsetMixin,
+    CompiledRepresentationMixin,
+    serializers.ModelSerializer
+):
     class Meta:
         model = Crew
         fields = ("id", "full_name")
+        list_serializer_class = FastListSerializer
 
+    def representation_getters(self):
+        return {
+            "id": lambda field: attrgetter("id"),
+            "full_name": lambda field: attrgetter("full_name"),
+        }
 
-class AirportSerializer(serializers.ModelSerializer):
+
+class AirportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Airport
         fields = ("id", "name", "closest_big_city")
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ("id", "distance", "source", "destination")
 
 
-class RouteListSerializer(RouteSerializer):
+class RouteListSerializer(CompiledRepresentationMixin, RouteSerializer):
     source = serializers.SlugRelatedField(read_only=True, slug_field="name")
     destination = serializers.SlugRelatedField(
         read_only=True, slug_field="name"
     )
 
+    class Meta(RouteSerializer.Meta):
+        list_serializer_class = FastListSerializer
+
+    def representation_getters(self):
+        return {
+            "id": lambda field: attrgetter("id"),
+            "distance": lambda field: attrgetter("distance"),
+            "source": lambda field: attrgetter("source.name"),
+            "destination": lambda field: attrgetter("destination.name"),
+        }
+
+
+class AirplaneListSerializer(CompiledRepresentationMixin, AirplaneSerializer):
+    airplane_type = serializers.CharField(
+        source="airplane_type.name",
+        read_only=True
+    )
 
-class FlightListSerializer(serializers.ModelSerializer):
+    class Meta(AirplaneSerializer.Meta):
+        list_serializer_class = FastListSerializer
+
+    expandable_fields = {
+        "airplane_type": (AirplaneTypeSerializer, {}),
+    }
+
+    def representation_getters(self):
+        return {
+            "id": lambda field: attrgetter("id"),
+            "name": lambda field: attrgetter("name"),
+            "rows": lambda field: attrgetter("rows"),
+            "seats_in_row": lambda field: attrgetter("seats_in_row"),
+            "airplane_type": lambda field: _converted(
+                "airplane_type.name", field.to_representation
+            ),
+            "image": lambda field: _converted(
+                "image", field.to_representation
+            ),
+        }
+
+
+def _held_seats(serializer, flight):
+    """Seats held on a flight, unless an async view preloaded them"""
+    held = serializer.context.get("held_seats")
+    if held is None:
+        held = holds.held_seats(flight.pk)
+    return held
+
+
+class FlightHoldsListSerializer(FastListSerializer):
+    """
+    Loads active seat hold counts for the whole page at once, unless an
+    async view preloaded them
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        flights = list(data)
+        held_counts = self.context.get("held_counts")
+        if held_counts is None and "tickets_available" in self.child.fields:
+            held_counts = holds.held_counts(flight.pk for flight in flights)
+        self.child.held_counts = held_counts
+        return super().to_representation(flights)
+
+
+@extend_schema_field(OpenApiTypes.INT)
+class TicketsAvailableField(serializers.ReadOnlyField):
+    """
+    Seats left for sale: the annotated tickets_available minus seats
+    currently on hold. Skipped when the queryset wasn't annotated.
+    """
+
+    def get_attribute(self, instance):
+        if not hasattr(instance, "tickets_available"):
+            raise serializers.SkipField()
+        return instance
+
+    def to_representation(self, flight):
+        held_counts = getattr(self.parent, "held_counts", None)
+        if held_counts is None:
+            held = len(_held_seats(self, flight))
+        else:
+            held = held_counts.get(flight.pk, 0)
+        return max(flight.tickets_available - held, 0)
+
+
+class FlightListSerializer(
+    SparseFieldsetMixin,
+    CompiledRepresentationMixin,
+    serializers.ModelSerializer
+):
     airplane = serializers.SlugRelatedField(read_only=True, slug_field="name")
     crew = serializers.SlugRelatedField(
         read_only=True,
@@ -84,7 +321,7 @@ class FlightListSerializer(serializers.ModelSerializer):
         many=True,
     )
     route = RouteListSerializer()
-    tickets_available = serializers.IntegerField(read_only=True)
+    tickets_available = TicketsAvailableField()
 
     class Meta:
         model = Flight
@@ -97,17 +334,108 @@ class FlightListSerializer(serializers.ModelSerializer):
             "crew",
             "tickets_available",
         )
+        list_serializer_class = FlightHoldsListSerializer
+
+    expandable_fields = {
+        "airplane": (AirplaneListSerializer, {}),
+        "crew": (CrewSerializer, {"many": True}),
+    }
+
+    def representation_getters(self):
+        def crew_names(field):
+            return lambda flight: [
+                crew.full_name for crew in _prefetched(flight, "crew")
+            ]
+
+        def tickets_available(field):
+            def getter(flight):
+                if not hasattr(flight, "tickets_available"):
+                    raise serializers.SkipField()
+                return field.to_representation(flight)
+
+            return getter
+
+        return {
+            "id": lambda field: attrgetter("id"),
+            "departure_time": lambda field: _converted(
+                "departure_time", field.to_representation
+            ),
+            "arrival_time": lambda field: _converted(
+                "arrival_time", field.to_representation
+            ),
+            "route": lambda field: _converted(
+                "route", field.compile_representation()
+            ),
+            "airplane": lambda field: attrgetter("airplane.name"),
+            "crew": crew_names,
+            "tickets_available": tickets_available,
+        }
 
 
 class FlightRetrieveSerializer(FlightSerializer):
+    """
+    Pass ?seat_map=packed (base64 bitmap) or ?seat_map=rle
+    ([first_seat_index, length] runs) to replace "taken_seats"
+    with a compact "seat_map" object for large airplanes.
+    """
+    SEAT_MAP_FORMATS = ("packed", "rle")
+
     route = RouteListSerializer()
     airplane = AirplaneSerializer(many=False, read_only=True)
     crew = CrewSerializer(many=True)
     taken_seats = serializers.SerializerMethodField()
+    held_seats = serializers.SerializerMethodField()
+    seat_map = serializers.SerializerMethodField()
+
+    def _seat_map_format(self):
+        request = self.context.get("request")
+        if request is None:
+            return None
+        seat_map_format = request.query_params.get("seat_map")
+        if seat_map_format and seat_map_format not in self.SEAT_MAP_FORMATS:
+            raise serializers.ValidationError(
+                {"seat_map": f"Must be one of: "
+                             f"{', '.join(self.SEAT_MAP_FORMATS)}"}
+            )
+        return seat_map_format
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self._seat_map_format():
+            fields.pop("taken_seats", None)
+            fields.pop("held_seats", None)
+        else:
+            fields.pop("seat_map", None)
+        return fields
 
     def get_taken_seats(self, obj):
-        tickets = Ticket.objects.filter(flight=obj)
-        return [{"row": ticket.row, "seat": ticket.seat} for ticket in tickets]
+        return obj.get_seat_map().taken_seats()
+
+    def get_held_seats(self, obj):
+        return [
+            {"row": row, "seat": seat}
+            for row, seat in sorted(_held_seats(self, obj))
+        ]
+
+    def get_seat_map(self, obj):
+        """Compact maps mark both sold and held seats as unavailable"""
+        seat_map = obj.get_seat_map()
+        for row, seat in _held_seats(self, obj):
+            try:
+                seat_map.take(row, seat)
+            except IndexError:
+                continue
+        representation = {
+            "format": self._seat_map_format(),
+            "rows": seat_map.rows,
+            "seats_in_row": seat_map.seats_in_row,
+            "seats_free": seat_map.free_count(),
+        }
+        if representation["format"] == "packed":
+            representation["bitmap"] = seat_map.packed()
+        else:
+            representation["runs"] = seat_map.runs()
+        return representation
 
     class Meta:
         model = Flight
@@ -118,17 +446,12 @@ class FlightRetrieveSerializer(FlightSerializer):
             "route",
             "airplane",
             "crew",
-            "taken_seats"
+            "taken_seats",
+            "held_seats",
+            "seat_map",
         )
 
 
-class AirplaneListSerializer(AirplaneSerializer):
-    airplane_type = serializers.CharField(
-        source="airplane_type.name",
-        read_only=True
-    )
-
-
 class AirplaneRetrieveSerializer(AirplaneSerializer):
     airplane_type = AirplaneTypeSerializer()
 
@@ -139,10 +462,67 @@ class AirplaneImageSerializer(serializers.ModelSerializer):
         fields = ("id", "image")
 
 
+class PrefetchedFlightField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves flights from the batch loaded by TicketBatchSerializer
+    instead of running one query per ticket.
+    """
+
+    def to_internal_value(self, data):
+        flights = getattr(self.parent, "prefetched_flights", None)
+        if flights is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return flights[int(data)]
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class TicketBatchSerializer(serializers.ListSerializer):
+    """
+    Loads every flight (with its airplane) referenced by the payload in a
+    single query, so ticket validation runs in memory.
+    """
+
+    def to_internal_value(self, data):
+        flight_ids = set()
+        if isinstance(data, list):
+            for ticket in data:
+                if not isinstance(ticket, dict):
+                    continue
+                try:
+                    flight_ids.add(int(ticket.get("flight")))
+                except (TypeError, ValueError):
+                    continue
+
+        flight_field = self.child.fields["flight"]
+        if not isinstance(flight_field, PrefetchedFlightField):
+            return super().to_internal_value(data)
+        self.child.prefetched_flights = (
+            flight_field.get_queryset().in_bulk(flight_ids)
+        )
+        try:
+            return super().to_internal_value(data)
+        finally:
+            del self.child.prefetched_flights
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    flight = PrefetchedFlightField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight")
+        list_serializer_class = TicketBatchSerializer
+        # Seat uniqueness is checked per flight under a row lock in
+        # OrderSerializer.create, not with one query per ticket.
+        validators = []
 
     def validate(self, attrs):
         airplane = attrs["flight"].airplane
@@ -162,21 +542,136 @@ class TicketListSerializer(TicketSerializer):
     flight = FlightListSerializer()
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    hold = serializers.CharField(
+        write_only=True,
+        required=False,
+        help_text="Id of a seat hold to convert into this order",
+    )
 
     class Meta:
         model = Order
-        fields = ("id", "created_at", "tickets")
+        fields = ("id", "created_at", "tickets", "hold")
+
+    expandable_fields = {
+        "tickets": (TicketListSerializer, {"many": True}),
+    }
+
+    def validate_tickets(self, tickets):
+        seats = set()
+        errors = []
+        for ticket in tickets:
+            seat = (ticket["flight"].pk, ticket["row"], ticket["seat"])
+            if seat in seats:
+                errors.append({"seat": [
+                    f"Seat {ticket['row']}-{ticket['seat']} "
+                    f"is booked twice in this order."
+                ]})
+            else:
+                errors.append({})
+            seats.add(seat)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return tickets
+
+    @staticmethod
+    def _check_seats_free(tickets_data, seat_maps, hold_id=None):
+        seats_by_flight = {}
+        for ticket in tickets_data:
+            seats_by_flight.setdefault(ticket["flight"].pk, []).append(
+                (ticket["row"], ticket["seat"])
+            )
+        held = {
+            (flight_id, row, seat)
+            for flight_id, seats in seats_by_flight.items()
+            for row, seat in holds.seats_held_by_others(
+                flight_id, seats, hold_id
+            )
+        }
+
+        errors = []
+        for ticket in tickets_data:
+            flight_id = ticket["flight"].pk
+            row, seat = ticket["row"], ticket["seat"]
+            if seat_maps[flight_id].is_taken(row, seat):
+                errors.append({"seat": [
+                    f"Seat {row}-{seat} is already "
+                    f"taken on flight {flight_id}."
+                ]})
+            elif (flight_id, row, seat) in held:
+                errors.append({"seat": [
+                    f"Seat {row}-{seat} is on hold on flight {flight_id}."
+                ]})
+            else:
+                errors.append({})
+        if any(errors):
+            raise serializers.ValidationError(
+                {"tickets": errors}, code="seat_taken"
+            )
 
     def create(self, validated_data):
+        hold = None
+        hold_id = validated_data.pop("hold", None)
+        if hold_id:
+            try:
+                hold = holds.get_hold(hold_id, validated_data["user"].pk)
+            except NotFound as error:
+                raise serializers.ValidationError({"hold": error.detail})
+
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
+
+            # Only the booked flights are row-locked, so orders for other
+            # flights never wait, and a conflict is found from the locked
+            # seat map before anything is written.
+            flights = Flight.lock_for_seating(
+                {ticket["flight"].pk for ticket in tickets_data}
+            )
+            seat_maps = {
+                flight_id: flight.get_seat_map()
+                for flight_id, flight in flights.items()
+            }
+            self._check_seats_free(tickets_data, seat_maps, hold_id)
+
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            try:
+                tickets = Ticket.objects.bulk_create([
+                    Ticket(order=order, **ticket_data)
+                    for ticket_data in tickets_data
+                ])
+            except IntegrityError:
+                # The seat map drifted from the tickets table, the unique
+                # constraint is the last line of defence.
+                raise serializers.ValidationError(
+                    {"tickets": ["Some of the seats were just taken, "
+                                 "please choose other seats."]},
+                    code="seat_taken"
+                )
+
+            # bulk_create skips the ticket signals, so the seat maps and
+            # counters of the locked flights are updated here.
+            sold = Counter()
+            for ticket in tickets:
+                seat_maps[ticket.flight_id].take(ticket.row, ticket.seat)
+                sold[ticket.flight_id] += 1
+            for flight_id, flight in flights.items():
+                flight.save_seat_map(seat_maps[flight_id], sold[flight_id])
+            api_cache.invalidate(Ticket)
+
+            if hold:
+                transaction.on_commit(lambda: self._release_hold(hold))
             return order
 
+    @staticmethod
+    def _release_hold(hold):
+        try:
+            holds.release_hold(hold)
+        except holds.SeatHoldsBusy:
+            # The order is saved; the hold's seats are sold now and the
+            # hold itself expires on its own.
+            pass
+
 
 class OrderRetrieveSerializer(OrderSerializer):
     tickets = TicketListSerializer(
@@ -184,3 +679,127 @@ class OrderRetrieveSerializer(OrderSerializer):
         read_only=False,
         allow_empty=False
     )
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    id = serializers.CharField(read_only=True)
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    seats = SeatSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def to_representation(self, hold):
+        return {
+            "id": hold["id"],
+            "flight": hold["flight"],
+            "seats": [
+                {"row": row, "seat": seat} for row, seat in hold["seats"]
+            ],
+            "expires_at": self.fields["expires_at"].to_representation(
+                datetime.fromtimestamp(hold["expires_at"])
+            ),
+        }
+
+    def validate(self, attrs):
+        flight = attrs["flight"]
+        seats = [(seat["row"], seat["seat"]) for seat in attrs["seats"]]
+        if len(seats) > settings.SEAT_HOLDS["MAX_SEATS"]:
+            raise serializers.ValidationError({
+                "seats": f"At most {settings.SEAT_HOLDS['MAX_SEATS']} "
+                         f"seats can be held at once."
+            })
+
+        seat_map = flight.get_seat_map()
+        errors = []
+        for row, seat in seats:
+            try:
+                Ticket.validate_ticket(
+                    row=row,
+                    seat=seat,
+                    rows=seat_map.rows,
+                    seats_in_row=seat_map.seats_in_row,
+                    error_to_raise=serializers.ValidationError
+                )
+            except serializers.ValidationError as error:
+                errors.append(error.detail)
+                continue
+            if seats.count((row, seat)) > 1:
+                errors.append({"seat": [f"Seat {row}-{seat} is repeated."]})
+            elif seat_map.is_taken(row, seat):
+                errors.append(
+                    {"seat": [f"Seat {row}-{seat} is already taken."]}
+                )
+            else:
+                errors.append({})
+        if any(errors):
+            raise serializers.ValidationError({"seats": errors})
+        attrs["seats"] = seats
+        return attrs
+
+    def create(self, validated_data):
+        return holds.create_hold(
+            validated_data["flight"],
+            validated_data["seats"],
+            validated_data["user"].pk,
+        )
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    origin = serializers.IntegerField()
+    destination = serializers.IntegerField()
+    date = serializers.DateField()
+    passengers = serializers.IntegerField(
+        default=1, min_value=1, max_value=settings.SEAT_HOLDS["MAX_SEATS"]
+    )
+    max_stops = serializers.IntegerField(
+        default=settings.ITINERARIES["MAX_STOPS"],
+        min_value=0,
+        max_value=settings.ITINERARIES["MAX_STOPS"],
+    )
+
+    def validate(self, attrs):
+        if attrs["origin"] == attrs["destination"]:
+            raise serializers.ValidationError(
+                {"destination": "Must differ from the origin."}
+            )
+        return attrs
+
+
+class ItineraryLegSerializer(serializers.Serializer):
+    flight = serializers.IntegerField()
+    source = serializers.CharField()
+    destination = serializers.CharField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    tickets_available = serializers.IntegerField()
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    stops = serializers.IntegerField()
+    legs = ItineraryLegSerializer(many=True)
+
+
+class OrderExportSerializer(serializers.Serializer):
+    created_from = serializers.DateField(
+        required=False, help_text="First day of Order.created_at, inclusive"
+    )
+    created_to = serializers.DateField(
+        required=False, help_text="Last day of Order.created_at, inclusive"
+    )
+
+    def validate(self, attrs):
+        created_from = attrs.get("created_from")
+        created_to = attrs.get("created_to")
+        if created_from and created_to and created_from > created_to:
+            raise serializers.ValidationError(
+                {"created_to": "Must not be before created_from."}
+            )
+        return attrs
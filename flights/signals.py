@@ -0,0 +1,109 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save
+)
+from django.dispatch import receiver
+
+from flights import cache, itineraries
+from flights.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+    Ticket
+)
+
+CACHED_MODELS = (
+    Airport, AirplaneType, Crew, Route, Airplane, Flight, Ticket
+)
+
+
+def _update_seat(flight_id, row, seat, taken):
+    """
+    Flip one seat in the flight bitmap and move the tickets_sold counter.
+    The flight row stays locked until the surrounding transaction ends,
+    so concurrent writers of the same flight serialize on it.
+    """
+    with transaction.atomic():
+        flight = Flight.lock_for_seating([flight_id]).get(flight_id)
+        if flight is None:
+            return
+        seat_map = flight.get_seat_map()
+        try:
+            if taken:
+                seat_map.take(row, seat)
+            else:
+                seat_map.release(row, seat)
+        except IndexError:
+            pass
+        flight.save_seat_map(seat_map, 1 if taken else -1)
+
+
+@receiver(post_save, sender=Ticket)
+def take_ticket_seat(sender, instance, created, **kwargs):
+    if created:
+        _update_seat(instance.flight_id, instance.row, instance.seat, True)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    _update_seat(instance.flight_id, instance.row, instance.seat, False)
+
+
+@receiver(pre_save, sender=Airplane)
+def remember_cabin_layout(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    instance._previous_seats_in_row = (
+        Airplane.objects.filter(pk=instance.pk)
+        .values_list("seats_in_row", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Airplane)
+def rebuild_airplane_seat_maps(sender, instance, created, **kwargs):
+    # Bitmap positions shift when the number of seats per row changes.
+    previous = getattr(instance, "_previous_seats_in_row", None)
+    if not created and previous not in (None, instance.seats_in_row):
+        for flight in instance.flights.select_related("airplane"):
+            flight.rebuild_seats_bitmap()
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    cache.invalidate(sender)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_cached_responses, sender=model)
+    post_delete.connect(invalidate_cached_responses, sender=model)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def invalidate_flight_crew(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        cache.invalidate(Flight)
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def refresh_itinerary_flight(sender, instance, **kwargs):
+    flight_id = instance.pk
+    transaction.on_commit(
+        lambda: itineraries.index.refresh(flight_ids=[flight_id])
+    )
+
+
+@receiver(post_save, sender=Route)
+def refresh_itinerary_route(sender, instance, created, **kwargs):
+    # New routes have no flights yet, deleted ones cascade to theirs.
+    if not created:
+        route_id = instance.pk
+        transaction.on_commit(
+            lambda: itineraries.index.refresh(route_ids=[route_id])
+        )
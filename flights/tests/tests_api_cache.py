@@ -0,0 +1,235 @@
+import threading
+import time
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights import cache as api_cache
+from flights.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route
+)
+
+
+class ReferenceDataCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.airport_1 = Airport.objects.create(
+            name="Airport 1", closest_big_city="City 1"
+        )
+        self.airport_2 = Airport.objects.create(
+            name="Airport 2", closest_big_city="City 2"
+        )
+        self.route = Route.objects.create(
+            distance=100, source=self.airport_1, destination=self.airport_2
+        )
+        self.airport_list_url = reverse("flights:airport-list")
+        self.route_list_url = reverse("flights:route-list")
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get(self.airport_list_url)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.airport_list_url)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(len(queries), 0)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get(self.airport_list_url, {"limit": 1})
+        response = self.client.get(self.airport_list_url, {"limit": 2})
+
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_save_invalidates_dependent_viewsets(self):
+        self.client.get(self.route_list_url)
+
+        self.airport_1.name = "Renamed"
+        self.airport_1.save()
+        response = self.client.get(self.route_list_url)
+
+        self.assertEqual(response.data["results"][0]["source"], "Renamed")
+
+    def test_delete_invalidates_cache(self):
+        self.client.get(self.airport_list_url)
+        Airport.objects.create(name="Airport 3", closest_big_city="City 3")
+        response = self.client.get(self.airport_list_url)
+        self.assertEqual(response.data["count"], 3)
+
+        Airport.objects.get(name="Airport 3").delete()
+        response = self.client.get(self.airport_list_url)
+        self.assertEqual(response.data["count"], 2)
+
+    def test_cache_stats(self):
+        self.client.get(self.airport_list_url)
+        self.client.get(self.airport_list_url)
+        admin = get_user_model().objects.create_user(
+            email="admin@admin.com", password="1qazcde3", is_staff=True
+        )
+
+        forbidden = self.client.get(reverse("flights:cache-stats"))
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(reverse("flights:cache-stats"))
+
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.data["AirportViewSet"], {"hits": 1, "misses": 1}
+        )
+
+
+class FlightListCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+        airport_1 = Airport.objects.create(name="A1", closest_big_city="C1")
+        airport_2 = Airport.objects.create(name="A2", closest_big_city="C2")
+        self.flight = Flight.objects.create(
+            departure_time=datetime.now(),
+            arrival_time=datetime.now(),
+            route=Route.objects.create(
+                distance=100, source=airport_1, destination=airport_2
+            ),
+            airplane=Airplane.objects.create(
+                name="Airplane",
+                rows=10,
+                seats_in_row=4,
+                airplane_type=AirplaneType.objects.create(name="Type"),
+            )
+        )
+        self.list_url = reverse("flights:flight-list")
+        self.order_payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+    def tearDown(self):
+        cache.clear()
+
+    def _tickets_available(self):
+        response = self.client.get(self.list_url)
+        return response.data["results"][0]["tickets_available"]
+
+    def test_normalized_query_params_share_an_entry(self):
+        self.client.get(self.list_url + "?source=2,1&destination=&limit=5")
+        self.client.get(self.list_url + "?limit=5&source=1,2")
+
+        self.assertEqual(
+            api_cache.stats()["FlightViewSet"], {"hits": 1, "misses": 1}
+        )
+
+    def test_ticket_sale_invalidates_flight_list(self):
+        self.assertEqual(self._tickets_available(), 40)
+        self.client.post(
+            reverse("flights:order-list"), self.order_payload, format="json"
+        )
+        self.assertEqual(self._tickets_available(), 39)
+
+    def test_crew_change_invalidates_flight_list(self):
+        self.client.get(self.list_url)
+        self.flight.crew.add(
+            Crew.objects.create(first_name="John", last_name="Smith")
+        )
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data["results"][0]["crew"], ["John Smith"])
+
+    @override_settings(FLIGHT_LIST_CACHE={
+        "TIMEOUT": 300,
+        "TOLERATE_STALE_AVAILABILITY": True,
+        "STALE_TIMEOUT": 5,
+    })
+    def test_stale_mode_keeps_cached_availability(self):
+        self.assertEqual(self._tickets_available(), 40)
+        self.client.post(
+            reverse("flights:order-list"), self.order_payload, format="json"
+        )
+        self.assertEqual(self._tickets_available(), 40)
+
+    def test_flight_detail_is_cached_and_invalidated(self):
+        detail_url = reverse("flights:flight-detail", args=(self.flight.id,))
+        self.client.get(detail_url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(detail_url)
+        self.assertEqual(len(queries), 0)
+
+        self.client.post(
+            reverse("flights:order-list"), self.order_payload, format="json"
+        )
+        response = self.client.get(detail_url)
+        self.assertEqual(response.data["taken_seats"], [{"row": 1, "seat": 1}])
+
+    def test_missing_flight_detail_is_not_cached(self):
+        detail_url = reverse(
+            "flights:flight-detail", args=(self.flight.id + 1,)
+        )
+        self.assertEqual(self.client.get(detail_url).status_code, 404)
+        self.assertEqual(self.client.get(detail_url).status_code, 404)
+
+
+class CoalesceTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_concurrent_misses_build_once(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"value": 1}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    api_cache.coalesce("key", "stale", build, 60)
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"value": 1}] * 5)
+
+    def test_stale_value_served_while_another_worker_rebuilds(self):
+        cache.set("stale", {"value": "old"})
+        cache.add(api_cache.LOCK_KEY.format(key="key"), 1)
+
+        def build():
+            raise AssertionError("should not rebuild")
+
+        self.assertEqual(
+            api_cache.coalesce("key", "stale", build, 60), {"value": "old"}
+        )
+
+    def test_uncacheable_result_is_not_stored(self):
+        self.assertIsNone(api_cache.coalesce("key", "stale", lambda: None, 60))
+        self.assertIsNone(cache.get("key"))
@@ -0,0 +1,159 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights import holds
+from flights.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket
+)
+
+
+class AsyncReadAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+        airport_1 = Airport.objects.create(name="A1", closest_big_city="C1")
+        airport_2 = Airport.objects.create(name="A2", closest_big_city="C2")
+        route = Route.objects.create(
+            distance=100, source=airport_1, destination=airport_2
+        )
+        airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Type"),
+        )
+        crew = Crew.objects.create(first_name="John", last_name="Smith")
+        for hours in range(3):
+            flight = Flight.objects.create(
+                departure_time=datetime.now() + timedelta(hours=hours),
+                arrival_time=datetime.now() + timedelta(hours=hours + 2),
+                route=route,
+                airplane=airplane,
+            )
+            flight.crew.add(crew)
+        self.flight = flight
+        self.order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def _assert_same_as_sync(self, name, args=(), params=None):
+        sync = self.client.get(reverse(f"flights:{name}", args=args), params)
+        cache.clear()
+        response = self.client.get(
+            reverse(f"flights:async-{name}", args=args), params
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data, expected = response.json(), sync.json()
+        if "results" in expected:
+            self.assertEqual(data["count"], expected["count"])
+            data, expected = data["results"], expected["results"]
+        self.assertEqual(data, expected)
+
+    def test_cache_is_not_used_on_the_event_loop(self):
+        holds.create_hold(self.flight, [(2, 2)], self.user.pk)
+        on_loop = []
+
+        def blocking(method):
+            def wrapper(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append(method.__name__)
+                except RuntimeError:
+                    pass
+                return method(*args, **kwargs)
+            return wrapper
+
+        patches = [
+            mock.patch.object(
+                LocMemCache, name, blocking(getattr(LocMemCache, name))
+            )
+            for name in ("get", "get_many", "add", "incr", "set")
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        for _ in range(2):
+            detail = self.client.get(
+                reverse("flights:async-flight-detail", args=[self.flight.id])
+            )
+            self.client.get(reverse("flights:async-flight-list"))
+
+        self.assertEqual(on_loop, [])
+        self.assertEqual(detail.data["held_seats"], [{"row": 2, "seat": 2}])
+
+    def test_flight_list_matches_sync(self):
+        self._assert_same_as_sync("flight-list", params={"limit": 2})
+
+    def test_flight_detail_matches_sync(self):
+        self._assert_same_as_sync("flight-detail", args=(self.flight.id,))
+
+    def test_airport_and_route_lists_match_sync(self):
+        self._assert_same_as_sync("airport-list")
+        self._assert_same_as_sync("route-list", params={"source": "1,2"})
+
+    def test_cursor_pagination(self):
+        response = self.client.get(
+            reverse("flights:async-flight-list"), {"pagination": "cursor"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_orders_are_scoped_to_user(self):
+        other = get_user_model().objects.create_user(
+            email="other@user.com", password="1qazcde3"
+        )
+        other_order = Order.objects.create(user=other)
+
+        response = self.client.get(reverse("flights:async-order-list"))
+        self.assertEqual(
+            [order["id"] for order in response.data["results"]],
+            [self.order.id]
+        )
+
+        response = self.client.get(
+            reverse("flights:async-order-detail", args=(other_order.id,))
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_detail(self):
+        response = self.client.get(
+            reverse("flights:async-order-detail", args=(self.order.id,))
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["tickets"][0]["flight"]["id"], self.flight.id
+        )
+
+    def test_auth_required(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse("flights:async-flight-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,127 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from airport_service.fastjson import FastJSONParser, FastJSONRenderer
+from flights.models import Airplane, AirplaneType, Airport, Crew, Flight, Route
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def assertRendersLikeDRF(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type)
+        )
+
+    def test_same_output_as_drf(self):
+        self.assertRendersLikeDRF({
+            "naive": datetime(2024, 7, 1, 8, 30, 0, 1234),
+            "utc": datetime(2024, 7, 1, 8, 30, tzinfo=timezone.utc),
+            "offset": datetime(
+                2024, 7, 1, 8, 30, tzinfo=timezone(timedelta(hours=2))
+            ),
+            "date": date(2024, 7, 1),
+            "time": time(8, 30, 15),
+            "duration": timedelta(hours=1, seconds=3),
+            "decimal": Decimal("1000.25"),
+            "lazy": gettext_lazy("This field is required."),
+            "uuid": uuid.UUID("12345678123456781234567812345678"),
+            "text": "Київ \"Бориспіль\" \\ / \t\n\x01    ✈",
+            "numbers": [0, -1, 2 ** 63 - 1, 0.1, 1.5, -2.25, True, None],
+            "tuple": (1, "2"),
+            1: "integer key",
+        })
+
+    def test_falls_back_to_drf(self):
+        # Too big for orjson
+        self.assertRendersLikeDRF({"big": 2 ** 70})
+        # Indented output
+        self.assertRendersLikeDRF(
+            {"id": 1, "name": ["a"]}, "application/json; indent=4"
+        )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class FastJSONParserTest(SimpleTestCase):
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body), "application/json", {})
+
+    def test_same_result_as_drf(self):
+        for body in (
+            b'{"tickets": [{"row": 1, "seat": 2, "flight": 3}]}',
+            '{"name": "Київ \\u2028", "x": 1.5e3, "n": null}'.encode(),
+            b'{"big": 123456789012345678901234567890}',
+            b"[]",
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(
+                    self.parse(FastJSONParser(), body),
+                    self.parse(JSONParser(), body)
+                )
+
+    def test_parse_errors(self):
+        for body in (b'{"row": ', b'{"row": NaN}'):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(FastJSONParser(), body)
+
+
+class FastJSONApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3", is_staff=True
+        )
+        self.client.force_authenticate(user=self.user)
+        kyiv = Airport.objects.create(name="Київ", closest_big_city="Київ")
+        lviv = Airport.objects.create(name="Lviv", closest_big_city="Lviv")
+        airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=10,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Boeing"),
+        )
+        crew = Crew.objects.create(first_name="John", last_name="Smith")
+        self.route = Route.objects.create(
+            distance=540, source=kyiv, destination=lviv
+        )
+        flight = Flight.objects.create(
+            departure_time=datetime(2024, 7, 1, 8, 30, 0, 1234),
+            arrival_time=datetime(2024, 7, 1, 10),
+            route=self.route,
+            airplane=airplane,
+        )
+        flight.crew.add(crew)
+
+    def test_flight_list_renders_like_drf(self):
+        response = self.client.get(reverse("flights:flight-list"))
+
+        self.assertEqual(
+            response.content, JSONRenderer().render(response.data)
+        )
+
+    def test_json_requests_are_parsed(self):
+        response = self.client.post(
+            reverse("flights:route-list"),
+            {
+                "distance": 541,
+                "source": self.route.destination_id,
+                "destination": self.route.source_id,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["distance"], 541)
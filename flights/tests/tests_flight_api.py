@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from django.contrib.auth import get_user_model
 from django.db.models import F, Count
@@ -94,6 +94,105 @@ class AuthenticatedFlightApiTest(BaseFlightAPITest):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def _create_flight(self, departure_time, route=None, airplane=None):
+        return Flight.objects.create(
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=2),
+            route=route or self.route,
+            airplane=airplane or self.airplane
+        )
+
+    def _result_ids(self, response):
+        return [flight["id"] for flight in response.data["results"]]
+
+    def test_flight_filter_by_source_and_destination(self):
+        airport_3 = Airport.objects.create(
+            name="Airport Test 3",
+            closest_big_city="City test 3"
+        )
+        other_route = Route.objects.create(
+            distance=500,
+            source=self.airport_2,
+            destination=airport_3
+        )
+        other_flight = self._create_flight(datetime.now(), route=other_route)
+
+        response = self.client.get(
+            self.list_url,
+            {"source": self.airport_2.id, "destination": airport_3.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._result_ids(response), [other_flight.id])
+
+    def test_flight_filter_by_departure_date(self):
+        departure = datetime(2030, 7, 1, 23, 30)
+        flight_in_day = self._create_flight(departure)
+        self._create_flight(departure + timedelta(hours=1))
+
+        response = self.client.get(
+            self.list_url, {"departure_date": "2030-07-01"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._result_ids(response), [flight_in_day.id])
+
+    def test_flight_filter_by_date_range(self):
+        first = self._create_flight(datetime(2030, 7, 1, 8))
+        second = self._create_flight(datetime(2030, 7, 3, 8))
+        self._create_flight(datetime(2030, 7, 4, 8))
+
+        response = self.client.get(
+            self.list_url, {"date_from": "2030-07-01", "date_to": "2030-07-03"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._result_ids(response), [first.id, second.id])
+
+    def test_flight_filter_by_airplane_type(self):
+        type_2 = AirplaneType.objects.create(name="Type 2")
+        airplane_2 = Airplane.objects.create(
+            name="Test Airplane 2",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=type_2
+        )
+        flight = self._create_flight(datetime.now(), airplane=airplane_2)
+
+        response = self.client.get(
+            self.list_url, {"airplane_type": type_2.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._result_ids(response), [flight.id])
+
+    def test_flight_filter_invalid_date(self):
+        response = self.client.get(
+            self.list_url, {"departure_date": "01.07.2030"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_flight_cursor_pagination(self):
+        later = [
+            self._create_flight(datetime(2030, 7, day, 8))
+            for day in range(1, 7)
+        ]
+
+        response = self.client.get(self.list_url, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(
+            self._result_ids(response),
+            [self.flight.id] + [flight.id for flight in later[:4]]
+        )
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self._result_ids(response), [flight.id for flight in later[4:]]
+        )
+        self.assertIsNone(response.data["next"])
+
     def test_flight_detail_authenticated(self):
         response = self.client.get(self.detail_url)
         serializer = FlightRetrieveSerializer(self.flight)
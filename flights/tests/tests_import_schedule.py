@@ -0,0 +1,193 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from flights.models import Airplane, AirplaneType, Airport, Crew, Flight, Route
+
+
+class ImportScheduleTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        Airport.objects.create(name="Kyiv", closest_big_city="Kyiv")
+        self.files = {
+            "airports": self._write(
+                "airports.csv",
+                "name,closest_big_city\n"
+                "Kyiv,Kyiv\n"
+                "Lviv,Lviv\n"
+                "Warsaw,Warsaw\n",
+            ),
+            "airplanes": self._write(
+                "airplanes.csv",
+                "name,rows,seats_in_row,airplane_type\n"
+                "UR-001,30,6,Boeing 737\n"
+                "UR-002,20,4,ATR 72\n",
+            ),
+            "routes": self._write(
+                "routes.csv",
+                "source,destination,distance\n"
+                "Kyiv,Lviv,470\n"
+                "Lviv,Warsaw,330\n",
+            ),
+            "crew": self._write(
+                "crew.csv",
+                "first_name,last_name\n"
+                "John,Smith\n"
+                "Anna,Kovalenko\n",
+            ),
+            "flights": self._write("flights.jsonl", "\n".join(
+                json.dumps(row) for row in [
+                    {
+                        "source": "Kyiv",
+                        "destination": "Lviv",
+                        "airplane": "UR-001",
+                        "departure_time": "2030-07-01T08:00:00",
+                        "arrival_time": "2030-07-01T09:10:00",
+                        "crew": ["John Smith", "Anna Kovalenko"],
+                    },
+                    {
+                        "source": "Lviv",
+                        "destination": "Warsaw",
+                        "airplane": "UR-002",
+                        "departure_time": "2030-07-01T11:00:00",
+                        "arrival_time": "2030-07-01T12:00:00",
+                    },
+                ]
+            )),
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def _import(self, *args, **files):
+        options = []
+        for name, path in {**self.files, **files}.items():
+            options += [f"--{name}", path]
+        out = StringIO()
+        call_command(
+            "import_schedule", *options, *args,
+            "--batch-size", "1", stdout=out, stderr=StringIO()
+        )
+        return out.getvalue()
+
+    def test_import_resolves_names_and_skips_existing_rows(self):
+        output = self._import()
+
+        self.assertIn("airports: 2 imported, 1 already present", output)
+        self.assertEqual(Airport.objects.count(), 3)
+        self.assertEqual(AirplaneType.objects.count(), 2)
+        self.assertEqual(Airplane.objects.count(), 2)
+        self.assertEqual(Route.objects.count(), 2)
+        self.assertEqual(Crew.objects.count(), 2)
+
+        flight = Flight.objects.get(route__source__name="Kyiv")
+        self.assertEqual(flight.route.destination.name, "Lviv")
+        self.assertEqual(flight.airplane.name, "UR-001")
+        self.assertEqual(flight.crew.count(), 2)
+        self.assertEqual(flight.get_seat_map().free_count(), 180)
+
+    def test_import_can_run_again(self):
+        self._import()
+
+        output = self._import()
+
+        self.assertIn("flights: 0 imported, 2 already present", output)
+        self.assertEqual(Flight.objects.count(), 2)
+
+    @skipUnless(connection.vendor == "postgresql", "COPY is PostgreSQL only")
+    def test_flights_are_copied_on_postgresql(self):
+        self._import()
+
+        flight = Flight.objects.get(route__source__name="Kyiv")
+        self.assertEqual(
+            set(flight.crew.values_list("last_name", flat=True)),
+            {"Smith", "Kovalenko"},
+        )
+        self.assertEqual(flight.get_seat_map().free_count(), 180)
+        # The sequence was advanced past the copied ids
+        created = Flight.objects.create(
+            route=flight.route,
+            airplane=flight.airplane,
+            departure_time=flight.departure_time,
+            arrival_time=flight.arrival_time,
+        )
+        self.assertGreater(
+            created.pk, max(Flight.objects.exclude(pk=created.pk)
+                            .values_list("pk", flat=True))
+        )
+
+    def test_dry_run_writes_nothing(self):
+        output = self._import("--dry-run")
+
+        self.assertIn("All rows are valid.", output)
+        self.assertIn("flights: 2 valid", output)
+        self.assertEqual(Airport.objects.count(), 1)
+        self.assertFalse(Flight.objects.exists())
+
+    def test_invalid_rows_abort_the_import(self):
+        flights = self._write(
+            "flights.csv",
+            "source,destination,airplane,departure_time,arrival_time,crew\n"
+            "Kyiv,Lviv,UR-001,2030-07-01T08:00,2030-07-01T09:00,John Smith\n"
+            "Kyiv,Warsaw,UR-001,2030-07-01T08:00,2030-07-01T09:00,\n"
+            "Kyiv,Lviv,UR-009,2030-07-01T08:00,2030-07-01T07:00,Nobody\n",
+        )
+
+        err = StringIO()
+        with self.assertRaisesMessage(CommandError, "2 invalid row(s)"):
+            call_command(
+                "import_schedule",
+                "--airports", self.files["airports"],
+                "--airplanes", self.files["airplanes"],
+                "--routes", self.files["routes"],
+                "--crew", self.files["crew"],
+                "--flights", flights,
+                stdout=StringIO(),
+                stderr=err,
+            )
+
+        self.assertIn("flights.csv:3: no route between these airports",
+                      err.getvalue())
+        self.assertIn("flights.csv:4: unknown airplane 'UR-009'",
+                      err.getvalue())
+        self.assertEqual(Airport.objects.count(), 1)
+        self.assertFalse(Flight.objects.exists())
+
+    def test_invalid_row_doesnt_break_later_references(self):
+        airports = self._write(
+            "airports.csv",
+            "name,closest_big_city\n"
+            "Odesa,\n"
+            "Lviv,Lviv\n"
+            "Warsaw,Warsaw\n",
+        )
+
+        err = StringIO()
+        with self.assertRaisesMessage(CommandError, "1 invalid row(s)"):
+            call_command(
+                "import_schedule",
+                "--airports", airports,
+                "--routes", self.files["routes"],
+                "--batch-size", "1",
+                stdout=StringIO(),
+                stderr=err,
+            )
+
+        self.assertEqual(
+            err.getvalue().strip(),
+            f"{airports}:2: closest_big_city is required",
+        )
+        self.assertEqual(Airport.objects.count(), 1)
@@ -0,0 +1,113 @@
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights import itineraries
+from flights.models import Airplane, AirplaneType, Airport, Flight, Route
+
+ITINERARY_URL = reverse("flights:itineraries")
+
+
+class ItinerarySearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.day = date.today() + timedelta(days=2)
+        self.airports = {
+            name: Airport.objects.create(name=name, closest_big_city=name)
+            for name in "ABCD"
+        }
+        self.airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=2,
+            seats_in_row=2,
+            airplane_type=AirplaneType.objects.create(name="Type"),
+        )
+        self.a_b = self._flight("A", "B", "08:00", "10:00")
+        self.b_c = self._flight("B", "C", "11:00", "13:00")
+        self._flight("B", "C", "10:15", "12:00")
+        self.a_c = self._flight("A", "C", "09:00", "14:00")
+        self.c_d = self._flight("C", "D", "14:00", "16:00")
+
+    def tearDown(self):
+        cache.clear()
+
+    def _at(self, clock):
+        return datetime.combine(self.day, time.fromisoformat(clock))
+
+    def _flight(self, source, destination, departure, arrival):
+        route, _ = Route.objects.get_or_create(
+            source=self.airports[source],
+            destination=self.airports[destination],
+            defaults={"distance": 100},
+        )
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=self._at(departure),
+            arrival_time=self._at(arrival),
+        )
+
+    def _search(self, source, destination, **params):
+        response = self.client.get(ITINERARY_URL, {
+            "origin": self.airports[source].id,
+            "destination": self.airports[destination].id,
+            "date": self.day.isoformat(),
+            **params,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            [leg["flight"] for leg in itinerary["legs"]]
+            for itinerary in response.data
+        ]
+
+    def test_direct_and_connecting_flights_by_arrival(self):
+        self.assertEqual(
+            self._search("A", "C"),
+            [[self.a_b.id, self.b_c.id], [self.a_c.id]]
+        )
+
+    def test_max_stops(self):
+        self.assertEqual(self._search("A", "C", max_stops=0), [[self.a_c.id]])
+        self.assertEqual(
+            self._search("A", "D"),
+            [[self.a_b.id, self.b_c.id, self.c_d.id]]
+        )
+        self.assertEqual(self._search("A", "D", max_stops=1), [])
+
+    def test_legs_without_enough_seats_are_skipped(self):
+        Flight.objects.filter(pk=self.b_c.pk).update(tickets_sold=3)
+        self.assertEqual(self._search("A", "C", passengers=2), [[self.a_c.id]])
+
+    def test_schedule_changes_are_applied_incrementally(self):
+        self._search("A", "C")
+
+        with mock.patch.object(
+            itineraries.index, "load", wraps=itineraries.index.load
+        ) as load, self.captureOnCommitCallbacks(execute=True):
+            later = self._flight("B", "C", "12:00", "13:30")
+        results = self._search("A", "C")
+        load.assert_not_called()
+        self.assertIn([self.a_b.id, later.id], results)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            later.delete()
+        self.assertNotIn([self.a_b.id, later.id], self._search("A", "C"))
+
+    def test_origin_must_differ_from_destination(self):
+        response = self.client.get(ITINERARY_URL, {
+            "origin": self.airports["A"].id,
+            "destination": self.airports["A"].id,
+            "date": self.day.isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
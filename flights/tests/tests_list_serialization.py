@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights import holds
+from flights.models import Airplane, AirplaneType, Airport, Crew, Flight, Route
+
+LIST_URLS = (
+    reverse("flights:flight-list"),
+    reverse("flights:route-list"),
+    reverse("flights:airplane-list"),
+    reverse("flights:crew-list"),
+    reverse("flights:async-flight-list"),
+    reverse("flights:async-route-list"),
+)
+
+
+class FastListSerializationTest(TestCase):
+    """The fast list path must render the same bytes as DRF's fields"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+
+        kyiv = Airport.objects.create(name="Kyiv", closest_big_city="Kyiv")
+        lviv = Airport.objects.create(
+            name="Lviv \"Danylo\" Галицький",
+            closest_big_city="Lviv"
+        )
+        routes = [
+            Route.objects.create(distance=540, source=kyiv, destination=lviv),
+            Route.objects.create(distance=541, source=lviv, destination=kyiv),
+        ]
+        airplane_type = AirplaneType.objects.create(name="Boeing")
+        airplanes = [
+            Airplane.objects.create(
+                name=f"Airplane {index}",
+                rows=10 + index,
+                seats_in_row=6,
+                airplane_type=airplane_type,
+            )
+            for index in range(3)
+        ]
+        Airplane.objects.filter(pk=airplanes[0].pk).update(
+            image="upload/airplanes/airplane-0.jpg"
+        )
+        crew = [
+            Crew.objects.create(first_name="John", last_name="Smith"),
+            Crew.objects.create(first_name="Anna", last_name="Koval"),
+        ]
+        for index in range(4):
+            flight = Flight.objects.create(
+                departure_time=datetime(2024, 7, 1 + index, 8, 30, 0, 1234),
+                arrival_time=datetime(2024, 7, 1 + index, 10),
+                route=routes[index % 2],
+                airplane=airplanes[index % 3],
+            )
+            flight.crew.set(crew[:index % 3])
+        holds.create_hold(flight, [(1, 1), (1, 2)], self.user.id)
+
+    def tearDown(self):
+        cache.clear()
+
+    def _content(self, url, fast):
+        cache.clear()
+        with override_settings(FAST_LIST_SERIALIZATION=fast):
+            response = self.client.get(url, {"limit": 100})
+        self.assertEqual(response.status_code, 200, url)
+        return response.content
+
+    def test_list_endpoints_render_the_same_bytes(self):
+        for url in LIST_URLS:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self._content(url, fast=True),
+                    self._content(url, fast=False)
+                )
+
+    def test_cursor_pages_render_the_same_bytes(self):
+        url = reverse("flights:flight-list")
+        cache.clear()
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            fast = self.client.get(url, {"pagination": "cursor"}).content
+        cache.clear()
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            slow = self.client.get(url, {"pagination": "cursor"}).content
+        self.assertEqual(fast, slow)
+
+    def test_image_urls_are_absolute(self):
+        data = self.client.get(
+            reverse("flights:airplane-list")
+        ).json()["results"]
+
+        self.assertEqual(
+            data[0]["image"],
+            "http://testserver/files/media/upload/airplanes/airplane-0.jpg"
+        )
+        self.assertIsNone(data[1]["image"])
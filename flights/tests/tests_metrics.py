@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights.models import Airport
+
+AIRPORT_URL = reverse("flights:airport-list")
+METRICS_URL = reverse("metrics")
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS={**settings.METRICS, "ENABLED": True})
+class MetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.airport = Airport.objects.create(
+            name="Kyiv", closest_big_city="Kyiv"
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_requests_are_counted_by_view_action_and_status(self):
+        labels = {"view": "AirportViewSet", "action": "retrieve"}
+        ok = sample(
+            "api_requests_total", **labels, method="GET", status="200"
+        )
+        not_found = sample(
+            "api_requests_total", **labels, method="GET", status="404"
+        )
+        timed = sample("api_request_duration_seconds_count", **labels)
+        queries = sample("api_db_queries_per_request_sum", **labels)
+
+        self.client.get(reverse(
+            "flights:airport-detail", args=[self.airport.id]
+        ))
+        self.client.get(reverse("flights:airport-detail", args=[0]))
+
+        self.assertEqual(sample(
+            "api_requests_total", **labels, method="GET", status="200"
+        ), ok + 1)
+        self.assertEqual(sample(
+            "api_requests_total", **labels, method="GET", status="404"
+        ), not_found + 1)
+        self.assertEqual(
+            sample("api_request_duration_seconds_count", **labels),
+            timed + 2
+        )
+        self.assertEqual(
+            sample("api_db_queries_per_request_sum", **labels), queries + 2
+        )
+
+    def test_cache_hits_and_misses(self):
+        labels = {"cache": "AirportViewSet"}
+        hits = sample("api_cache_requests_total", **labels, outcome="hits")
+        misses = sample(
+            "api_cache_requests_total", **labels, outcome="misses"
+        )
+
+        self.client.get(AIRPORT_URL)
+        self.client.get(AIRPORT_URL)
+
+        self.assertEqual(
+            sample("api_cache_requests_total", **labels, outcome="hits"),
+            hits + 1
+        )
+        self.assertEqual(
+            sample("api_cache_requests_total", **labels, outcome="misses"),
+            misses + 1
+        )
+
+    def test_scrape_endpoint(self):
+        self.client.get(AIRPORT_URL)
+        self.client.force_login(get_user_model().objects.create_user(
+            email="admin@user.com", password="1qazcde3", is_staff=True
+        ))
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            'api_requests_total{action="list",method="GET",'
+            'status="200",view="AirportViewSet"}',
+            response.content.decode()
+        )
+
+    def test_scrape_endpoint_without_token_is_staff_only(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+        self.client.force_login(self.user)
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+        with override_settings(DEBUG=True):
+            self.assertEqual(
+                self.client.get(METRICS_URL).status_code, status.HTTP_200_OK
+            )
+
+    def test_scrape_endpoint_token(self):
+        with override_settings(METRICS={**settings.METRICS, "TOKEN": "s"}):
+            self.assertEqual(
+                self.client.get(METRICS_URL).status_code,
+                status.HTTP_403_FORBIDDEN
+            )
+            response = self.client.get(
+                METRICS_URL, headers={"Authorization": "Bearer s"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,153 @@
+import csv
+import json
+import os
+import tempfile
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights import exports
+from flights.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Order,
+    Route,
+    Ticket
+)
+
+
+def export_url(export_format):
+    return reverse("flights:order-export", args=[export_format])
+
+
+class OrderExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@admin.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        route = Route.objects.create(
+            distance=100,
+            source=Airport.objects.create(name="Kyiv", closest_big_city="K"),
+            destination=Airport.objects.create(
+                name="Lviv", closest_big_city="L"
+            ),
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=Airplane.objects.create(
+                name="UR-001",
+                rows=10,
+                seats_in_row=4,
+                airplane_type=AirplaneType.objects.create(name="Type"),
+            ),
+            departure_time=datetime(2030, 7, 1, 8),
+            arrival_time=datetime(2030, 7, 1, 9),
+        )
+        self.orders = []
+        for day, seats in ((1, (1, 2)), (2, (3,)), (3, (4,))):
+            order = Order.objects.create(user=self.user)
+            Order.objects.filter(pk=order.pk).update(
+                created_at=datetime(2024, 5, day, 12)
+            )
+            for seat in seats:
+                Ticket.objects.create(
+                    row=1, seat=seat, flight=self.flight, order=order
+                )
+            self.orders.append(order)
+
+    @staticmethod
+    def _content(response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_is_staff_only(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(export_url("ndjson"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_ndjson_has_one_order_per_line(self):
+        response = self.client.get(export_url("ndjson"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [
+            json.loads(line) for line in self._content(response).splitlines()
+        ]
+        self.assertEqual(
+            [record["id"] for record in records],
+            [order.id for order in self.orders]
+        )
+        first = records[0]
+        self.assertEqual(first["user"], "user@user.com")
+        self.assertEqual(first["created_at"], "2024-05-01T12:00:00")
+        self.assertEqual(
+            [ticket["seat"] for ticket in first["tickets"]], [1, 2]
+        )
+        self.assertEqual(first["tickets"][0]["flight"], {
+            "id": self.flight.id,
+            "source": "Kyiv",
+            "destination": "Lviv",
+            "departure_time": "2030-07-01T08:00:00",
+            "arrival_time": "2030-07-01T09:00:00",
+            "airplane": "UR-001",
+        })
+
+    def test_csv_has_one_ticket_per_line(self):
+        response = self.client.get(export_url("csv"))
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(StringIO(self._content(response))))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(tuple(rows[0]), exports.CSV_COLUMNS)
+        self.assertEqual(rows[1]["order_id"], str(self.orders[0].id))
+        self.assertEqual(rows[1]["seat"], "2")
+
+    def test_filter_by_created_at(self):
+        response = self.client.get(
+            export_url("ndjson"),
+            {"created_from": "2024-05-02", "created_to": "2024-05-02"}
+        )
+        records = self._content(response).splitlines()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(json.loads(records[0])["id"], self.orders[1].id)
+
+        response = self.client.get(
+            export_url("ndjson"),
+            {"created_from": "2024-05-03", "created_to": "2024-05-01"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tickets_are_prefetched_per_chunk(self):
+        queryset = exports.orders_for_export()
+        with self.assertNumQueries(3):
+            records = list(exports.order_records(queryset, chunk_size=2))
+        self.assertEqual(len(records), 3)
+
+    def test_export_orders_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "orders.csv")
+            call_command(
+                "export_orders",
+                "--format", "csv",
+                "--from", "2024-05-02",
+                "--output", path,
+                stdout=StringIO(),
+            )
+            with open(path, newline="", encoding="utf-8") as file:
+                rows = list(csv.DictReader(file))
+        self.assertEqual(
+            [row["order_id"] for row in rows],
+            [str(self.orders[1].id), str(self.orders[2].id)]
+        )
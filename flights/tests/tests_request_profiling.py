@@ -0,0 +1,107 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from flights.models import Airport
+
+AIRPORT_URL = reverse("flights:airport-list")
+
+
+def profiling(**options):
+    return override_settings(
+        REQUEST_PROFILING={**settings.REQUEST_PROFILING, **options}
+    )
+
+
+def server_timing(response) -> dict:
+    metrics = {}
+    for entry in response["Server-Timing"].split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@profiling(ENABLED=True, SAMPLE_RATE=1.0)
+class RequestProfilingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.staff = get_user_model().objects.create_user(
+            email="staff@staff.com", password="1qazcde3", is_staff=True
+        )
+        Airport.objects.create(name="Kyiv", closest_big_city="Kyiv")
+
+    def tearDown(self):
+        cache.clear()
+
+    def _get(self, url, user, **headers):
+        return self.client.get(url, headers={
+            "Authorization": f"Bearer {AccessToken.for_user(user)}",
+            **headers,
+        })
+
+    def test_server_timing_header(self):
+        response = self._get(AIRPORT_URL, self.user)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = server_timing(response)
+        self.assertEqual(
+            set(metrics), {"total", "db", "view", "serialize"}
+        )
+        # The user lookup of the JWT, the count and the page
+        self.assertEqual(metrics["db"]["desc"], '"3 queries"')
+        self.assertGreaterEqual(
+            float(metrics["total"]["dur"]), float(metrics["db"]["dur"])
+        )
+
+    def test_sampled_requests_are_logged(self):
+        with self.assertLogs("airport_service.requests", "INFO") as logs:
+            self._get(AIRPORT_URL, self.user)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["path"], AIRPORT_URL)
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["queries"], 3)
+
+    @profiling(SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_timed(self):
+        response = self._get(AIRPORT_URL, self.user)
+        self.assertNotIn("Server-Timing", response)
+
+    def test_staff_can_profile_a_request(self):
+        response = self._get(AIRPORT_URL, self.staff, X_Profile="1")
+
+        self.assertEqual(
+            response["Content-Type"], "text/plain; charset=utf-8"
+        )
+        self.assertEqual(response["X-Profiled-Status"], "200")
+        self.assertIn("function calls", response.content.decode())
+
+    def test_profile_header_is_ignored_for_other_users(self):
+        response = self._get(AIRPORT_URL, self.user, X_Profile="1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profiled-Status", response)
+        self.assertEqual(response.json()["count"], 1)
+
+    async def test_async_views_are_timed(self):
+        token = AccessToken.for_user(self.user)
+        response = await self.async_client.get(
+            reverse("flights:async-airport-list"),
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            server_timing(response)["db"]["desc"], '"3 queries"'
+        )
@@ -95,6 +95,18 @@ class AuthenticatedRouteApiTest(BaseRouteAPITest):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_route_cursor_pagination(self):
+        response = self.client.get(
+            self.route_list_url, {"pagination": "cursor", "page_size": 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.route.id)
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.route_2.id)
+        self.assertIsNone(response.data["next"])
+
     def test_create_flight_forbidden(self):
         response = self.client.post(self.route_list_url, self.payload)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,235 @@
+import time
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights import holds
+from flights.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Order,
+    Route
+)
+
+HOLD_URL = reverse("flights:seat-hold-list")
+ORDER_URL = reverse("flights:order-list")
+
+
+class SeatHoldApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+        route = Route.objects.create(
+            distance=100,
+            source=Airport.objects.create(name="A1", closest_big_city="C1"),
+            destination=Airport.objects.create(
+                name="A2", closest_big_city="C2"
+            ),
+        )
+        self.flight = Flight.objects.create(
+            departure_time=datetime.now(),
+            arrival_time=datetime.now(),
+            route=route,
+            airplane=Airplane.objects.create(
+                name="Airplane",
+                rows=10,
+                seats_in_row=4,
+                airplane_type=AirplaneType.objects.create(name="Type"),
+            )
+        )
+        self.payload = {
+            "flight": self.flight.id,
+            "seats": [{"row": 1, "seat": 1}, {"row": 1, "seat": 2}],
+        }
+
+    def tearDown(self):
+        cache.clear()
+
+    def _hold(self):
+        response = self.client.post(HOLD_URL, self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def test_hold_reduces_availability(self):
+        self._hold()
+
+        flights = self.client.get(reverse("flights:flight-list"))
+        detail = self.client.get(
+            reverse("flights:flight-detail", args=[self.flight.id])
+        )
+
+        self.assertEqual(flights.data["results"][0]["tickets_available"], 38)
+        self.assertEqual(
+            detail.data["held_seats"],
+            [{"row": 1, "seat": 1}, {"row": 1, "seat": 2}]
+        )
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_seat_held_by_other_user(self):
+        self._hold()
+        self.client.force_authenticate(user=self.other_user)
+
+        hold_response = self.client.post(
+            HOLD_URL, self.payload, format="json"
+        )
+        order_response = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 2, "flight": self.flight.id}]},
+            format="json"
+        )
+
+        self.assertEqual(
+            hold_response.status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            order_response.status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertIn("seat", order_response.data["tickets"][0])
+
+    def test_convert_hold_into_order(self):
+        hold = self._hold()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                ORDER_URL,
+                {
+                    "hold": hold["id"],
+                    "tickets": [
+                        {"row": 1, "seat": 1, "flight": self.flight.id},
+                        {"row": 1, "seat": 2, "flight": self.flight.id},
+                    ],
+                },
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(holds.held_seats(self.flight.id), set())
+        detail = self.client.get(
+            reverse("flights:seat-hold-detail", args=[hold["id"]])
+        )
+        self.assertEqual(detail.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_with_other_users_hold(self):
+        hold = self._hold()
+        self.client.force_authenticate(user=self.other_user)
+
+        response = self.client.post(
+            ORDER_URL,
+            {
+                "hold": hold["id"],
+                "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}],
+            },
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("hold", response.data)
+
+    def test_release_hold(self):
+        hold = self._hold()
+
+        response = self.client.delete(
+            reverse("flights:seat-hold-detail", args=[hold["id"]])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(holds.held_seats(self.flight.id), set())
+        self._hold()
+
+    def _lock_flight_index(self):
+        cache.add(holds.LOCK_KEY.format(flight_id=self.flight.id), 1)
+        patcher = mock.patch("flights.holds.LOCK_WAIT", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hold_while_index_is_locked(self):
+        self._lock_flight_index()
+
+        response = self.client.post(HOLD_URL, self.payload, format="json")
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertIsNone(cache.get(holds._seat_key(self.flight.id, 1, 1)))
+
+    def test_release_while_index_is_locked(self):
+        hold = self._hold()
+        self._lock_flight_index()
+
+        response = self.client.delete(
+            reverse("flights:seat-hold-detail", args=[hold["id"]])
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(holds.held_seats(self.flight.id), {(1, 1), (1, 2)})
+        self.assertEqual(holds.get_hold(hold["id"])["id"], hold["id"])
+
+    def test_lock_taken_over_after_expiring_is_kept(self):
+        lock_key = holds.LOCK_KEY.format(flight_id=self.flight.id)
+
+        with holds._flight_index(self.flight.id):
+            # The lock timed out and another request took it meanwhile
+            cache.set(lock_key, "other")
+
+        self.assertEqual(cache.get(lock_key), "other")
+
+    def test_expired_hold_is_ignored(self):
+        hold = self._hold()
+
+        with mock.patch(
+            "flights.holds.time.time", return_value=time.time() + 3600
+        ):
+            self.assertEqual(holds.held_seats(self.flight.id), set())
+            self.assertEqual(holds.held_counts([self.flight.id]), {
+                self.flight.id: 0
+            })
+            with self.assertRaises(Exception):
+                holds.get_hold(hold["id"])
+
+    def test_cached_flights_drop_expired_holds(self):
+        holds.create_hold(self.flight, [(1, 1)], self.user.pk, ttl=2)
+        list_url = reverse("flights:flight-list")
+        detail_url = reverse("flights:flight-detail", args=[self.flight.id])
+        async_url = reverse("flights:async-flight-list")
+        for url in (list_url, detail_url, async_url):
+            self.client.get(url)
+
+        with mock.patch("time.time", return_value=time.time() + 3):
+            flights = self.client.get(list_url)
+            detail = self.client.get(detail_url)
+            async_flights = self.client.get(async_url)
+
+        self.assertEqual(flights.data["results"][0]["tickets_available"], 40)
+        self.assertEqual(detail.data["held_seats"], [])
+        self.assertEqual(
+            async_flights.data["results"][0]["tickets_available"], 40
+        )
+
+    def test_hold_taken_seat(self):
+        self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+            format="json"
+        )
+
+        response = self.client.post(HOLD_URL, self.payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", response.data["seats"][0])
@@ -0,0 +1,143 @@
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Order,
+    Route,
+    Ticket
+)
+from flights.seat_map import SeatMap
+
+
+class SeatMapTest(TestCase):
+    def test_take_release_and_count(self):
+        seat_map = SeatMap(rows=3, seats_in_row=3)
+        seat_map.take(1, 1)
+        seat_map.take(2, 3)
+
+        self.assertTrue(seat_map.is_taken(2, 3))
+        self.assertFalse(seat_map.is_taken(3, 3))
+        self.assertEqual(seat_map.taken_count(), 2)
+        self.assertEqual(seat_map.free_count(), 7)
+
+        seat_map.release(1, 1)
+        self.assertEqual(
+            seat_map.taken_seats(), [{"row": 2, "seat": 3}]
+        )
+
+    def test_runs_and_round_trip(self):
+        seat_map = SeatMap(rows=2, seats_in_row=4)
+        for seat in (3, 4):
+            seat_map.take(1, seat)
+        seat_map.take(2, 1)
+        seat_map.take(2, 4)
+
+        self.assertEqual(seat_map.runs(), [[2, 3], [7, 1]])
+        restored = SeatMap(2, 4, seat_map.to_bytes())
+        self.assertEqual(restored.taken_seats(), seat_map.taken_seats())
+
+    def test_out_of_range_seat(self):
+        seat_map = SeatMap(rows=2, seats_in_row=2)
+        with self.assertRaises(IndexError):
+            seat_map.take(3, 1)
+
+
+class FlightSeatMapApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+        airport_1 = Airport.objects.create(name="A1", closest_big_city="C1")
+        airport_2 = Airport.objects.create(name="A2", closest_big_city="C2")
+        route = Route.objects.create(
+            distance=100, source=airport_1, destination=airport_2
+        )
+        airplane = Airplane.objects.create(
+            name="Widebody",
+            rows=40,
+            seats_in_row=10,
+            airplane_type=AirplaneType.objects.create(name="Wide"),
+        )
+        self.flight = Flight.objects.create(
+            departure_time=datetime.now(),
+            arrival_time=datetime.now(),
+            route=route,
+            airplane=airplane
+        )
+        order = Order.objects.create(user=self.user)
+        for row, seat in ((1, 1), (1, 2), (3, 10)):
+            Ticket.objects.create(
+                row=row, seat=seat, flight=self.flight, order=order
+            )
+        self.detail_url = reverse(
+            "flights:flight-detail", args=[self.flight.id]
+        )
+
+    def test_ticket_writes_keep_bitmap_in_step(self):
+        self.flight.refresh_from_db()
+        self.assertTrue(self.flight.is_seat_taken(3, 10))
+        self.assertEqual(self.flight.seats_free, 397)
+
+        Ticket.objects.get(row=1, seat=2).delete()
+        self.flight.refresh_from_db()
+        self.assertFalse(self.flight.is_seat_taken(1, 2))
+
+    def test_rebuild_locks_the_flight(self):
+        Flight.objects.filter(pk=self.flight.pk).update(seats_bitmap=b"")
+        lock = mock.Mock(wraps=Flight.lock_for_seating)
+
+        with mock.patch.object(Flight, "lock_for_seating", lock):
+            self.flight.rebuild_seats_bitmap()
+
+        lock.assert_called_once_with([self.flight.pk])
+        self.flight.refresh_from_db()
+        self.assertTrue(self.flight.is_seat_taken(3, 10))
+        self.assertEqual(self.flight.seats_free, 397)
+
+    def test_taken_seats_default_format(self):
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["taken_seats"],
+            [
+                {"row": 1, "seat": 1},
+                {"row": 1, "seat": 2},
+                {"row": 3, "seat": 10},
+            ]
+        )
+        self.assertNotIn("seat_map", response.data)
+
+    def test_rle_seat_map(self):
+        response = self.client.get(self.detail_url, {"seat_map": "rle"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("taken_seats", response.data)
+        self.assertEqual(response.data["seat_map"]["runs"], [[0, 2], [29, 1]])
+        self.assertEqual(response.data["seat_map"]["seats_free"], 397)
+
+    def test_packed_seat_map(self):
+        response = self.client.get(self.detail_url, {"seat_map": "packed"})
+        self.flight.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["seat_map"]["bitmap"],
+            self.flight.get_seat_map().packed()
+        )
+
+    def test_unknown_seat_map_format(self):
+        response = self.client.get(self.detail_url, {"seat_map": "png"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,193 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket
+)
+
+FLIGHT_URL = reverse("flights:flight-list")
+ORDER_URL = reverse("flights:order-list")
+AIRPLANE_URL = reverse("flights:airplane-list")
+
+
+class SparseFieldsetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=10,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Boeing"),
+        )
+        self.crew = Crew.objects.create(first_name="John", last_name="Smith")
+        self.flight = Flight.objects.create(
+            departure_time=datetime(2024, 7, 1, 8, 30),
+            arrival_time=datetime(2024, 7, 1, 10),
+            route=Route.objects.create(
+                distance=540,
+                source=Airport.objects.create(
+                    name="Kyiv", closest_big_city="Kyiv"
+                ),
+                destination=Airport.objects.create(
+                    name="Lviv", closest_big_city="Lviv"
+                ),
+            ),
+            airplane=self.airplane,
+        )
+        self.flight.crew.add(self.crew)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_flight_list_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                FLIGHT_URL, {"fields": "id,departure_time,tickets_available"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [{
+            "id": self.flight.id,
+            "departure_time": "2024-07-01T08:30:00",
+            "tickets_available": 60,
+        }])
+        # The count and the page: no crew prefetch, no route join
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("flights_route", queries[1]["sql"])
+
+    def test_flight_list_without_relations_has_no_joins(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(FLIGHT_URL, {"fields": "id,arrival_time"})
+
+        self.assertNotIn("JOIN", queries[-1]["sql"])
+
+    def test_flight_list_expand(self):
+        response = self.client.get(
+            FLIGHT_URL,
+            {"fields": "id,airplane,crew", "expand": "crew,airplane"},
+        )
+
+        self.assertEqual(response.data["results"], [{
+            "id": self.flight.id,
+            "airplane": {
+                "id": self.airplane.id,
+                "name": "Airplane",
+                "rows": 10,
+                "seats_in_row": 6,
+                "airplane_type": "Boeing",
+                "image": None,
+            },
+            "crew": [{
+                "id": self.crew.id,
+                "first_name": "John",
+                "last_name": "Smith",
+                "full_name": "John Smith",
+            }],
+        }])
+
+    def test_expanded_airplane_type_rename_is_not_cached(self):
+        params = {"fields": "id,airplane", "expand": "airplane"}
+        self.client.get(FLIGHT_URL, params)
+        airplane_type = self.airplane.airplane_type
+        airplane_type.name = "Airbus"
+        airplane_type.save()
+
+        response = self.client.get(FLIGHT_URL, params)
+
+        self.assertEqual(
+            response.data["results"][0]["airplane"]["airplane_type"],
+            "Airbus",
+        )
+
+    def test_fast_path_and_drf_agree(self):
+        params = {"fields": "route,crew,id", "expand": "crew"}
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            slow = self.client.get(FLIGHT_URL, params).content
+        cache.clear()
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            fast = self.client.get(FLIGHT_URL, params).content
+        self.assertEqual(fast, slow)
+
+    def test_flight_detail_without_seats(self):
+        response = self.client.get(
+            reverse("flights:flight-detail", args=[self.flight.id]),
+            {"fields": "id,route"},
+        )
+
+        self.assertEqual(set(response.data), {"id", "route"})
+
+    def test_unknown_fields_are_rejected(self):
+        for params in (
+            {"fields": "id,pilot"},
+            {"expand": "route"},
+            {"fields": "id,taken_seats"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(FLIGHT_URL, params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+    def test_airplane_list_expand(self):
+        response = self.client.get(
+            AIRPLANE_URL,
+            {"fields": "id,airplane_type", "expand": "airplane_type"},
+        )
+
+        self.assertEqual(response.data["results"], [{
+            "id": self.airplane.id,
+            "airplane_type": {
+                "id": self.airplane.airplane_type_id, "name": "Boeing"
+            },
+        }])
+
+    def test_order_list_without_tickets(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(ORDER_URL, {"fields": "id"})
+
+        self.assertEqual(response.data["results"], [{"id": order.id}])
+        # The count and the page, no tickets prefetch
+        self.assertEqual(len(queries), 2)
+
+    def test_order_list_expand_tickets(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        response = self.client.get(ORDER_URL, {"expand": "tickets"})
+
+        flight = response.data["results"][0]["tickets"][0]["flight"]
+        self.assertEqual(flight["route"]["source"], "Kyiv")
+
+    def test_writes_ignore_fields(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post(
+            reverse("flights:crew-list") + "?fields=id",
+            {"first_name": "Anna", "last_name": "Koval"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["full_name"], "Anna Koval")
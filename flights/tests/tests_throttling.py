@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from airport_service.throttling import ScopedRateThrottle, UserRateThrottle
+
+FLIGHT_URL = reverse("flights:flight-list")
+ORDER_URL = reverse("flights:order-list")
+ITINERARY_URL = reverse("flights:itineraries")
+
+
+class ThreePerMinuteThrottle(UserRateThrottle):
+    rate = "3/min"
+
+
+class SlidingWindowThrottleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.request = Request(APIRequestFactory().get("/"))
+        self.request.user = self.user
+        self.now = 0
+
+    def tearDown(self):
+        cache.clear()
+
+    def _throttle(self):
+        throttle = ThreePerMinuteThrottle()
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def _allowed(self, at):
+        self.now = at
+        throttle = self._throttle()
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_limit_within_a_window(self):
+        for at in (10, 20, 30):
+            self.assertTrue(self._allowed(at)[0])
+
+        allowed, throttle = self._allowed(40)
+
+        self.assertFalse(allowed)
+        # From 80 on, the next window covers 3 * (1 - 20 / 60) of them
+        self.assertAlmostEqual(throttle.wait(), 40)
+
+    def test_previous_window_is_weighed(self):
+        for at in (10, 20, 30):
+            self._allowed(at)
+
+        self.assertTrue(self._allowed(90)[0])
+        allowed, throttle = self._allowed(91)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 9)
+        self.assertTrue(self._allowed(100)[0])
+
+    def test_rejected_requests_are_not_counted(self):
+        for at in (10, 20, 30, 40, 50):
+            allowed, throttle = self._allowed(at)
+
+        self.assertEqual(cache.get(f"{throttle.key}:0"), 3)
+
+    def test_fixed_memory(self):
+        for at in range(0, 120, 5):
+            self._allowed(at)
+
+        keys = [key for key in cache._cache if "throttle_user" in key]
+        self.assertEqual(len(keys), 2)
+
+
+class ScopedThrottleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client.force_authenticate(user=self.user)
+        rates = mock.patch.dict(
+            ScopedRateThrottle.THROTTLE_RATES,
+            {"orders": "1/min", "flight_search": "2/min"},
+        )
+        rates.start()
+        self.addCleanup(rates.stop)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_order_creation_is_limited_separately(self):
+        self.client.post(ORDER_URL, {}, format="json")
+
+        response = self.client.post(ORDER_URL, {}, format="json")
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertIn("Retry-After", response)
+        self.assertEqual(
+            self.client.get(ORDER_URL).status_code, status.HTTP_200_OK
+        )
+
+    def test_flight_search_is_limited(self):
+        self.client.get(FLIGHT_URL)
+        self.client.get(ITINERARY_URL, {"origin": 1, "destination": 2})
+
+        response = self.client.get(FLIGHT_URL, {"source": 1})
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(
+            self.client.post(ORDER_URL, {}, format="json").status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_zero_rate_rejects_every_request(self):
+        with mock.patch.dict(
+            ScopedRateThrottle.THROTTLE_RATES, {"orders": "0/hour"}
+        ):
+            response = self.client.post(ORDER_URL, {}, format="json")
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(response["Retry-After"], "3600")
+
+    def test_views_without_scope_are_not_limited(self):
+        throttle = ScopedRateThrottle()
+        view = SimpleNamespace(action="retrieve", throttle_scopes={})
+
+        self.assertTrue(throttle.allow_request(None, view))
@@ -1,7 +1,11 @@
 from datetime import datetime
+from io import StringIO
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -93,6 +97,91 @@ class AuthenticatedOrderTest(BaseOrderTest):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def _post_order_queries(self, seats):
+        payload = {
+            "tickets": [
+                {"row": row, "seat": seat, "flight": self.flight.id}
+                for row, seat in seats
+            ]
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return len(queries)
+
+    def test_create_order_query_count_is_constant(self):
+        small = self._post_order_queries([(1, 1), (1, 2)])
+        large = self._post_order_queries(
+            [(3, seat) for seat in range(1, 10)]
+        )
+
+        self.assertEqual(small, large)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 11)
+        self.assertTrue(self.flight.is_seat_taken(3, 9))
+
+    def test_create_order_with_unknown_flight(self):
+        self.payload["tickets"][1]["flight"] = self.flight.id + 100
+        response = self.client.post(ORDER_URL, self.payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("flight", response.data["tickets"][1])
+
+    def test_create_order_with_seat_out_of_range(self):
+        self.payload["tickets"][0]["row"] = 31
+        response = self.client.post(ORDER_URL, self.payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_order_for_taken_seat(self):
+        self.client.post(ORDER_URL, self.payload, format="json")
+        payload = {
+            "tickets": [
+                {"row": 5, "seat": 5, "flight": self.flight.id},
+                {"row": 2, "seat": 3, "flight": self.flight.id},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][0], {})
+        self.assertIn("seat", response.data["tickets"][1])
+        self.assertEqual(Order.objects.count(), 1)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
+
+    def test_create_order_with_same_seat_twice(self):
+        self.payload["tickets"][1] = dict(self.payload["tickets"][0])
+        response = self.client.post(ORDER_URL, self.payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", response.data["tickets"][1])
+
+    def test_seat_unique_per_flight(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Ticket.objects.create(
+                    row=1, seat=1, flight=self.flight, order=order
+                )
+
+    def test_order_cursor_pagination(self):
+        orders = [Order.objects.create(user=self.user) for _ in range(4)]
+
+        response = self.client.get(ORDER_URL, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        first_page = [order["id"] for order in response.data["results"]]
+
+        response = self.client.get(response.data["next"])
+        second_page = [order["id"] for order in response.data["results"]]
+        self.assertEqual(
+            sorted(first_page + second_page),
+            sorted(order.id for order in orders)
+        )
+
     def test_route_detail_authenticated(self):
         order = Order.objects.create(
             user=self.user,
@@ -111,6 +200,69 @@ class AuthenticatedOrderTest(BaseOrderTest):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_orders_are_scoped_to_the_user(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@user.com", password="1qazcde3"
+        )
+        own_order = Order.objects.create(user=self.user)
+        other_order = Order.objects.create(user=other_user)
+
+        response = self.client.get(ORDER_URL)
+        self.assertEqual(
+            [order["id"] for order in response.data["results"]],
+            [own_order.id]
+        )
+        response = self.client.get(
+            reverse("flights:order-detail", args=(other_order.id,))
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def _order_with_tickets(self, count):
+        order = Order.objects.create(user=self.user)
+        for index in range(count):
+            flight = Flight.objects.create(
+                departure_time=datetime.now(),
+                arrival_time=datetime.now(),
+                route=Route.objects.create(
+                    distance=100 + index,
+                    source=self.airport_1,
+                    destination=self.airport_2,
+                ),
+                airplane=self.airplane,
+            )
+            flight.crew.add(self.crew)
+            Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        return order
+
+    def test_order_detail_query_count_is_constant(self):
+        queries = []
+        for count in (1, 5):
+            url = reverse(
+                "flights:order-detail",
+                args=(self._order_with_tickets(count).id,)
+            )
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+            self.assertEqual(len(response.data["tickets"]), count)
+            queries.append(len(captured))
+
+        # The order, its tickets joined to flights, routes, airports and
+        # airplanes, and the crew
+        self.assertEqual(queries, [3, 3])
+
+    def test_order_list_query_count_is_constant(self):
+        for count in (1, 4):
+            self._order_with_tickets(count)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                ORDER_URL, {"expand": "tickets"}
+            )
+        results = response.data["results"]
+        self.assertEqual(
+            sorted(len(order["tickets"]) for order in results), [1, 4]
+        )
+
     def test_create_order_user(self):
         response = self.client.post(
             ORDER_URL,
@@ -121,3 +273,45 @@ class AuthenticatedOrderTest(BaseOrderTest):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         order = Order.objects.get(id=response.data["id"])
         self.assertEqual(order.tickets.count(), 2)
+
+
+class TicketsSoldCounterTest(BaseOrderTest):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com",
+            password="1qazcde3",
+        )
+        self.order = Order.objects.create(user=self.user)
+
+    def test_ticket_create_and_delete_update_counter(self):
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        Ticket.objects.create(
+            row=1, seat=2, flight=self.flight, order=self.order
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
+
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
+
+        self.order.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+
+    def test_reconcile_tickets_sold_fixes_drift(self):
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        Flight.objects.filter(pk=self.flight.pk).update(tickets_sold=7)
+
+        call_command("reconcile_tickets_sold", "--dry-run", stdout=StringIO())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 7)
+
+        call_command("reconcile_tickets_sold", stdout=StringIO())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
@@ -1,6 +1,12 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework import routers
 
+from flights.async_views import (
+    AsyncAirportViewSet,
+    AsyncFlightViewSet,
+    AsyncOrderViewSet,
+    AsyncRouteViewSet
+)
 from flights.views import (
     AirplaneViewSet,
     FlightViewSet,
@@ -8,7 +14,11 @@ from flights.views import (
     AirplaneTypeViewSet,
     RouteViewSet,
     CrewViewSet,
-    OrderViewSet
+    OrderViewSet,
+    SeatHoldViewSet,
+    ItineraryView,
+    OrderExportView,
+    CacheStatsView
 )
 
 app_name = "flights"
@@ -21,7 +31,24 @@ router.register("airplane-types", AirplaneTypeViewSet)
 router.register("routes", RouteViewSet)
 router.register("crew", CrewViewSet)
 router.register("orders", OrderViewSet)
+router.register("seat-holds", SeatHoldViewSet, basename="seat-hold")
+
+async_router = routers.SimpleRouter()
+async_router.register("flights", AsyncFlightViewSet, basename="async-flight")
+async_router.register(
+    "airports", AsyncAirportViewSet, basename="async-airport"
+)
+async_router.register("routes", AsyncRouteViewSet, basename="async-route")
+async_router.register("orders", AsyncOrderViewSet, basename="async-order")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("async/", include(async_router.urls)),
+    path("itineraries/", ItineraryView.as_view(), name="itineraries"),
+    re_path(
+        r"^exports/orders\.(?P<export_format>ndjson|csv)$",
+        OrderExportView.as_view(),
+        name="order-export",
+    ),
+    path("cache-stats/", CacheStatsView.as_view(), name="cache-stats"),
 ]
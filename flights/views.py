@@ -1,11 +1,23 @@
-from django.db.models import Count, F
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.db.models import F, Prefetch
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter
+)
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from flights import exports, holds, itineraries
+from flights.cache import CachedResponseMixin, stats as cache_stats
 from flights.models import (
     Airport,
     Flight,
@@ -13,7 +25,13 @@ from flights.models import (
     Route,
     Crew,
     Airplane,
-    Order
+    Order,
+    Ticket
+)
+from flights.pagination import (
+    FlightPagination,
+    OrderPagination,
+    RoutePagination
 )
 from flights.serializers import (
     AirportSerializer,
@@ -30,14 +48,153 @@ from flights.serializers import (
     FlightRetrieveSerializer,
     AirplaneRetrieveSerializer,
     OrderRetrieveSerializer,
-    AirplaneImageSerializer
+    AirplaneImageSerializer,
+    SeatHoldSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    OrderExportSerializer
 )
 from user.permissions import IsAdminAllOrIsAuthenticatedReadOnly
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class SparseFieldsetMixin:
+    """
+    ?fields=id,departure_time limits list and detail responses to the
+    listed fields, ?expand=airplane renders the listed relations with
+    the nested serializers of the serializer's expandable_fields.
+    get_queryset() checks field_requested() and field_expanded() to
+    skip the joins, prefetches and annotations of the fields left out.
+    """
+    fieldset_actions = ("list", "retrieve")
+    _fieldset = None
+
+    @staticmethod
+    def _param_to_names(query_string: str) -> frozenset[str]:
+        return frozenset(
+            name.strip() for name in query_string.split(",") if name.strip()
+        )
+
+    def _parse_fieldset(self):
+        if self.request is None or self.action not in self.fieldset_actions:
+            return None, frozenset()
+        serializer_class = self.get_serializer_class()
+        params = self.request.query_params
+
+        expand = self._param_to_names(params.get("expand", ""))
+        expandable = getattr(serializer_class, "expandable_fields", {})
+        unknown = expand - set(expandable)
+        if unknown:
+            raise ValidationError({"expand": (
+                f"Can't expand {', '.join(sorted(unknown))}. Expandable "
+                f"fields: {', '.join(expandable) or 'none'}."
+            )})
+
+        fields = self._param_to_names(params.get("fields", "")) or None
+        if fields is not None:
+            available = [
+                name for name, field in serializer_class(
+                    context=super().get_serializer_context()
+                ).fields.items()
+                if not field.write_only
+            ]
+            unknown = fields - set(available)
+            if unknown:
+                raise ValidationError({"fields": (
+                    f"Unknown fields {', '.join(sorted(unknown))}. "
+                    f"Available fields: {', '.join(available)}."
+                )})
+        return fields, expand
+
+    def get_fieldset(self) -> tuple[frozenset | None, frozenset]:
+        """(fields to keep or None for all, fields to expand)"""
+        if self._fieldset is None:
+            self._fieldset = self._parse_fieldset()
+        return self._fieldset
+
+    def field_requested(self, name: str) -> bool:
+        fields, _ = self.get_fieldset()
+        return fields is None or name in fields
+
+    def field_expanded(self, name: str) -> bool:
+        return name in self.get_fieldset()[1] and self.field_requested(name)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"], context["expand"] = self.get_fieldset()
+        return context
+
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        name="fields",
+        type={"type": "array", "items": {"type": "string"}},
+        description="Return only these fields "
+                    "(ex. ?fields=id,departure_time)",
+    ),
+    OpenApiParameter(
+        name="expand",
+        type={"type": "array", "items": {"type": "string"}},
+        description="Render these relations as nested objects "
+                    "(ex. ?expand=airplane,crew)",
+    ),
+]
+
+fieldset_schema = extend_schema_view(
+    list=extend_schema(parameters=FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+
+
+class FlightQuerysetMixin(SparseFieldsetMixin):
+    """Querysets, filters and cache settings shared by the flight views"""
     queryset = Flight.objects.all()
+    pagination_class = FlightPagination
     permission_classes = [IsAdminAllOrIsAuthenticatedReadOnly,]
+    # AirplaneType: ?expand=airplane renders the airplane type's name
+    cache_dependencies = (
+        Flight, Route, Airport, Airplane, AirplaneType, Crew, Ticket
+    )
+    throttle_scopes = {"list": "flight_search"}
+    cached_actions = ("list", "retrieve")
+    coalesced_actions = ("retrieve",)
+    cache_unordered_params = CachedResponseMixin.cache_unordered_params + (
+        "source", "destination", "airplane_type"
+    )
+
+    # Set while building a response: a cached one mustn't count holds
+    # that have expired since.
+    holds_expire_in = None
+
+    def shows_holds(self):
+        return (
+            self.action == "retrieve"
+            or self.field_requested("tickets_available")
+        )
+
+    def _tolerate_stale_list(self):
+        return (
+            self.action == "list"
+            and settings.FLIGHT_LIST_CACHE["TOLERATE_STALE_AVAILABILITY"]
+        )
+
+    def get_cache_dependencies(self):
+        if self._tolerate_stale_list():
+            return tuple(
+                model for model in self.cache_dependencies
+                if model is not Ticket
+            )
+        return self.cache_dependencies
+
+    def get_cache_timeout(self):
+        if self._tolerate_stale_list():
+            return settings.FLIGHT_LIST_CACHE["STALE_TIMEOUT"]
+        if self.action == "list":
+            timeout = settings.FLIGHT_LIST_CACHE["TIMEOUT"]
+        else:
+            timeout = super().get_cache_timeout()
+        if self.holds_expire_in is not None:
+            timeout = min(timeout, self.holds_expire_in)
+        return timeout
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -46,23 +203,188 @@ class FlightViewSet(viewsets.ModelViewSet):
             return FlightRetrieveSerializer
         return FlightSerializer
 
+    @staticmethod
+    def _params_to_ints(query_string: str) -> list[int]:
+        try:
+            return [int(str_id) for str_id in query_string.split(",")]
+        except ValueError:
+            raise ValidationError(
+                {"detail": f"Expected comma separated ids, "
+                           f"got: {query_string}"}
+            )
+
+    @staticmethod
+    def _param_to_date(name: str, value: str) -> date:
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError(
+                {name: "Date has wrong format. Use YYYY-MM-DD."}
+            )
+
+    def _filter_by_departure(self, queryset):
+        """
+        Turn the date filters into a half-open range on departure_time,
+        so the lookup stays an index range scan instead of a DATE() cast
+        """
+        params = self.request.query_params
+        departure_date = params.get("departure_date")
+        date_from = params.get("date_from")
+        date_to = params.get("date_to")
+
+        if departure_date:
+            date_from = date_to = departure_date
+        if date_from:
+            date_from = self._param_to_date("date_from", date_from)
+            queryset = queryset.filter(
+                departure_time__gte=datetime.combine(date_from, time.min)
+            )
+        if date_to:
+            date_to = self._param_to_date("date_to", date_to)
+            queryset = queryset.filter(
+                departure_time__lt=datetime.combine(
+                    date_to + timedelta(days=1), time.min
+                )
+            )
+        return queryset
+
+    def _with_relations(self, queryset, seat_fields=()):
+        """Join and prefetch only what the requested fields read"""
+        related = []
+        if self.field_requested("route"):
+            related += ["route__source", "route__destination"]
+        if self.field_expanded("airplane"):
+            related.append("airplane__airplane_type")
+        elif any(map(self.field_requested, ("airplane", *seat_fields))):
+            related.append("airplane")
+        if related:
+            queryset = queryset.select_related(*related)
+        if self.field_requested("crew"):
+            queryset = queryset.prefetch_related("crew")
+        return queryset
+
     def get_queryset(self):
         queryset = self.queryset
+        source = self.request.query_params.get("source")
+        destination = self.request.query_params.get("destination")
+        airplane_type = self.request.query_params.get("airplane_type")
 
         if self.action == "list":
-            queryset = (
-                Flight.objects.select_related()
-                .prefetch_related("crew")
-                .annotate(tickets_available=F(
+            queryset = self._with_relations(Flight.objects.all())
+            if self.field_requested("tickets_available"):
+                queryset = queryset.annotate(tickets_available=F(
                     "airplane__seats_in_row"
-                ) * F("airplane__rows") - Count("tickets"))
-            )
+                ) * F("airplane__rows") - F("tickets_sold"))
         if self.action == "retrieve":
-            queryset = Flight.objects.select_related().prefetch_related("crew")
-        return queryset
+            queryset = self._with_relations(
+                Flight.objects.all(),
+                seat_fields=("taken_seats", "held_seats", "seat_map"),
+            )
 
+        if source:
+            source = self._params_to_ints(source)
+            queryset = queryset.filter(route__source__id__in=source)
+        if destination:
+            destination = self._params_to_ints(destination)
+            queryset = queryset.filter(route__destination__id__in=destination)
+        if airplane_type:
+            airplane_type = self._params_to_ints(airplane_type)
+            queryset = queryset.filter(
+                airplane__airplane_type__id__in=airplane_type
+            )
+        return self._filter_by_departure(queryset)
+
+
+FLIGHT_LIST_PARAMETERS = [
+    OpenApiParameter(
+        name="source",
+        type={"type": "array", "items": {"type": "number"}},
+        description="Filter by source airport id (ex. ?source=2,3)",
+    ),
+    OpenApiParameter(
+        name="destination",
+        type={"type": "array", "items": {"type": "number"}},
+        description="Filter by destination airport id "
+                    "(ex. ?destination=2,3)",
+    ),
+    OpenApiParameter(
+        name="departure_date",
+        type=OpenApiTypes.DATE,
+        description="Filter by departure day (ex. ?departure_date="
+                    "2024-07-01)",
+    ),
+    OpenApiParameter(
+        name="date_from",
+        type=OpenApiTypes.DATE,
+        description="Departure on or after this day "
+                    "(ex. ?date_from=2024-07-01)",
+    ),
+    OpenApiParameter(
+        name="date_to",
+        type=OpenApiTypes.DATE,
+        description="Departure on or before this day "
+                    "(ex. ?date_to=2024-07-07)",
+    ),
+    OpenApiParameter(
+        name="airplane_type",
+        type={"type": "array", "items": {"type": "number"}},
+        description="Filter by airplane type id (ex. ?airplane_type=1,2)",
+    ),
+]
+
+FLIGHT_RETRIEVE_PARAMETERS = [
+    OpenApiParameter(
+        name="seat_map",
+        type=OpenApiTypes.STR,
+        enum=FlightRetrieveSerializer.SEAT_MAP_FORMATS,
+        description="Return a compact seat map instead of taken_seats "
+                    "(ex. ?seat_map=rle)",
+    ),
+]
+
+
+class FlightViewSet(
+    FlightQuerysetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet
+):
+    def get_serializer(self, *args, **kwargs):
+        if (
+            args
+            and self.action in self.cached_actions
+            and self.shows_holds()
+        ):
+            flights = args[0] if kwargs.get("many") else [args[0]]
+            self.holds_expire_in = holds.expires_in(
+                flight.pk for flight in flights
+            )
+        return super().get_serializer(*args, **kwargs)
+
+    @extend_schema(parameters=FLIGHT_LIST_PARAMETERS + FIELDSET_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        """
+            Returns a list of flights with filtering options.
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+            Use query parameters to filter the results:
+            "source", "destination": airport ids, ex. ?source=1&destination=2
+            "departure_date": a single day, ex. ?departure_date=2024-07-01
+            "date_from", "date_to": inclusive day range
+            "airplane_type": airplane type ids, ex. ?airplane_type=1,2
+        """
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=FLIGHT_RETRIEVE_PARAMETERS + FIELDSET_PARAMETERS
+    )
+    def retrieve(self, request, *args, **kwargs):
+        """Get flight details with its seat occupancy"""
+        return super().retrieve(request, *args, **kwargs)
+
+
+@extend_schema_view(
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class AirplaneViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Airplane.objects.all()
     permission_classes = [IsAdminAllOrIsAuthenticatedReadOnly, ]
 
@@ -82,8 +404,11 @@ class AirplaneViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         queryset = self.queryset
         airplane_type = self.request.query_params.get("airplane_type")
-        if self.action == "list":
-            queryset = Airplane.objects.select_related()
+        if (
+            self.action in ("list", "retrieve")
+            and self.field_requested("airplane_type")
+        ):
+            queryset = queryset.select_related("airplane_type")
         if airplane_type:
             airplane_type = self._params_to_ints(airplane_type)
             queryset = queryset.filter(airplane_type__id__in=airplane_type)
@@ -94,7 +419,9 @@ class AirplaneViewSet(viewsets.ModelViewSet):
             name="airplane_type",
             type={"type": "array", "items": {"type": "number"}},
             description="Filter by airplane type id (ex. ?airplane_types=2,3)",
-        )])
+        ),
+        *FIELDSET_PARAMETERS,
+    ])
     def list(self, request, *args, **kwargs):
         """Get list of airplanes by type"""
         return super().list(request, args, kwargs)
@@ -113,20 +440,35 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+@fieldset_schema
+class AirportViewSet(
+    SparseFieldsetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet
+):
     queryset = Airport.objects.all()
+    cache_dependencies = (Airport,)
     serializer_class = AirportSerializer
     permission_classes = [IsAdminAllOrIsAuthenticatedReadOnly, ]
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+@fieldset_schema
+class AirplaneTypeViewSet(
+    SparseFieldsetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet
+):
     queryset = AirplaneType.objects.all()
+    cache_dependencies = (AirplaneType,)
     serializer_class = AirplaneTypeSerializer
     permission_classes = [IsAdminAllOrIsAuthenticatedReadOnly, ]
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteQuerysetMixin(SparseFieldsetMixin):
+    """Querysets, filters and cache settings shared by the route views"""
     queryset = Route.objects.all()
+    cache_dependencies = (Route, Airport)
+    pagination_class = RoutePagination
     permission_classes = [IsAdminAllOrIsAuthenticatedReadOnly, ]
 
     def get_serializer_class(self):
@@ -144,7 +486,16 @@ class RouteViewSet(viewsets.ModelViewSet):
         destination = self.request.query_params.get("destination")
 
         if self.action == "list":
-            queryset = Route.objects.select_related()
+            queryset = Route.objects.annotate(
+                source_name=F("source__name"),
+                destination_name=F("destination__name"),
+            )
+            related = [
+                name for name in ("source", "destination")
+                if self.field_requested(name)
+            ]
+            if related:
+                queryset = queryset.select_related(*related)
 
         if source:
             source = self._params_to_ints(source)
@@ -155,6 +506,15 @@ class RouteViewSet(viewsets.ModelViewSet):
 
         return queryset.distinct()
 
+
+@extend_schema_view(
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class RouteViewSet(
+    RouteQuerysetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet
+):
     @extend_schema(parameters=[
         OpenApiParameter(
             name="source",
@@ -165,7 +525,8 @@ class RouteViewSet(viewsets.ModelViewSet):
             name="destination",
             type={"type": "array", "items": {"type": "number"}},
             description="Filter by airplane type id (ex. ?destination=2,3)",
-        )
+        ),
+        *FIELDSET_PARAMETERS,
     ])
     def list(self, request, *args, **kwargs):
         """
@@ -179,9 +540,15 @@ class RouteViewSet(viewsets.ModelViewSet):
         return super().list(request, args, kwargs)
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+@fieldset_schema
+class CrewViewSet(
+    SparseFieldsetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet
+):
     permission_classes = [IsAdminAllOrIsAuthenticatedReadOnly, ]
     queryset = Crew.objects.all()
+    cache_dependencies = (Crew,)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -189,34 +556,139 @@ class CrewViewSet(viewsets.ModelViewSet):
         return CrewSerializer
 
 
-class OrderSetPagination(PageNumberPagination):
-    page_size = 3
-    page_size_query_param = "page_size"
-    max_page_size = 20
-
-
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderQuerysetMixin(SparseFieldsetMixin):
+    """Querysets shared by the order views, scoped to the request user"""
     queryset = Order.objects.all()
-    pagination_class = OrderSetPagination
-    permission_classes = [IsAuthenticated,]
+    pagination_class = OrderPagination
+    permission_classes = [IsAuthenticated, ]
 
-    def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user)
-
-        if self.action == "retrieve":
-            queryset = Order.objects.prefetch_related(
-                "tickets__flight__airplane",
+    def _ticket_prefetches(self):
+        """
+        Tickets with the flights, routes, airports and airplanes they are
+        serialized with in one joined query, plus one for the crew,
+        whatever the page size
+        """
+        if not self.field_requested("tickets"):
+            return ()
+        if self.action == "retrieve" or self.field_expanded("tickets"):
+            return (
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.select_related(
+                        "flight__route__source",
+                        "flight__route__destination",
+                        "flight__airplane",
+                    ),
+                ),
                 "tickets__flight__crew",
-                "tickets__flight__route",
             )
-        if self.action == "list":
-            queryset = Order.objects.prefetch_related("tickets")
-        return queryset.distinct()
+        return ("tickets",)
+
+    def get_queryset(self):
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.prefetch_related(*self._ticket_prefetches())
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "retrieve":
             return OrderRetrieveSerializer
         return OrderSerializer
 
+
+@fieldset_schema
+class OrderViewSet(OrderQuerysetMixin, viewsets.ModelViewSet):
+    throttle_scopes = {"create": "orders"}
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class SeatHoldViewSet(viewsets.ViewSet):
+    """
+    Hold seats on a flight while the customer pays. Pass the hold id as
+    "hold" when creating the order, or delete the hold to free the seats;
+    otherwise it expires after settings.SEAT_HOLDS["TTL"] seconds.
+    """
+    permission_classes = [IsAuthenticated, ]
+    serializer_class = SeatHoldSerializer
+
+    @extend_schema(request=SeatHoldSerializer, responses=SeatHoldSerializer)
+    def create(self, request):
+        serializer = SeatHoldSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        hold = serializer.save(user=request.user)
+        return Response(
+            SeatHoldSerializer(hold).data, status=status.HTTP_201_CREATED
+        )
+
+    @extend_schema(responses=SeatHoldSerializer)
+    def retrieve(self, request, pk=None):
+        hold = holds.get_hold(pk, request.user.pk)
+        return Response(SeatHoldSerializer(hold).data)
+
+    def destroy(self, request, pk=None):
+        holds.release_hold(holds.get_hold(pk, request.user.pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ItineraryView(APIView):
+    """
+    Direct and connecting flights (up to settings.ITINERARIES["MAX_STOPS"]
+    stops) from origin to destination airport leaving on the given date,
+    keeping a minimum connection time and enough free seats on every leg.
+    """
+    permission_classes = [IsAdminAllOrIsAuthenticatedReadOnly, ]
+    throttle_scope = "flight_search"
+
+    @extend_schema(
+        parameters=[ItinerarySearchSerializer],
+        responses=ItinerarySerializer(many=True),
+    )
+    def get(self, request):
+        params = ItinerarySearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        results = itineraries.search(
+            params.validated_data["origin"],
+            params.validated_data["destination"],
+            params.validated_data["date"],
+            passengers=params.validated_data["passengers"],
+            max_stops=params.validated_data["max_stops"],
+        )
+        return Response(ItinerarySerializer(results, many=True).data)
+
+
+class OrderExportView(APIView):
+    """
+    Every order with its tickets and their flights, streamed as NDJSON
+    (one order per line) or CSV (one ticket per line), oldest first.
+    """
+    permission_classes = [IsAdminUser, ]
+
+    @extend_schema(
+        operation_id="airport_exports_orders_retrieve",
+        parameters=[OrderExportSerializer],
+        responses={200: OpenApiTypes.STR},
+    )
+    def get(self, request, export_format):
+        params = OrderExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        lines = exports.export_lines(export_format, **params.validated_data)
+        _, content_type = exports.FORMATS[export_format]
+        return StreamingHttpResponse(
+            lines,
+            content_type=content_type,
+            headers={
+                "Content-Disposition":
+                    f'attachment; filename="orders.{export_format}"',
+            },
+        )
+
+
+class CacheStatsView(APIView):
+    """Hit/miss counters of the API response cache, per viewset"""
+    permission_classes = [IsAdminUser, ]
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        return Response(cache_stats())
@@ -0,0 +1,95 @@
+"""
+JWT authentication that resolves users from the cache
+(settings.JWT_USER_CACHE) instead of querying the user table on every
+request. user/signals.py drops a user's entry whenever it is saved or
+deleted, so staff and active flag changes apply to the next request.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken
+)
+from rest_framework_simplejwt.settings import api_settings
+
+USER_KEY = "jwt_user:{user_id}"
+
+# What requests read from request.user. The password hash stays out of
+# the cache; other fields are loaded on first access.
+CACHED_FIELDS = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+def _cache():
+    return caches[settings.JWT_USER_CACHE["CACHE_ALIAS"]]
+
+
+def forget_user(user_id) -> None:
+    """
+    Drop right away and again on commit: a request running between the
+    two could otherwise cache the pre-commit row.
+    """
+    key = USER_KEY.format(user_id=user_id)
+    _cache().delete(key)
+    transaction.on_commit(lambda: _cache().delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Users come back with only CACHED_FIELDS loaded, like .only() would
+    return them: save() writes the loaded and assigned fields only.
+    """
+
+    def _load(self, user_id):
+        fields = dict.fromkeys((*CACHED_FIELDS, api_settings.USER_ID_FIELD))
+        return self.user_model.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values(*fields).first()
+
+    def get_user(self, validated_token):
+        # Revocation compares the token with the password hash
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        cache = _cache()
+        key = USER_KEY.format(user_id=user_id)
+        values = cache.get(key)
+        if values is None:
+            values = self._load(user_id)
+            if values is None:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                )
+            cache.set(key, values, settings.JWT_USER_CACHE["TIMEOUT"])
+
+        if not values["is_active"]:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+
+        fields = [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in values
+        ]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            fields,
+            [values[name] for name in fields],
+        )
@@ -0,0 +1,98 @@
+"""
+Password hashers that run in a bounded thread pool
+(settings.PASSWORD_HASHING) instead of the request thread.
+
+Hashing is slow and CPU bound on purpose, so a burst of sign-ups or
+logins could otherwise take every core of a worker. Here at most WORKERS
+hashes run at once and at most QUEUE more wait for a thread; requests
+beyond that get a 503 after TIMEOUT seconds instead of piling up (the
+hashers raise HashingBusy, user/middleware.py answers it). hashlib and
+argon2-cffi release the GIL while hashing, so the rest of the process
+keeps serving meanwhile.
+
+Passwords stored with another hasher than the first of PASSWORD_HASHERS
+are rehashed with it on the next successful login (Django's
+check_password).
+"""
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_lock = threading.Lock()
+_pool = None
+_slots = None
+_state = threading.local()
+
+
+class HashingBusy(Exception):
+    """No hashing thread freed up within PASSWORD_HASHING["TIMEOUT"]"""
+
+
+def _mark_pool_thread():
+    _state.in_pool = True
+
+
+def _get_pool():
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            config = settings.PASSWORD_HASHING
+            _pool = ThreadPoolExecutor(
+                config["WORKERS"],
+                thread_name_prefix="password-hashing",
+                initializer=_mark_pool_thread,
+            )
+            _slots = threading.BoundedSemaphore(
+                config["WORKERS"] + config["QUEUE"]
+            )
+        return _pool, _slots
+
+
+def offload(func, *args, **kwargs):
+    """Run func in the hashing pool, waiting for its result"""
+    # verify() hashes again through encode(), already in the pool
+    if getattr(_state, "in_pool", False):
+        return func(*args, **kwargs)
+
+    pool, slots = _get_pool()
+    if not slots.acquire(timeout=settings.PASSWORD_HASHING["TIMEOUT"]):
+        raise HashingBusy()
+    try:
+        return pool.submit(functools.partial(func, *args, **kwargs)).result()
+    finally:
+        slots.release()
+
+
+class OffloadedHasherMixin:
+    def encode(self, password, salt, *args, **kwargs):
+        return offload(super().encode, password, salt, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return offload(super().verify, password, encoded)
+
+
+class ScryptPasswordHasher(
+    OffloadedHasherMixin, hashers.ScryptPasswordHasher
+):
+    pass
+
+
+class Argon2PasswordHasher(
+    OffloadedHasherMixin, hashers.Argon2PasswordHasher
+):
+    pass
+
+
+class PBKDF2PasswordHasher(
+    OffloadedHasherMixin, hashers.PBKDF2PasswordHasher
+):
+    pass
+
+
+class PBKDF2SHA1PasswordHasher(
+    OffloadedHasherMixin, hashers.PBKDF2SHA1PasswordHasher
+):
+    pass
@@ -0,0 +1,23 @@
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.translation import gettext as _
+from rest_framework import status
+
+from user.hashers import HashingBusy
+
+
+class HashingBusyMiddleware(MiddlewareMixin):
+    """
+    Answer requests the password hashing pool turned away (user/hashers.py)
+    with a 503 rather than a server error: API sign-ups and logins as well
+    as the admin login. DRF leaves exceptions that aren't APIExceptions to
+    Django, so this covers both.
+    """
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingBusy):
+            return None
+        return JsonResponse(
+            {"detail": _("Too many sign-ins at the moment, try again later.")},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
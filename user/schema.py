@@ -0,0 +1,6 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """The bearer JWT scheme, for the cached user lookup"""
+    target_class = "user.authentication.CachedJWTAuthentication"
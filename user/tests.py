@@ -0,0 +1,171 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model, hashers
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user import hashers as offloaded_hashers
+
+ME_URL = reverse("user:manage_user")
+REGISTER_URL = reverse("user:create")
+TOKEN_URL = reverse("user:token_obtain_pair")
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", password="1qazcde3"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_user_is_queried_once(self):
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "user@user.com")
+
+    def test_staff_flag_change_applies_to_next_request(self):
+        self.client.get(ME_URL)
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(ME_URL)
+
+        self.assertTrue(response.data["is_staff"])
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(ME_URL)
+        self.user.delete()
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_keeps_fields_that_are_not_cached(self):
+        self.client.get(ME_URL)
+        response = self.client.patch(ME_URL, {"email": "new@user.com"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@user.com")
+        self.assertTrue(self.user.check_password("1qazcde3"))
+
+        response = self.client.put(
+            ME_URL, {"email": "new@user.com", "password": "2wsxvfr4"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("2wsxvfr4"))
+        self.assertEqual(self.client.get(ME_URL).data["email"], "new@user.com")
+
+
+class PasswordHashingTest(TestCase):
+    def test_new_passwords_use_the_preferred_hasher(self):
+        response = self.client.post(
+            REGISTER_URL, {"email": "new@user.com", "password": "1qazcde3"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = get_user_model().objects.get(email="new@user.com")
+        self.assertTrue(user.password.startswith("scrypt$"))
+
+    def test_older_hashes_are_upgraded_on_login(self):
+        user = get_user_model().objects.create_user(email="user@user.com")
+        user.password = hashers.make_password(
+            "1qazcde3", hasher="pbkdf2_sha256"
+        )
+        user.save()
+
+        response = self.client.post(
+            TOKEN_URL, {"email": "user@user.com", "password": "1qazcde3"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("scrypt$"))
+        self.assertTrue(user.check_password("1qazcde3"))
+
+    def test_hashes_run_in_the_pool(self):
+        threads = []
+        encode = hashers.ScryptPasswordHasher.encode
+
+        def record(hasher, *args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return encode(hasher, *args, **kwargs)
+
+        with mock.patch.object(
+            hashers.ScryptPasswordHasher, "encode", autospec=True,
+            side_effect=record,
+        ):
+            encoded = hashers.make_password("1qazcde3")
+            self.assertTrue(hashers.check_password("1qazcde3", encoded))
+
+        self.assertEqual(len(threads), 2)
+        for name in threads:
+            self.assertTrue(name.startswith("password-hashing"))
+
+    def _fill_pool(self):
+        pool, _ = offloaded_hashers._get_pool()
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        patcher = mock.patch.object(
+            offloaded_hashers, "_get_pool", return_value=(pool, slots)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(PASSWORD_HASHING={"TIMEOUT": 0.01})
+    def test_full_pool_answers_503(self):
+        self._fill_pool()
+
+        response = self.client.post(
+            REGISTER_URL, {"email": "new@user.com", "password": "1qazcde3"}
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertFalse(
+            get_user_model().objects.filter(email="new@user.com").exists()
+        )
+
+    @override_settings(PASSWORD_HASHING={"TIMEOUT": 0.01})
+    def test_full_pool_answers_503_to_admin_login(self):
+        get_user_model().objects.create_superuser(
+            email="admin@user.com", password="1qazcde3"
+        )
+        self._fill_pool()
+
+        response = self.client.post(
+            reverse("admin:login"),
+            {"username": "admin@user.com", "password": "1qazcde3"},
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )